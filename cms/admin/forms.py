@@ -682,13 +682,14 @@ class ChangePageForm(BasePageContentForm):
             changed_date=timezone.now(),
             **data,
         )
+        old_path = page._get_url_paths().get(self._language)
         page.update_urls(
             self._language,
             path=page_path,
             slug=page_slug,
             managed=not bool(page_overwrite_url),
         )
-        page._update_url_path_recursive(self._language)
+        page._update_descendant_url_paths(self._language, old_path)
         page.clear_cache(menu=True)
 
         if page.application_urls and "slug" in self.changed_data:
@@ -2,7 +2,7 @@ from __future__ import annotations
 
 import json
 import re
-from collections import namedtuple
+from collections import defaultdict, namedtuple
 
 import django
 from django.conf import settings
@@ -18,7 +18,6 @@ from django.core.exceptions import (
 )
 from django.db import transaction
 from django.db.models import Prefetch, Q
-from django.db.models.query import QuerySet
 from django.forms.fields import IntegerField
 from django.http import (
     Http404,
@@ -79,8 +78,9 @@ from cms.utils.i18n import (
     get_language_tuple,
     get_site_language_from_request,
 )
+from cms.utils.page_delete import delete_placeholders
 from cms.utils.permissions import clear_permission_lru_caches
-from cms.utils.plugins import copy_plugins_to_placeholder
+from cms.utils.plugins import copy_plugins_to_placeholders
 from cms.utils.urlutils import admin_reverse
 
 require_POST = method_decorator(require_POST)
@@ -409,23 +409,7 @@ class PageAdmin(PageDeleteMessageMixin, admin.ModelAdmin):
             request=request, operation=operations.DELETE_PAGE, obj=obj, sender=self.model
         )
 
-        cms_pages = [obj]
-
-        if obj.is_branch:
-            descendant_ids = obj.get_descendants().values_list("id", flat=True)
-            cms_pages.extend(self.model.objects.filter(id__in=descendant_ids))
-
-        # Delete all associated pages contents
-        ct_page_content = ContentType.objects.get_for_model(PageContent)
-        page_content_objs = PageContent.admin_manager.filter(page__in=cms_pages).values_list("pk", flat=True)
-        placeholders = Placeholder.objects.filter(
-            content_type=ct_page_content,
-            object_id__in=page_content_objs,
-        )
-        plugins = CMSPlugin.objects.filter(placeholder__in=placeholders)
-        QuerySet.delete(plugins)
-        placeholders.delete()
-
+        # Deletes the descendants, contents, placeholders and plugins in bulk
         super().delete_model(request, obj)
 
         send_post_page_operation(
@@ -1209,14 +1193,32 @@ class PageContentAdmin(PageDeleteMessageMixin, admin.ModelAdmin):
 
         target_page_content = page.get_content_obj(target_language, fallback=False)
 
-        for placeholder in source_page_content.get_placeholders():
-            # TODO: Handle missing placeholder
-            target = target_page_content.get_placeholders().get(slot=placeholder.slot)
-            plugins = placeholder.get_plugins_list(source_page_content.language)
+        source_placeholders = list(source_page_content.get_placeholders())
+        targets = {placeholder.slot: placeholder for placeholder in target_page_content.get_placeholders()}
 
-            if not target.has_add_plugins_permission(request.user, plugins):
+        if any(placeholder.slot not in targets for placeholder in source_placeholders):
+            # Creates the placeholders of the target's template
+            targets.update(target_page_content.rescan_placeholders())
+
+        # Placeholders which are not part of the target's template are skipped
+        placeholder_pairs = [
+            (placeholder, targets[placeholder.slot])
+            for placeholder in source_placeholders
+            if placeholder.slot in targets
+        ]
+        plugins = defaultdict(list)
+
+        for plugin in CMSPlugin.objects.filter(
+            placeholder__in=[source for source, target in placeholder_pairs],
+            language=source_page_content.language,
+        ):
+            plugins[plugin.placeholder_id].append(plugin)
+
+        for source, target in placeholder_pairs:
+            if not target.has_add_plugins_permission(request.user, plugins[source.pk]):
                 return HttpResponseForbidden(_("You do not have permission to copy these plugins."))
-            copy_plugins_to_placeholder(plugins, target, language=target_language)
+
+        copy_plugins_to_placeholders(placeholder_pairs, source_page_content.language, target_language)
         return HttpResponse("ok")
 
     def delete_view(self, request, object_id, extra_context=None):
@@ -1241,7 +1243,6 @@ class PageContentAdmin(PageDeleteMessageMixin, admin.ModelAdmin):
             content_type=ct_page_content,
             object_id__in=page_contents.values("pk"),
         )
-        saved_plugins = CMSPlugin.objects.filter(placeholder__in=placeholders)
         page_url = obj.page.urls.get(language=obj.language)
 
         operation_token = send_pre_page_operation(
@@ -1261,9 +1262,9 @@ class PageContentAdmin(PageDeleteMessageMixin, admin.ModelAdmin):
         if obj.language in obj.page.page_content_cache:
             del obj.page.page_content_cache[obj.language]
 
+        delete_placeholders(placeholders)
         page_url.delete()
         page_contents.delete()
-        saved_plugins.delete()
 
         send_post_page_operation(
             request=request,
@@ -1389,12 +1390,10 @@ class PageContentAdmin(PageDeleteMessageMixin, admin.ModelAdmin):
             root_pages = pages
 
         if depth == 1:
-            for page in root_pages:
-                page._set_hierarchy(list(pages))
-                yield render_page_row(page)
-        else:
-            for page in root_pages:
-                yield render_page_row(page)
+            Page._set_tree_hierarchy(pages)
+
+        for page in root_pages:
+            yield render_page_row(page)
 
     # Indicators in the page tree
     @property
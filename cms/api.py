@@ -67,7 +67,7 @@ from cms.utils.conf import get_cms_setting
 from cms.utils.i18n import get_language_list
 from cms.utils.page import get_available_slug, get_clean_username
 from cms.utils.permissions import _thread_locals
-from cms.utils.plugins import copy_plugins_to_placeholder
+from cms.utils.plugins import copy_plugins_to_placeholders
 from menus.menu_pool import menu_pool
 
 # ===============================================================================
@@ -439,6 +439,10 @@ def add_plugin(placeholder, plugin_type, language, position="last-child", target
         language=language,
         parent_id=parent_id,
     )
+
+    if target and parent_id == target.pk:
+        # Saves looking up the parent's path
+        plugin_base.parent = target
     plugin_base = placeholder.add_plugin(plugin_base)
     plugin = plugin_model(**data)
     plugin_base.set_base_attr(plugin)
@@ -626,16 +630,49 @@ def copy_plugins_to_language(page, source_language, target_language, only_empty=
      plugins exists in the target language (on a placeholder basis).
     :return int: number of copied plugins
     """
-    copied = 0
     placeholders = page.get_placeholders(source_language)
-    for placeholder in placeholders:
-        # only_empty is True we check if the placeholder already has plugins and
-        # we skip it if has some
-        if not only_empty or not placeholder.get_plugins(language=target_language).exists():
-            plugins = list(placeholder.get_plugins(language=source_language))
-            copied_plugins = copy_plugins_to_placeholder(plugins, placeholder, language=target_language)
-            copied += len(copied_plugins)
-    return copied
+    return copy_plugins_to_placeholders(
+        [(placeholder, placeholder) for placeholder in placeholders],
+        source_language,
+        target_language,
+        only_empty=only_empty,
+    )
+
+
+def import_pages(records, site=None, parent=None, created_by="python-api", batch_size=None):
+    """
+    Creates pages with their translations, placeholders and plugins in bulk
+    and returns the number of created pages.
+
+    See :mod:`cms.utils.page_import` for the format of the page records.
+    Unlike :func:`create_page`, no model signals are sent for the created
+    objects and caches are only cleared once, after all pages have been
+    imported.
+
+    :param records: Iterable of page records, e.g., from :func:`cms.utils.page_import.read_page_records`
+    :param site: Site to put the pages on, defaults to the current site
+    :type site: :class:`django.contrib.sites.models.Site` instance
+    :param parent: Page to add the pages without a parent to, by default they are added as root pages
+    :type parent: :class:`cms.models.Page` instance
+    :param created_by: User that is creating the pages
+    :type created_by: str of :class:`django.contrib.auth.models.User` instance
+    :param int batch_size: Number of pages created in one transaction
+    """
+    from cms.utils.page_import import IMPORT_BATCH_SIZE, PageImporter
+
+    if site:
+        assert isinstance(site, Site)
+
+    if parent:
+        assert isinstance(parent, Page)
+
+    importer = PageImporter(
+        site=site or (parent.site if parent else None),
+        parent=parent,
+        created_by=created_by,
+        batch_size=batch_size or IMPORT_BATCH_SIZE,
+    )
+    return importer.import_pages(records)
 
 
 def can_change_page(request):
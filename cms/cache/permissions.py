@@ -33,6 +33,17 @@ def get_permission_cache(user, key):
     return cache.get(get_cache_key(user, key), version=get_cache_permission_version())
 
 
+def get_permission_cache_many(user, keys):
+    """
+    Helper for reading several values from cache at once. Returns a
+    dictionary mapping each found key to its value.
+    """
+    from django.core.cache import cache
+    cache_keys = {get_cache_key(user, key): key for key in keys}
+    values = cache.get_many(cache_keys, version=get_cache_permission_version())
+    return {cache_keys[cache_key]: value for cache_key, value in values.items()}
+
+
 def set_permission_cache(user, key, value):
     """
     Helper method for storing values in cache. Stores used keys so
@@ -47,6 +58,19 @@ def set_permission_cache(user, key, value):
               version=get_cache_permission_version())
 
 
+def set_permission_cache_many(user, values):
+    """
+    Helper method for storing several values in cache at once.
+    """
+    from django.core.cache import cache
+
+    cache.set_many(
+        {get_cache_key(user, key): value for key, value in values.items()},
+        get_cms_setting('CACHE_DURATIONS')['permissions'],
+        version=get_cache_permission_version(),
+    )
+
+
 def clear_user_permission_cache(user):
     """
     Cleans permission cache for given user.
@@ -56,6 +80,23 @@ def clear_user_permission_cache(user):
         cache.delete(get_cache_key(user, key), version=get_cache_permission_version())
 
 
+def clear_users_permission_cache(user_ids):
+    """
+    Cleans permission cache for the users with the given ids
+    using a single ``delete_many``.
+    """
+    from django.core.cache import cache
+
+    cache_keys = [
+        "%s:permission:%d:%s" % (get_cms_setting('CACHE_PREFIX'), user_id, key)
+        for user_id in user_ids
+        for key in PERMISSION_KEYS
+    ]
+
+    if cache_keys:
+        cache.delete_many(cache_keys, version=get_cache_permission_version())
+
+
 def clear_permission_cache():
     from django.core.cache import cache
     version = get_cache_permission_version()
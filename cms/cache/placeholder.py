@@ -15,6 +15,11 @@ the current HTTPRequest object.
 
 The vary-on header-names are also stored with the version. This enables us to
 check for cache hits without re-computing placeholder.get_vary_cache_on().
+
+Besides the rendered content, the plugin tree of a (placeholder x lang x
+site_id) can be cached under the same version (see CMS_PLUGIN_TREE_CACHE). It
+does not depend on the VARY headers, so rendering the placeholder for a new
+combination of headers does not need to query the database.
 """
 import hashlib
 import time
@@ -169,3 +174,51 @@ def clear_placeholder_cache(placeholder, lang, site_id):
     """
     version = int(time.time() * 1000000)
     _set_placeholder_cache_version(placeholder, lang, site_id, version, [])
+
+
+def _get_plugin_tree_cache_key(placeholder, lang, site_id, version):
+    prefix = get_cms_setting("CACHE_PREFIX")
+    key = f"{prefix}|placeholder_plugin_tree|id:{placeholder.pk}|lang:{lang}|site:{site_id}|v:{version}"
+
+    # See _get_placeholder_cache_key for why keys are hashed below 250 characters.
+    if len(key) > 200:
+        key = "{prefix}|{hash}".format(
+            prefix=prefix,
+            hash=hashlib.sha1(key.encode("utf-8")).hexdigest(),
+        )
+    return key
+
+
+def get_plugin_tree_cache(placeholders, lang, site_id):
+    """
+    Returns a dictionary mapping the ids of the given «placeholders» to their
+    cached plugin tree. Placeholders without a cached tree are left out.
+    """
+    from django.core.cache import cache
+
+    keys = {
+        _get_plugin_tree_cache_key(
+            placeholder, lang, site_id, _get_placeholder_cache_version(placeholder, lang, site_id)[0]
+        ): placeholder.pk
+        for placeholder in placeholders
+    }
+    return {keys[key]: tree for key, tree in cache.get_many(keys).items()}
+
+
+def set_plugin_tree_cache(trees, lang, site_id):
+    """
+    Caches the plugin trees in «trees», an iterable of (placeholder, tree)
+    pairs.
+    """
+    from django.core.cache import cache
+
+    duration = get_cms_setting("CACHE_DURATIONS")["content"]
+    cache.set_many(
+        {
+            _get_plugin_tree_cache_key(
+                placeholder, lang, site_id, _get_placeholder_cache_version(placeholder, lang, site_id)[0]
+            ): tree
+            for placeholder, tree in trees
+        },
+        duration,
+    )
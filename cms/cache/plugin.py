@@ -0,0 +1,193 @@
+"""
+This module manages the plugin fragment cache. It complements the placeholder
+cache for placeholders which cannot be cached as a whole, e.g., because a
+single plugin has ``cache = False``. The rendered content of each cacheable
+plugin (including its children) is stored on its own so that only the
+uncacheable plugins need to be rendered for each request.
+
+A fragment's cache key is derived from the (plugin x lang x site_id) and:
+
+* the version of the placeholder's cache (see ``cms.cache.placeholder``).
+  Invalidating the placeholder cache via ``Placeholder.clear_cache()``
+  therefore also invalidates all plugin fragments of that placeholder.
+* a digest of the plugin tree below (and including) the plugin, built from
+  the plugins' pks, positions and change dates.
+* the VARY headers declared by the plugin and its descendants.
+"""
+import hashlib
+
+from django.utils.timezone import now
+
+from cms.cache.placeholder import _get_placeholder_cache_version
+from cms.constants import EXPIRE_NOW, MAX_EXPIRATION_TTL
+from cms.utils.conf import get_cms_setting
+from cms.utils.helpers import get_header_name, get_timezone_name
+
+
+def _get_plugin_tree(instance):
+    """
+    Returns a list of the given «instance» and all its descendants or None if
+    the descendants are not known (the plugin was not loaded as part of a
+    plugin tree).
+    """
+    if instance.child_plugin_instances is None:
+        return None
+
+    plugins = [instance]
+
+    for child in instance.child_plugin_instances:
+        descendants = _get_plugin_tree(child)
+
+        if descendants is None:
+            return None
+        plugins.extend(descendants)
+    return plugins
+
+
+def _get_plugin_tree_version(plugins):
+    """
+    Returns a digest of the state of the given plugin tree.
+    """
+    tree_state = "|".join(
+        f"{plugin.pk}:{plugin.position}:{plugin.changed_date.timestamp() if plugin.changed_date else ''}"
+        for plugin in plugins
+    )
+    return hashlib.sha1(tree_state.encode("utf-8")).hexdigest()
+
+
+def get_plugin_cache_expirations(instance, placeholder, request):
+    """
+    Returns a dictionary mapping the pks of «instance» and of all its
+    descendants to the number of seconds the rendered plugin (including
+    its children) can be cached, see ``get_plugin_cache_expiration``. The
+    tree is walked once, the expiration of a plugin is derived from the
+    ones of its children.
+    """
+    expirations = {}
+
+    if not get_cms_setting("PLUGIN_CACHE"):
+        expirations[instance.pk] = EXPIRE_NOW
+        return expirations
+
+    response_timestamp = now()
+    max_ttl = min(get_cms_setting("CACHE_DURATIONS")["content"], MAX_EXPIRATION_TTL)
+
+    def get_expiration(plugin_instance):
+        if plugin_instance.child_plugin_instances is None:
+            # The descendants are not known
+            ttl = EXPIRE_NOW
+        else:
+            ttl = max_ttl
+
+            for child in plugin_instance.child_plugin_instances:
+                ttl = min(ttl, get_expiration(child))
+
+        pk = plugin_instance.pk
+        plugin_instance, plugin = plugin_instance.get_plugin_instance()
+
+        if not plugin_instance or not plugin.cache:
+            ttl = EXPIRE_NOW
+        elif ttl > 0:
+            plugin_ttl = placeholder.get_plugin_cache_ttl(request, plugin_instance, plugin, response_timestamp)
+
+            if plugin_ttl is not None:
+                ttl = min(ttl, plugin_ttl)
+
+        expirations[pk] = ttl if ttl > 0 else EXPIRE_NOW
+        return expirations[pk]
+
+    get_expiration(instance)
+    return expirations
+
+
+def get_plugin_cache_expiration(instance, placeholder, request):
+    """
+    Returns the number of seconds the rendered «instance» (including its
+    children) can be cached. Returns EXPIRE_NOW if the plugin or any of its
+    descendants is not cacheable.
+    """
+    return get_plugin_cache_expirations(instance, placeholder, request)[instance.pk]
+
+
+def get_plugin_vary_cache_on(instance, placeholder, request):
+    """
+    Returns a sorted list of VARY header-names declared by the given
+    «instance» and its descendants.
+    """
+    vary_list = set()
+
+    for plugin_instance in _get_plugin_tree(instance) or []:
+        plugin_instance, plugin = plugin_instance.get_plugin_instance()
+
+        if not plugin_instance:
+            continue
+
+        vary_on = plugin.get_vary_cache_on(request, plugin_instance, placeholder)
+
+        if not vary_on:
+            continue
+
+        if isinstance(vary_on, str):
+            vary_on = [vary_on]
+
+        try:
+            vary_list.update(item.lower() for item in vary_on)
+        except (TypeError, AttributeError):
+            # Same as for placeholders: unexpected values are ignored
+            continue
+    return sorted(vary_list)
+
+
+def _get_plugin_cache_key(instance, placeholder, lang, site_id, request, version=None):
+    """
+    Returns the fully-addressed cache key for the given plugin and request.
+
+    «version» is the placeholder's cache version. Pass it if it is already
+    known to save a cache lookup.
+    """
+    prefix = get_cms_setting("CACHE_PREFIX")
+    if version is None:
+        version, _vary_on_list = _get_placeholder_cache_version(placeholder, lang, site_id)
+    tree_version = _get_plugin_tree_version(_get_plugin_tree(instance))
+    tz = get_timezone_name()
+    cache_key = (
+        f"{prefix}|render_plugin|id:{instance.pk}|lang:{lang}|site:{site_id}|tz:{tz}"
+        f"|v:{version}|tree:{tree_version}"
+    )
+
+    sub_key_list = []
+    for key in get_plugin_vary_cache_on(instance, placeholder, request):
+        value = request.META.get(get_header_name(key)) or "_"
+        sub_key_list.append(key + ":" + value)
+
+    if sub_key_list:
+        cache_key += "|" + "|".join(sub_key_list)
+
+    # See _get_placeholder_cache_key for why keys are hashed below 250 characters.
+    if len(cache_key) > 200:
+        cache_key = "{prefix}|{hash}".format(
+            prefix=prefix,
+            hash=hashlib.sha1(cache_key.encode("utf-8")).hexdigest(),
+        )
+    return cache_key
+
+
+def set_plugin_cache(instance, placeholder, lang, site_id, content, request, duration, version=None):
+    """
+    Sets the plugin fragment cache with the rendered plugin.
+    """
+    from django.core.cache import cache
+
+    key = _get_plugin_cache_key(instance, placeholder, lang, site_id, request, version=version)
+    cache.set(key, content, duration)
+
+
+def get_plugin_cache(instance, placeholder, lang, site_id, request, version=None):
+    """
+    Returns the rendered plugin from cache respecting the VARY headers
+    of the plugin and its descendants.
+    """
+    from django.core.cache import cache
+
+    key = _get_plugin_cache_key(instance, placeholder, lang, site_id, request, version=version)
+    return cache.get(key)
@@ -7,7 +7,7 @@ from django.utils.functional import SimpleLazyObject
 
 from cms import constants
 from cms.apphook_pool import apphook_pool
-from cms.models import Page, PageContent, PagePermission, PageUrl
+from cms.models import Page, PageContent, PagePermission, PageUrl, PermissionMatcher
 from cms.toolbar.utils import get_object_preview_url, get_toolbar_from_request
 from cms.utils.conf import get_cms_setting
 from cms.utils.i18n import (
@@ -47,29 +47,32 @@ def get_visible_page_contents(request, page_contents: Iterable[PageContent], sit
         # only if he can see unrestricted, otherwise return no pages.
         return page_contents if can_see_unrestricted else []
 
-    restrictions = PagePermission.objects.filter(
-        page_id__in={page_content.page.pk for page_content in page_contents},
-        can_view=True,
-    )
-    restriction_map = {perm.page_id: perm for perm in restrictions}
+    pages = {page_content.page.pk: page_content.page for page_content in page_contents}
+    restrictions = PagePermission.objects.filter(page_id__in=pages, can_view=True)
+    matcher = PermissionMatcher()
+
+    for perm in restrictions:
+        # set internal fk cache to our page with loaded ancestors and descendants
+        PagePermission.page.field.set_cached_value(perm, pages[perm.page_id])
+        matcher.add(perm.get_page_permission_tuple(), perm)
+
+    if not matcher:
+        # No view restrictions, fallback to the project's
+        # CMS_PUBLIC_FOR setting.
+        return page_contents if can_see_unrestricted else []
 
     user_id = request.user.pk
     user_groups = SimpleLazyObject(lambda: frozenset(request.user.groups.values_list("pk", flat=True)))
     is_auth_user = request.user.is_authenticated
 
     def user_can_see_page(page: Page) -> bool:
-        if page.pk in restriction_map:
-            # set internal fk cache to our page with loaded ancestors and descendants
-            PagePermission.page.field.set_cached_value(restriction_map[page.pk], page)
-
         restricted = False
-        for perm in restrictions:
-            if perm.get_page_permission_tuple().contains(page.path):
-                if not is_auth_user:
-                    return False
-                if perm.user_id == user_id or perm.group_id in user_groups:
-                    return True
-                restricted = True
+        for perm in matcher.get_matches(page.path):
+            if not is_auth_user:
+                return False
+            if perm.user_id == user_id or perm.group_id in user_groups:
+                return True
+            restricted = True
 
         # Page has no view restrictions, fallback to the project's
         # CMS_PUBLIC_FOR setting.
@@ -290,6 +293,7 @@ class CMSMenu(Menu):
                 "in_navigation",
                 "page__site_id",
                 "page__parent_id",
+                "page__path",
                 "page__is_home",
                 "page__login_required",
                 "page__reverse_id",
@@ -87,3 +87,7 @@ class PlaceholderNotFound(Exception):
 
 class ConfirmationOfVersion4Required(Exception):
     pass
+
+
+class UserRequiredError(ValueError):
+    """A user is needed to create objects, but none was given."""
@@ -7,6 +7,9 @@ from .subcommands.check import CheckInstallation
 from .subcommands.copy import CopyCommand
 from .subcommands.delete_orphaned_plugins import DeleteOrphanedPluginsCommand
 from .subcommands.list import ListCommand
+from .subcommands.page_export import ExportPagesCommand
+from .subcommands.page_import import ImportPagesCommand
+from .subcommands.search_index import RebuildSearchIndexCommand
 from .subcommands.tree import FixTreeCommand
 from .subcommands.uninstall import UninstallCommand
 
@@ -17,8 +20,11 @@ class Command(SubcommandsCommand):
         ('check', CheckInstallation),
         ('copy', CopyCommand),
         ('delete-orphaned-plugins', DeleteOrphanedPluginsCommand),
+        ('export-pages', ExportPagesCommand),
         ('fix-tree', FixTreeCommand),
+        ('import-pages', ImportPagesCommand),
         ('list', ListCommand),
+        ('rebuild-search-index', RebuildSearchIndexCommand),
         ('uninstall', UninstallCommand),
     ))
     missing_args_message = 'one of the available sub commands must be provided'
@@ -4,10 +4,11 @@ from django.contrib.sites.models import Site
 from django.core.management import CommandError
 from django.db import transaction
 
-from cms.api import copy_plugins_to_language
+from cms.exceptions import UserRequiredError
 from cms.management.commands.subcommands.base import SubcommandsCommand
-from cms.models import EmptyPageContent, Page, PageContent
+from cms.models import Page, PageContent
 from cms.utils import get_language_list
+from cms.utils.language_copy import COPY_BATCH_SIZE, copy_pages_to_language
 from cms.utils.plugins import copy_plugins_to_placeholder
 
 User = get_user_model()
@@ -51,13 +52,26 @@ class CopyLangCommand(SubcommandsCommand):
         parser.add_argument("--username", type=str, dest='username', default="",
                             help="Username of user needed create new content objects")
         parser.add_argument("--userid", type=int, help="User id of user needed create new content objects")
+        parser.add_argument('--batch-size', type=int, dest='batch_size', default=COPY_BATCH_SIZE,
+                            help='Number of pages copied in one transaction.')
+        parser.add_argument('--resume-after', type=int, dest='resume_after', default=0,
+                            help='Id of the last page copied by an interrupted run; only pages with a '
+                                 'greater id are copied.')
 
     def handle(self, *args, **options):
+        """
+        Copies the pages of the site in chunks of ``--batch-size`` pages
+        ordered by id, each in its own transaction. If the command is
+        interrupted, it can be resumed with ``--resume-after`` and the id
+        of the last page reported.
+        """
         verbose = options.get('verbosity') > 1
         only_empty = options.get('only_empty')
         copy_content = options.get('copy_content')
         from_lang = options.get('from_lang')
         to_lang = options.get('to_lang')
+        batch_size = options.get('batch_size') or COPY_BATCH_SIZE
+        last_page_id = options.get('resume_after') or 0
         user = get_user(options)
 
         try:
@@ -71,39 +85,49 @@ class CopyLangCommand(SubcommandsCommand):
         except AssertionError:
             raise CommandError('Both languages have to be present in settings.LANGUAGES and settings.CMS_LANGUAGES')
 
-        for page in Page.objects.on_site(site):
-            # copy title
-            if from_lang in page.get_languages():
-
-                title = page.get_content_obj(to_lang, fallback=False)
-                if isinstance(title, EmptyPageContent):
-                    title = page.get_content_obj(from_lang)
-                    if verbose:
-                        self.stdout.write(f'copying page content {title.title} from language {from_lang}\n')
-                    if not user:
-                        raise CommandError('Specify either --userid or --username')
-                    from django.forms import model_to_dict
-                    new_title = model_to_dict(title)
-                    new_title.pop("id", None)  # No PK
-                    new_title["language"] = to_lang
-                    new_title["page"] = page
-                    PageContent.objects.with_user(user).create(**new_title)
-
-                if copy_content:
-                    # copy plugins using API
-                    if verbose:
-                        self.stdout.write(
-                            f'copying plugins for {page.get_page_title(from_lang)} from {from_lang}\n'
-                        )
-                    copy_plugins_to_language(page, from_lang, to_lang, only_empty)
-            else:
-                if verbose:
-                    self.stdout.write(
-                        f'Skipping page {page.get_page_title(page.get_languages()[0])}, language {from_lang} not defined\n'
+        pages = Page.objects.on_site(site).order_by('pk')
+        total = pages.filter(pk__gt=last_page_id).count()
+        done = 0
+
+        while True:
+            chunk = list(pages.filter(pk__gt=last_page_id)[:batch_size])
+
+            if not chunk:
+                break
+
+            if verbose:
+                self._report_skipped_pages(chunk, from_lang)
+
+            try:
+                with transaction.atomic():
+                    created, copied = copy_pages_to_language(
+                        chunk, from_lang, to_lang, user=user, only_empty=only_empty, copy_content=copy_content,
                     )
+            except UserRequiredError:
+                raise CommandError('Specify either --userid or --username')
+
+            done += len(chunk)
+            last_page_id = chunk[-1].pk
+
+            if verbose:
+                self.stdout.write(f'{created} page contents created, {copied} plugins copied\n')
+            self.stdout.write(f'    {done}/{total} pages copied, last page id {last_page_id}\n')
 
         self.stdout.write('all done')
 
+    def _report_skipped_pages(self, pages, from_lang):
+        translated = set(
+            PageContent.admin_manager
+            .current_content(page__in=pages, language=from_lang)
+            .values_list('page', flat=True)
+        )
+
+        for page in pages:
+            if page.pk not in translated:
+                self.stdout.write(
+                    f'Skipping page {page.get_page_title(page.get_languages()[0])}, language {from_lang} not defined\n'
+                )
+
 
 class CopySiteCommand(SubcommandsCommand):
     help_string = 'Duplicate the CMS pagetree from a specific SITE_ID.'
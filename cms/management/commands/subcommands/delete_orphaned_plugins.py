@@ -1,7 +1,69 @@
+from collections import defaultdict
+
+from django.db import transaction
+
 from cms.management.commands.subcommands.list import plugin_report
+from cms.models import CMSPlugin, Placeholder
 
 from .base import SubcommandsCommand
 
+# Number of plugins deleted at once
+DELETE_CHUNK_SIZE = 500
+
+
+def get_plugin_chunks(plugins, chunk_size=DELETE_CHUNK_SIZE):
+    """
+    Yields the ``(pk, placeholder_id, language)`` tuples of «plugins» in
+    chunks of «chunk_size», ordered by primary key. Each chunk is read with
+    one query starting after the last primary key of the previous chunk, so
+    the plugins of a chunk can be deleted before the next one is read.
+    """
+    plugins = plugins.order_by('pk').values_list('pk', 'placeholder_id', 'language')
+    last_pk = 0
+
+    while True:
+        chunk = list(plugins.filter(pk__gt=last_pk)[:chunk_size])
+
+        if not chunk:
+            break
+
+        yield chunk
+        last_pk = chunk[-1][0]
+
+
+def delete_plugin_chunk(chunk):
+    """
+    Deletes the plugins of «chunk» (as yielded by ``get_plugin_chunks``) and
+    their descendants with one delete per placeholder. Positions are left as
+    they are, returns the affected ``(placeholder_id, language)`` pairs.
+    """
+    plugin_ids = defaultdict(list)
+
+    for pk, placeholder_id, language in chunk:
+        plugin_ids[placeholder_id].append(pk)
+
+    with transaction.atomic():
+        for placeholder_id, pks in plugin_ids.items():
+            CMSPlugin.objects.filter(placeholder_id=placeholder_id, pk__in=pks).delete()
+    return {(placeholder_id, language) for pk, placeholder_id, language in chunk if placeholder_id}
+
+
+def compact_plugin_positions(placeholder_languages):
+    """
+    Closes the gaps left by deleted plugins in the plugin trees of the given
+    ``(placeholder_id, language)`` pairs.
+    """
+    languages = defaultdict(set)
+
+    for placeholder_id, language in placeholder_languages:
+        languages[placeholder_id].add(language)
+
+    for placeholder in Placeholder.objects.filter(pk__in=languages):
+        for language in sorted(languages[placeholder.pk]):
+            with transaction.atomic():
+                placeholder._shift_plugin_positions(language, start=1)
+                placeholder._recalculate_plugin_positions(language)
+
 
 class DeleteOrphanedPluginsCommand(SubcommandsCommand):
     help_string = ('Delete plugins from the CMSPlugins table that should have instances '
@@ -9,6 +71,12 @@ class DeleteOrphanedPluginsCommand(SubcommandsCommand):
                    'longer be found')
     command_name = 'delete-orphaned-plugins'
 
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', dest='dry_run', default=False,
+                            help='Only count the orphaned plugins, nothing is deleted')
+        parser.add_argument('--chunk-size', type=int, dest='chunk_size', default=DELETE_CHUNK_SIZE,
+                            help='Number of plugins deleted at once')
+
     def handle(self, *args, **options):
         """
         Obtains a plugin report -
@@ -17,6 +85,9 @@ class DeleteOrphanedPluginsCommand(SubcommandsCommand):
         longer installed, and ones that have no corresponding saved plugin
         instances (as will happen if a plugin is inserted into a placeholder,
         but not saved).
+
+        Orphaned plugins are deleted in chunks, the positions of the plugins
+        left in the affected placeholders are re-calculated once at the end.
         """
         self.stdout.write('Obtaining plugin report\n')
         uninstalled_instances = []
@@ -24,38 +95,46 @@ class DeleteOrphanedPluginsCommand(SubcommandsCommand):
 
         for plugin in plugin_report():
             if not plugin['model']:
-                for instance in plugin['instances']:
-                    uninstalled_instances.append(instance)
+                uninstalled_instances.append(plugin['instances'])
+            else:
+                unsaved_instances.append(plugin['unsaved_instances'])
+
+        uninstalled_count = sum(plugins.count() for plugins in uninstalled_instances)
+        unsaved_count = sum(plugins.count() for plugins in unsaved_instances)
 
-            for instance in plugin['unsaved_instances']:
-                unsaved_instances.append(instance)
+        if options.get('dry_run'):
+            self.stdout.write(
+                f'Found instances of: \n    {uninstalled_count} uninstalled plugins  \n    {unsaved_count} plugins with unsaved instances\n'
+            )
+            self.stdout.write('dry run, nothing deleted\n')
+            return
 
         if options.get('interactive'):
             confirm = input("""
 You have requested to delete any instances of uninstalled plugins and empty plugin instances.
 There are %d uninstalled plugins and %d empty plugins.
 Are you sure you want to do this?
-Type 'yes' to continue, or 'no' to cancel: """ % (len(uninstalled_instances), len(unsaved_instances)))
+Type 'yes' to continue, or 'no' to cancel: """ % (uninstalled_count, unsaved_count))
         else:
             confirm = 'yes'
 
         if confirm == 'yes':
             # delete items whose plugin is uninstalled and items with unsaved instances
             self.stdout.write('... deleting any instances of uninstalled plugins and empty plugin instances\n')
+            total = uninstalled_count + unsaved_count
+            deleted = 0
+            placeholder_languages = set()
 
-            for instance in uninstalled_instances:
-                if instance.placeholder:
-                    instance.placeholder.delete_plugin(instance)
-                else:
-                    instance.delete()
+            for plugins in uninstalled_instances + unsaved_instances:
+                for chunk in get_plugin_chunks(plugins, chunk_size=options['chunk_size']):
+                    placeholder_languages |= delete_plugin_chunk(chunk)
+                    deleted += len(chunk)
+                    self.stdout.write(f'    {deleted}/{total} plugins deleted\n')
 
-            for instance in unsaved_instances:
-                if instance.placeholder:
-                    instance.placeholder.delete_plugin(instance)
-                else:
-                    instance.delete()
+            self.stdout.write(f'... re-calculating plugin positions of {len(placeholder_languages)} plugin trees\n')
+            compact_plugin_positions(placeholder_languages)
 
             self.stdout.write(
-                f'Deleted instances of: \n    {len(uninstalled_instances)} uninstalled plugins  \n    {len(unsaved_instances)} plugins with unsaved instances\n'
+                f'Deleted instances of: \n    {uninstalled_count} uninstalled plugins  \n    {unsaved_count} plugins with unsaved instances\n'
             )
             self.stdout.write('all done\n')
@@ -1,3 +1,5 @@
+from django.db.models import Exists, OuterRef
+
 from cms.models import Page
 from cms.models.pluginmodel import CMSPlugin
 from cms.plugin_pool import plugin_pool
@@ -48,48 +50,65 @@ def plugin_report():
             'unsaved_instances': those with no corresponding model instance,
         },
     ]
+
+    ``instances`` and ``unsaved_instances`` are (lazy) querysets ordered by
+    primary key. Unsaved instances are found with one anti-join against the
+    table of the plugin model, plugin instances are never loaded.
     """
     plugin_report = []
-    all_plugins = CMSPlugin.objects.order_by('plugin_type')
-    plugin_types = list(set(all_plugins.values_list('plugin_type', flat=True)))
-    plugin_types.sort()
+    plugin_types = (
+        CMSPlugin.objects
+        .order_by('plugin_type')
+        .values_list('plugin_type', flat=True)
+        .distinct()
+    )
 
     for plugin_type in plugin_types:
         plugin = {}
         plugin['type'] = plugin_type
+        plugins = CMSPlugin.objects.filter(plugin_type=plugin_type).order_by('pk')
+        plugin['instances'] = plugins
+
         try:
-            # get all plugins of this type
-            plugins = CMSPlugin.objects.filter(plugin_type=plugin_type)
-            plugin['instances'] = plugins
             # does this plugin have a model? report unsaved instances
             plugin['model'] = plugin_pool.get_plugin(name=plugin_type).model
-            unsaved_instances = [p for p in plugins if not p.get_plugin_instance()[0]]
-            plugin['unsaved_instances'] = unsaved_instances
-
         # catch uninstalled plugins
         except KeyError:
             plugin['model'] = None
-            plugin['instances'] = plugins
-            plugin['unsaved_instances'] = []
+            plugin['unsaved_instances'] = plugins.none()
+        else:
+            plugin['unsaved_instances'] = get_unsaved_instances(plugins, plugin['model'])
 
         plugin_report.append(plugin)
 
     return plugin_report
 
 
+def get_unsaved_instances(plugins, plugin_model):
+    """
+    Returns the plugins of «plugins» which have no row in the table of
+    «plugin_model».
+    """
+    if plugin_model is CMSPlugin:
+        # Model-less plugins are saved with the plugin
+        return plugins.none()
+    return plugins.filter(~Exists(plugin_model._base_manager.filter(pk=OuterRef('pk'))))
+
+
 class ListPluginsCommand(SubcommandsCommand):
     help_string = 'Lists all plugins in CMSPlugin'
     command_name = 'plugins'
 
     def handle(self, *args, **options):
         self.stdout.write('==== Plugin report ==== \n\n')
-        self.stdout.write('There are %s plugin types in your database \n' % len(plugin_report()))
-        for plugin in plugin_report():
+        report = plugin_report()
+        self.stdout.write('There are %s plugin types in your database \n' % len(report))
+        for plugin in report:
             self.stdout.write('\n%s \n' % plugin['type'])
 
             plugin_model = plugin['model']
-            instances = len(plugin['instances'])
-            unsaved_instances = len(plugin['unsaved_instances'])
+            instances = plugin['instances'].count()
+            unsaved_instances = plugin['unsaved_instances'].count()
 
             if not plugin_model:
                 self.stdout.write(self.style.ERROR('  ERROR      : not installed \n'))
@@ -0,0 +1,45 @@
+from django.contrib.sites.models import Site
+from django.core.management import CommandError
+
+from cms.models import Page
+from cms.utils.page_export import EXPORT_BATCH_SIZE, export_pages, write_page_records
+
+from .base import SubcommandsCommand
+
+
+class ExportPagesCommand(SubcommandsCommand):
+    help_string = 'Exports pages to a newline delimited JSON file'
+    command_name = 'export-pages'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='File to export the pages to, "-" for the standard output')
+        parser.add_argument('--site', type=int, dest='site', help='Site to export the pages of')
+        parser.add_argument('--root', type=int, dest='root',
+                            help='Page to export along with its descendants, all pages of the site by default')
+        parser.add_argument('--batch-size', type=int, dest='batch_size', default=EXPORT_BATCH_SIZE,
+                            help='Number of pages read at once')
+
+    def handle(self, *args, **options):
+        root = site = None
+
+        if options['root']:
+            try:
+                root = Page.objects.get(pk=options['root'])
+            except Page.DoesNotExist:
+                raise CommandError(f"No page with id {options['root']} found")
+
+        if options['site']:
+            try:
+                site = Site.objects.get(pk=options['site'])
+            except Site.DoesNotExist:
+                raise CommandError(f"No site with id {options['site']} found")
+
+        records = export_pages(site=site, root=root, batch_size=options['batch_size'])
+
+        if options['path'] == '-':
+            write_page_records(records, self.stdout)
+            return
+
+        with open(options['path'], 'w', encoding='utf-8') as stream:
+            count = write_page_records(records, stream)
+        self.stdout.write(f'{count} pages exported\n')
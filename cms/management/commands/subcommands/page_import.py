@@ -0,0 +1,65 @@
+import sys
+
+from django.contrib.sites.models import Site
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.core.management import CommandError
+
+from cms.api import import_pages
+from cms.models import Page
+from cms.utils.page_import import IMPORT_BATCH_SIZE, read_page_records
+
+from .base import SubcommandsCommand
+from .copy import get_user
+
+
+class ImportPagesCommand(SubcommandsCommand):
+    help_string = 'Imports pages from a JSON or newline delimited JSON file'
+    command_name = 'import-pages'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='File to import the pages from, "-" for the standard input')
+        parser.add_argument('--site', type=int, dest='site', help='Site to import the pages to')
+        parser.add_argument('--parent', type=int, dest='parent',
+                            help='Page to add the imported pages to, they are added as root pages by default')
+        parser.add_argument('--batch-size', type=int, dest='batch_size', default=IMPORT_BATCH_SIZE,
+                            help='Number of pages imported in one transaction')
+        parser.add_argument("--username", type=str, dest='username', default="",
+                            help="Username of the user creating the pages")
+        parser.add_argument("--userid", type=int, help="User id of the user creating the pages")
+
+    def handle(self, *args, **options):
+        parent = site = None
+
+        if options['parent']:
+            try:
+                parent = Page.objects.get(pk=options['parent'])
+            except Page.DoesNotExist:
+                raise CommandError(f"No page with id {options['parent']} found")
+
+        if options['site']:
+            try:
+                site = Site.objects.get(pk=options['site'])
+            except Site.DoesNotExist:
+                raise CommandError(f"No site with id {options['site']} found")
+
+        user = get_user(options)
+
+        if options['path'] == '-':
+            stream = sys.stdin
+        else:
+            stream = open(options['path'], encoding='utf-8')
+
+        try:
+            count = import_pages(
+                read_page_records(stream),
+                site=site,
+                parent=parent,
+                created_by=user or 'import-pages',
+                batch_size=options['batch_size'],
+            )
+        except (FieldDoesNotExist, ValidationError, ValueError) as error:
+            raise CommandError(f'Import failed: {error}')
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+        self.stdout.write(f'{count} pages imported\n')
@@ -0,0 +1,17 @@
+from django.core.management import CommandError
+
+from cms.utils.search import get_search_backend, rebuild_search_index
+
+from .base import SubcommandsCommand
+
+
+class RebuildSearchIndexCommand(SubcommandsCommand):
+    help_string = 'Rebuilds the search documents of all pages'
+    command_name = 'rebuild-search-index'
+
+    def handle(self, *args, **options):
+        if get_search_backend() is None:
+            raise CommandError('The search index is not enabled, see the CMS_SEARCH_INDEX setting.')
+
+        count = rebuild_search_index()
+        self.stdout.write(f'{count} page contents indexed\n')
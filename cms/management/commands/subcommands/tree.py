@@ -1,25 +1,113 @@
-from collections import OrderedDict
+from collections import defaultdict
 
-from django.db import IntegrityError
+from django.db import transaction
+from django.db.models import CharField, Value
+from django.db.models.functions import Cast, Concat
 
 from cms.models.pagemodel import Page, PageUrl
+from cms.utils.i18n import get_fallback_languages
 
 from .base import SubcommandsCommand
 
+# Number of pages or urls written with one UPDATE
+FIX_TREE_BATCH_SIZE = 500
 
-def get_descendants(root):
+
+def get_fixed_tree(rows):
+    """
+    Rebuilds the page tree from the ``(pk, parent_id, site_id, path)`` tuples
+    of all pages. Root pages are ordered by site and path, children by path;
+    the (possibly corrupt) paths only serve to keep the order.
+
+    Returns a dictionary mapping the primary keys of the pages to
+    ``(path, depth, numchild)`` tuples in tree order, and the primary keys
+    of the pages which became root pages because their ancestors form a
+    cycle.
+
+    Unlike treebeard's ``fix_tree``, this also closes gaps and repairs the
+    order of the paths.
+    """
+    rows = sorted(rows, key=lambda row: (row[2], row[3], row[0]))
+    pks = {row[0] for row in rows}
+    children = defaultdict(list)
+    roots = []
+
+    for pk, parent_id, site_id, path in rows:
+        if parent_id in pks:
+            children[parent_id].append(pk)
+        else:
+            roots.append(pk)
+
+    tree = {}
+
+    for position, pk in enumerate(roots, start=1):
+        _add_branch(tree, children, pk, Page._get_path("", 1, position))
+
+    detached = []
+
+    for pk, parent_id, site_id, path in rows:
+        if pk not in tree:
+            # The page's ancestors form a cycle, it becomes a root page
+            detached.append(pk)
+            children[parent_id].remove(pk)
+            _add_branch(tree, children, pk, Page._get_path("", 1, len(roots) + len(detached)))
+    return tree, detached
+
+
+def _add_branch(tree, children, pk, path):
+    stack = [(pk, path)]
+
+    while stack:
+        pk, path = stack.pop()
+        tree[pk] = (path, len(path) // Page.steplen, len(children[pk]))
+
+        for position in range(len(children[pk]), 0, -1):
+            stack.append((children[pk][position - 1], path + Page._get_path("", 1, position)))
+
+
+def get_fixed_url_paths(pages, tree, urls):
     """
-    Returns a generator of primary keys which represent
-    descendants of the given node ID (root_id)
+    Returns the url paths of the managed urls of «urls» according to the
+    page tree «tree» (see ``get_fixed_tree``) as a dictionary mapping the
+    primary keys of the urls to their path. «pages» maps the primary keys
+    of the pages to ``(parent_id, site_id, is_home)`` tuples, «urls» is a
+    list of ``(pk, page_id, language, slug, path, managed)`` tuples.
+
+    The path of a url is based on the path of the parent page's url in the
+    same language or, if missing, in one of its fallback languages.
     """
-    # Note this is done because get_descendants() can't be trusted
-    # as the tree can be corrupt.
-    children = Page.objects.filter(parent=root).order_by('path')
+    urls_by_page = defaultdict(list)
+
+    for url in urls:
+        urls_by_page[url[1]].append(url)
+
+    paths = {}
+    new_paths = defaultdict(dict)
+
+    for page_id in tree:
+        parent_id, site_id, is_home = pages[page_id]
+
+        for pk, _page_id, language, slug, path, managed in urls_by_page[page_id]:
+            if managed and not is_home:
+                if parent_id is None:
+                    path = slug
+                else:
+                    languages = [language, *get_fallback_languages(language, site_id=site_id)]
+                    base = next(
+                        (new_paths[parent_id][lang] for lang in languages if lang in new_paths[parent_id]),
+                        None,
+                    )
 
-    for child in children.iterator():
-        yield child
+                    if base is not None:
+                        path = f"{base}/{slug}" if base else slug
+                paths[pk] = path
+            new_paths[page_id][language] = path
+    return paths
 
-        yield from get_descendants(child)
+
+def _get_batches(items, batch_size=FIX_TREE_BATCH_SIZE):
+    for offset in range(0, len(items), batch_size):
+        yield items[offset:offset + batch_size]
 
 
 class FixTreeCommand(SubcommandsCommand):
@@ -29,82 +117,55 @@ class FixTreeCommand(SubcommandsCommand):
     def handle(self, *args, **options):
         """
         Repairs the tree
+
+        The tree is loaded with one query, rebuilt in memory and written
+        back in batches. Only pages and urls which changed are written.
         """
         self.stdout.write('fixing page tree')
-        Page.fix_tree()
+        rows = list(Page.objects.values_list('pk', 'parent_id', 'site_id', 'path', 'depth', 'numchild', 'is_home'))
+        tree, detached = get_fixed_tree([row[:4] for row in rows])
+        pages = {pk: (None if pk in detached else parent_id, site_id, is_home)
+                 for pk, parent_id, site_id, path, depth, numchild, is_home in rows}
 
-        root_pages = Page.objects.filter(parent__isnull=True)
+        with transaction.atomic():
+            self._update_pages(rows, tree, detached)
 
-        last = None
+        if detached:
+            self.stdout.write(f'{len(detached)} page(s) in a parent cycle moved to the root level')
 
-        try:
-            first = root_pages.order_by('path').first()
-        except IndexError:
-            first = None
+        self.stdout.write('fixing page URLs')
+        urls = list(PageUrl.objects.values_list('pk', 'page_id', 'language', 'slug', 'path', 'managed'))
+        paths = get_fixed_url_paths(pages, tree, urls)
+        changed = defaultdict(list)
 
-        for page in root_pages.order_by('site__pk', 'path'):
-            if last:
-                last.refresh_from_db()
-                page.refresh_from_db()
-                page.move(target=last, pos='right')
-            elif first and first.pk != page.pk:
-                page.move(target=first, pos='left')
-            last = page
+        for pk, page_id, language, slug, path, managed in urls:
+            if pk in paths and paths[pk] != path:
+                changed[language].append(PageUrl(pk=pk, path=paths[pk]))
 
-        for root in root_pages.order_by('site__pk', 'path'):
-            self._update_descendants_tree(root)
-
-        self.stdout.write('fixing page URLs')
-        for page in root_pages:
-            for language in page.get_languages():
-                if not page.is_home:
-                    page._update_url_path(language)
-                self._update_url_path_recursive(page, language)
+        with transaction.atomic():
+            for language in sorted(changed):
+                PageUrl.objects.bulk_update(changed[language], ['path'], batch_size=FIX_TREE_BATCH_SIZE)
 
         self.stdout.write('all done')
 
-    def _update_descendants_tree(self, root):
-        pages = Page.objects.all()
-        descendants_by_parent = OrderedDict()
+    def _update_pages(self, rows, tree, detached):
+        changed = []
+        moved = []
 
-        for descendant in get_descendants(root):
-            parent_id = descendant.parent_id
-            descendants_by_parent.setdefault(parent_id, []).append(descendant)
+        for pk, parent_id, site_id, path, depth, numchild, is_home in rows:
+            if tree[pk] != (path, depth, numchild):
+                new_path, new_depth, new_numchild = tree[pk]
+                changed.append(Page(pk=pk, path=new_path, depth=new_depth, numchild=new_numchild))
 
-        for tree in descendants_by_parent.values():
-            last_page = None
+                if new_path != path:
+                    moved.append(pk)
 
-            for page in tree:
-                page.refresh_from_db()
+        # Paths are unique: move the pages out of the way before writing the
+        # new paths. Treebeard paths never contain "~".
+        for batch in _get_batches(moved):
+            Page.objects.filter(pk__in=batch).update(path=Concat(Value('~'), Cast('pk', output_field=CharField())))
 
-                if last_page:
-                    # This is not the first loop so this is not the first draft
-                    # child. Set this page a sibling of the last processed
-                    # draft page.
-                    last_page.refresh_from_db()
-                    page.move(target=last_page, pos='right')
-                else:
-                    # This is the first time through the loop so this is the first
-                    # draft child for this parent.
-                    page.move(target=pages.get(pk=tree[0].parent_id), pos='first-child')
-                last_page = page
-
-    def _update_url_path_recursive(self, page, language):
-        if page.node.is_leaf() or language not in page.get_languages():
-            return
-
-        pages = page.get_child_pages()
-        base_path = page.get_path(language)
-        new_path = page._get_path_sql_value(base_path)
-
-        try:
-            (PageUrl
-             .objects
-             .filter(language=language, page__in=pages)
-             .exclude(managed=False)
-             .update(path=new_path))
-        except IntegrityError as exc:
-            self.stdout.write(f"{exc} while updating path for page: /{language}/{new_path}")
-
-        for child in pages.filter(urls__language=language).iterator():
-            self._update_url_path_recursive(child, language)
+        Page.objects.bulk_update(changed, ['path', 'depth', 'numchild'], batch_size=FIX_TREE_BATCH_SIZE)
+
+        for batch in _get_batches(detached):
+            Page.objects.filter(pk__in=batch).update(parent=None)
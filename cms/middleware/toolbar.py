@@ -98,6 +98,9 @@ class ToolbarMiddleware:
 
             if toolbar._cache_disabled:
                 add_never_cache_headers(response)
+
+        if profiler := getattr(request, '_cms_render_profiler', None):
+            response = profiler.process_response(response)
         return response
 
     def __call__(self, request):
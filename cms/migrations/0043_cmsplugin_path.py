@@ -0,0 +1,53 @@
+from django.db import migrations, models
+from django.db.models.functions import Cast, Concat
+
+BATCH_SIZE = 500
+
+
+def set_plugin_paths(apps, schema_editor):
+    CMSPlugin = apps.get_model("cms", "CMSPlugin")
+    plugins = CMSPlugin.objects.using(schema_editor.connection.alias)
+
+    # Children of root plugins
+    plugins.filter(parent__isnull=False, parent__parent__isnull=True).update(
+        path=Concat(Cast("parent_id", models.CharField()), models.Value("/"), output_field=models.CharField()),
+    )
+
+    # Children of plugins whose path is known, a batch of parents at a time.
+    # Paths are set once, so the updated plugins drop out of the query.
+    pending = plugins.filter(path="", parent__isnull=False).exclude(parent__path="")
+
+    while True:
+        parents = list(
+            pending.order_by("parent_id").values_list("parent_id", "parent__path").distinct()[:BATCH_SIZE]
+        )
+
+        if not parents:
+            break
+
+        pending.filter(parent_id__in=[parent_id for parent_id, path in parents]).update(
+            path=models.Case(
+                *(
+                    models.When(parent_id=parent_id, then=models.Value(f"{path}{parent_id}/"))
+                    for parent_id, path in parents
+                ),
+                output_field=models.CharField(),
+            ),
+        )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("cms", "0042_remove_placeholderreference_placeholder_ref_and_more"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="cmsplugin",
+            name="path",
+            field=models.CharField(
+                blank=True, db_index=True, default="", editable=False, max_length=512, verbose_name="path"
+            ),
+        ),
+        migrations.RunPython(set_plugin_paths, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,54 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def has_fts5(connection):
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT sqlite_compileoption_used('ENABLE_FTS5')")
+        return bool(cursor.fetchone()[0])
+
+
+def create_sqlite_search_table(apps, schema_editor):
+    # Documents are matched in a full text index on SQLite, see
+    # cms.utils.search.SQLiteSearchBackend. Without FTS5, the portable
+    # backend is used.
+    if schema_editor.connection.vendor == "sqlite" and has_fts5(schema_editor.connection):
+        schema_editor.execute("CREATE VIRTUAL TABLE cms_pagesearchdocument_fts USING fts5(title, text)")
+
+
+def drop_sqlite_search_table(apps, schema_editor):
+    if schema_editor.connection.vendor == "sqlite":
+        schema_editor.execute("DROP TABLE IF EXISTS cms_pagesearchdocument_fts")
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("cms", "0043_cmsplugin_path"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PageSearchDocument",
+            fields=[
+                ("id", models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("language", models.CharField(db_index=True, max_length=15, verbose_name="language")),
+                ("title", models.CharField(blank=True, max_length=255, verbose_name="title")),
+                ("text", models.TextField(blank=True, verbose_name="text")),
+                (
+                    "page",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="search_documents",
+                        to="cms.page",
+                        verbose_name="page",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "page search document",
+                "verbose_name_plural": "page search documents",
+                "unique_together": {("page", "language")},
+            },
+        ),
+        migrations.RunPython(create_sqlite_search_table, drop_sqlite_search_table),
+    ]
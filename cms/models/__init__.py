@@ -9,5 +9,6 @@ from .contentmodels import *  # noqa: F401,F403
 from .placeholderpluginmodel import *  # noqa: F401,F403
 from .aliaspluginmodel import *  # noqa: F401,F403
 from .apphooks_reload import *  # noqa: F401,F403
+from .searchmodels import *  # noqa: F401,F403
 # must be last
 from cms import signals as s_import  # noqa: F401
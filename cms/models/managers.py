@@ -34,8 +34,12 @@ class PageManager(MP_NodeManager):
         """Simple search function
 
         Plugins can define a 'search_fields' tuple similar to ModelAdmin classes
+
+        If the search index is enabled (see :mod:`cms.utils.search`), pages
+        are searched in their search documents and ordered by rank.
         """
         from cms.plugin_pool import plugin_pool
+        from cms.utils.search import get_search_backend
 
         qs = self.get_queryset()
 
@@ -43,6 +47,11 @@ class PageManager(MP_NodeManager):
             site = Site.objects.get_current()
             qs = qs.on_site(site)
 
+        search_backend = get_search_backend(using=qs.db)
+
+        if search_backend is not None:
+            return search_backend.search(qs, q, language=language)
+
         qt = Q(pagecontent_set__title__icontains=q)
 
         # find 'searchable' plugins and build query
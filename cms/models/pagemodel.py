@@ -3,12 +3,13 @@ from logging import getLogger
 from os.path import join
 
 from django.contrib.auth import get_user_model
+from django.contrib.contenttypes.models import ContentType
 from django.contrib.sites.models import Site
 from django.db import IntegrityError, models
 from django.db.models import F, Prefetch, Q
 from django.db.models.base import ModelState
 from django.db.models.constraints import UniqueConstraint
-from django.db.models.functions import Concat
+from django.db.models.functions import Concat, Substr
 from django.forms import model_to_dict
 from django.urls import NoReverseMatch, reverse
 from django.utils.encoding import force_str
@@ -259,19 +260,36 @@ class Page(MP_Node):
         return hasattr(self, "_descendants") and hasattr(self, "_ancestors")
 
     def _set_hierarchy(self, pages, ancestors=None):
-        if self.is_branch:
-            self._descendants = [page for page in pages if page.path.startswith(self.path) and page.depth > self.depth]
-        else:
-            self._descendants = []
+        descendants = [page for page in pages if page.depth > self.depth and page.path.startswith(self.path)]
+        self._set_tree_hierarchy([self] + descendants, ancestors=[] if self.is_root() else ancestors or [])
 
-        if self.is_root():
-            self._ancestors = []
-        else:
-            self._ancestors = ancestors
+    @staticmethod
+    def _set_tree_hierarchy(pages, ancestors=()):
+        """
+        Caches the ancestors and descendants of each of the given pages, as
+        returned by :meth:`get_cached_ancestors` and
+        :meth:`get_cached_descendants`, in a single pass.
 
-        for child in self._descendants:
-            if child.depth == self.depth + 1:
-                child._set_hierarchy(self._descendants, ancestors=([self] + self._ancestors))
+        Only pages in «pages» are taken into account. Ancestors are ordered
+        from the parent upwards and followed by «ancestors», the ancestors
+        shared by all pages not in the list. Descendants are ordered by path.
+        """
+        pages = sorted(pages, key=lambda page: page.path)
+        ancestors = list(ancestors)
+        # The open branches, i.e., the ancestors of the current page.
+        # Descendants of a page are contiguous in path order, they end
+        # where the path of a page no longer starts with its path.
+        stack = []
+
+        for index, page in enumerate(pages):
+            while stack and not page.path.startswith(stack[-1][0].path):
+                branch, start = stack.pop()
+                branch._descendants = pages[start + 1:index]
+            page._ancestors = [branch for branch, start in reversed(stack)] + ancestors
+            stack.append((page, index))
+
+        for branch, start in stack:
+            branch._descendants = pages[start + 1:]
 
     def _get_path_sql_value(self, base_path=""):
         if base_path:
@@ -296,20 +314,64 @@ class Page(MP_Node):
             PageUrl.objects.filter(language=language, page=self).exclude(managed=False).update(path=new_path)
         )  # TODO: Update or create?
 
-    def _update_url_path_recursive(self, language):
-        if self.is_leaf() or language not in self.get_languages():
-            return
+    def _get_url_paths(self):
+        """
+        Returns a dictionary mapping languages to the url path of this page
+        as stored in the database.
+        """
+        return dict(PageUrl.objects.filter(page=self).values_list("language", "path"))
 
-        pages = self.get_child_pages()
-        base_path = self.get_path(language)
-        new_path = self._get_path_sql_value(base_path)
+    def _update_descendant_url_paths(self, language, old_path):
+        """
+        Replaces the «old_path» prefix of the managed urls of all descendants
+        with the current path of this page. Runs a single UPDATE regardless
+        of the size of the subtree.
+
+        Only urls whose path starts with «old_path» are rewritten. Managed
+        urls of descendants which are already out of sync with the path of
+        this page are no longer repaired and have to be fixed by saving the
+        affected pages. Descendants with an unmanaged url and their subtrees
+        are left untouched.
+        """
+        new_path = self._get_url_paths().get(language)
 
-        (
-            PageUrl.objects.filter(language=language, page__in=pages).exclude(managed=False).update(path=new_path)
-        )  # TODO: Update or create?
+        if old_path is None or new_path is None or old_path == new_path or self.is_leaf():
+            return
 
-        for child in pages.filter(urls__language=language).iterator():
-            child._update_url_path_recursive(language)
+        descendants = self.get_descendants()
+        # The urls below an unmanaged url are based on its path
+        unmanaged_subtrees = Q()
+
+        for tree_path in descendants.filter(
+            urls__language=language,
+            urls__managed=False,
+        ).values_list("path", flat=True):
+            unmanaged_subtrees |= Q(page__path__startswith=tree_path)
+
+        # The paths of the children of the home page do not include its slug
+        old_prefix = f"{old_path}/" if old_path else ""
+        new_prefix = f"{new_path}/" if new_path else ""
+        # "startswith" is case-insensitive on SQLite and "=" is on MySQL,
+        # combined they only match the prefix as is.
+        (
+            PageUrl.objects.annotate(
+                path_prefix=Substr("path", 1, len(old_prefix)),
+            ).filter(
+                language=language,
+                managed=True,
+                page__in=descendants,
+                path__startswith=old_prefix,
+                path_prefix=old_prefix,
+            ).exclude(
+                unmanaged_subtrees,
+            ).update(
+                path=Concat(
+                    models.Value(new_prefix),
+                    Substr("path", len(old_prefix) + 1),
+                    output_field=models.CharField(),
+                )
+            )
+        )
 
     def _set_title_root_path(self):
         page_tree = self.__class__.get_tree(self)
@@ -419,12 +481,12 @@ class Page(MP_Node):
 
         # Update the urls for the page being moved
         # and is descendants.
-        languages = self.urls.values_list("language", flat=True)
+        old_paths = self._get_url_paths()
 
-        for language in languages:
+        for language, old_path in old_paths.items():
             if not self.is_home:
                 self._update_url_path(language)
-            self._update_url_path_recursive(language)
+            self._update_descendant_url_paths(language, old_path)
         self.clear_cache(menu=True)
         return self
 
@@ -450,6 +512,7 @@ class Page(MP_Node):
     ):
         from cms.models import PageContent
         from cms.utils.page import get_available_slug
+        from cms.utils.search import update_search_index
 
         assert parent_page is None or isinstance(parent_page, Page), f"{parent_page} is not an instance of Page."
         assert isinstance(user, get_user_model()), f"{user} is not an instance of User."
@@ -499,6 +562,8 @@ class Page(MP_Node):
             PageUrl.objects.with_user(user).create(**new_url)
 
         # copy titles of this page
+        new_titles = []
+
         for title in translations.current_content():
             new_title = model_to_dict(title)
             new_title.pop("id", None)  # No PK
@@ -513,6 +578,10 @@ class Page(MP_Node):
                 )
                 placeholder.copy_plugins(new_placeholder, language=new_title.language)
             new_page.page_content_cache[new_title.language] = new_title
+            new_titles.append(new_title)
+
+        # The contents were indexed before their plugins were copied
+        update_search_index(new_titles)
 
         if extensions:
             from cms.extensions import extension_pool
@@ -580,20 +649,214 @@ class Page(MP_Node):
             new_root_page.move(target_page, position)
             new_root_page.refresh_from_db(fields=("path", "depth"))
 
-        pages_by_id = {self.id: new_root_page}
+        if descendants:
+            self._copy_descendants(descendants, new_root_page, target_site, permissions=copy_permissions, user=user)
+        return new_root_page
+
+    def _copy_descendants(self, descendants, new_root_page, site, permissions=True, user=None):
+        """
+        Copies the given «descendants» of this page (ordered by path, with
+        prefetched urls) below «new_root_page», the copy of this page.
+
+        Does the same as calling ``copy()`` for each descendant but creates
+        pages, urls, contents and placeholders with a number of queries
+        that depends on the depth of the subtree only. Plugins are copied
+        in bulk per language, ``copy_relations()`` and ``post_copy()`` are
+        called as usual.
+        """
+        from cms.extensions import extension_pool
+        from cms.models import CMSPlugin, PageContent, PagePermission, Placeholder
+        from cms.models.managers import PageContentManager
+        from cms.utils.page import get_available_slug
+        from cms.utils.permissions import get_current_user_name
+        from cms.utils.plugins import copy_plugins_to_placeholders
+        from cms.utils.search import update_search_index
+
+        def get_cached_path(page, language):
+            # Same as page.get_path() without querying for missing languages
+            for lang in [language, *page.get_fallbacks(language)]:
+                if lang in page.urls_cache:
+                    return page.urls_cache[lang].path
+            return None
+
+        new_root_page.urls_cache = {url.language: url for url in new_root_page.urls.all()}
+        user_name = get_current_user_name()
+        depth_offset = new_root_page.depth - self.depth
+        pages_by_id = {self.pk: new_root_page}
+        # Paths of urls created by this copy, by language
+        reserved_paths = {}
+        levels = {}
+
         for page in descendants:
-            parent = pages_by_id[page.parent_id]
-            pages_by_id[page.id] = page.copy(
-                target_site, parent_page=parent, translations=True, permissions=copy_permissions, user=user
+            levels.setdefault(page.depth, []).append(page)
+
+        for depth in sorted(levels):
+            level = levels[depth]
+            # The treebeard paths of the copies are derived from their
+            # original ones: the new root page does not have children yet.
+            new_pages = [
+                Page(
+                    site=site,
+                    parent=pages_by_id[page.parent_id],
+                    path=new_root_page.path + page.path[len(self.path):],
+                    depth=page.depth + depth_offset,
+                    numchild=page.numchild,
+                    created_by=user_name,
+                    changed_by=user_name,
+                )
+                for page in level
+            ]
+            Page.objects.bulk_create(new_pages)
+
+            if any(new_page.pk is None for new_page in new_pages):
+                # Database backend does not return primary keys
+                pks = dict(Page.objects.filter(path__in=[new_page.path for new_page in new_pages]).values_list("path", "pk"))
+
+                for new_page in new_pages:
+                    new_page.pk = pks[new_page.path]
+
+            new_urls = []
+
+            for page, new_page in zip(level, new_pages):
+                pages_by_id[page.pk] = new_page
+                new_page.urls_cache = {}
+
+                for page_url in page.urls.all():
+                    base = get_cached_path(new_page.parent, page_url.language)
+                    new_url = PageUrl(
+                        page=new_page,
+                        language=page_url.language,
+                        slug=page_url.slug,
+                        path=f"{base}/{page_url.slug}" if base else page_url.slug,
+                        managed=page_url.managed,
+                    )
+                    new_urls.append((base, new_url))
+
+            # Slugs are checked for collisions with one query per level
+            paths = {new_url.path for base, new_url in new_urls}
+            used_paths = set(
+                PageUrl.objects.get_for_site(site, path__in=paths).values_list("language", "path")
             )
-        return new_root_page
+
+            for base, new_url in new_urls:
+                language_paths = reserved_paths.setdefault(new_url.language, set())
+
+                if (new_url.language, new_url.path) in used_paths or new_url.path in language_paths:
+                    new_url.slug = get_available_slug(
+                        site, new_url.path, new_url.language, reserved_paths=language_paths
+                    )
+                    new_url.path = f"{base}/{new_url.slug}" if base else new_url.slug
+                language_paths.add(new_url.path)
+                new_url.page.urls_cache[new_url.language] = new_url
+            PageUrl.objects.with_user(user).bulk_create([new_url for base, new_url in new_urls])
+
+        # The children were not added through treebeard
+        new_root_page.numchild = len(levels.get(self.depth + 1, []))
+        Page.objects.filter(pk=new_root_page.pk).update(numchild=new_root_page.numchild)
+        del pages_by_id[self.pk]
+        translations = (
+            PageContent.admin_manager.current_content(page__in=pages_by_id.keys())
+            .prefetch_related("placeholders")
+            .order_by("page__path", "pk")
+        )
+        new_translations = []
+
+        for translation in translations:
+            new_translation = model_to_dict(translation)
+            new_translation.pop("id", None)  # No PK
+            new_translation["page"] = pages_by_id[translation.page_id]
+            new_translations.append(new_translation)
+
+        if type(PageContent.objects) is PageContentManager:
+            new_contents = PageContent.objects.with_user(user).bulk_create(
+                [PageContent(**new_translation) for new_translation in new_translations]
+            )
+
+            if any(new_content.pk is None for new_content in new_contents):
+                pks = {
+                    (page_id, language): pk
+                    for page_id, language, pk in PageContent.admin_manager.filter(
+                        page__in=[new_content.page for new_content in new_contents],
+                    ).values_list("page", "language", "pk")
+                }
+
+                for new_content in new_contents:
+                    new_content.pk = pks[(new_content.page.pk, new_content.language)]
+        else:
+            # A replaced manager (e.g., of a versioning package) needs
+            # to see each new content object.
+            new_contents = [
+                PageContent.objects.with_user(user).create(**new_translation)
+                for new_translation in new_translations
+            ]
+
+        new_placeholders = []
+
+        for translation, new_content in zip(translations, new_contents):
+            new_content.page.page_content_cache[new_content.language] = new_content
+
+            for placeholder in translation.placeholders.all():
+                new_placeholder = Placeholder(
+                    slot=placeholder.slot,
+                    default_width=placeholder.default_width,
+                    source=new_content,
+                )
+                new_placeholders.append((placeholder, new_placeholder))
+
+        Placeholder.objects.bulk_create([new_placeholder for placeholder, new_placeholder in new_placeholders])
+
+        if any(new_placeholder.pk is None for placeholder, new_placeholder in new_placeholders):
+            pks = {
+                (object_id, slot): pk
+                for object_id, slot, pk in Placeholder.objects.filter(
+                    content_type=ContentType.objects.get_for_model(PageContent),
+                    object_id__in=[new_content.pk for new_content in new_contents],
+                ).values_list("object_id", "slot", "pk")
+            }
+
+            for placeholder, new_placeholder in new_placeholders:
+                new_placeholder.pk = pks[(new_placeholder.object_id, new_placeholder.slot)]
+
+        # Only placeholders with plugins in the content's language need to be copied
+        placeholders_with_plugins = set(
+            CMSPlugin.objects.filter(
+                placeholder__in=[placeholder.pk for placeholder, new_placeholder in new_placeholders],
+            ).values_list("placeholder", "language").distinct()
+        )
+        placeholder_pairs = {}
+
+        for placeholder, new_placeholder in new_placeholders:
+            language = new_placeholder.source.language
+
+            if (placeholder.pk, language) in placeholders_with_plugins:
+                placeholder_pairs.setdefault(language, []).append((placeholder, new_placeholder))
+
+        for language, pairs in placeholder_pairs.items():
+            copy_plugins_to_placeholders(pairs, language, language)
+
+        # The copy indexed the contents with plugins, the others were
+        # created without them.
+        indexed_contents = {
+            new_placeholder.object_id for pairs in placeholder_pairs.values() for placeholder, new_placeholder in pairs
+        }
+        update_search_index([new_content for new_content in new_contents if new_content.pk not in indexed_contents])
+
+        for page in descendants:
+            extension_pool.copy_extensions(page, pages_by_id[page.pk])
+
+        if permissions and get_cms_setting("PERMISSION"):
+            new_permissions = []
+
+            for permission in PagePermission.objects.filter(page__in=pages_by_id.keys()).iterator():
+                permission.page = pages_by_id[permission.page_id]
+                permission.pk = None
+                new_permissions.append(permission)
+            PagePermission.objects.bulk_create(new_permissions)
 
     def delete(self, *args, **kwargs):
-        Page.get_tree(self).delete_fast()
+        from cms.utils.page_delete import delete_page_tree
 
-        if self.parent:
-            Page.objects.filter(id=self.parent_id).update(numchild=models.F("numchild") - 1)
-        self.clear_cache(menu=True)
+        delete_page_tree(self)
 
     def delete_translations(self, language=None):
         if language is None:
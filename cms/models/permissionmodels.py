@@ -247,6 +247,72 @@ class PermissionTuple(tuple):
         return Q()
 
 
+class PermissionMatcher:
+    """
+    Compiled form of a list of permission tuples.
+
+    The grants are indexed by the path of the page they are set on. Since
+    all permission tuples only apply to the page itself or its descendants,
+    a page path is matched by looking up each of its ancestor paths (one
+    per tree level) instead of comparing it to every tuple. Each grant can
+    carry a value (e.g., the permission object) which is returned by
+    :meth:`get_matches`.
+    """
+
+    def __init__(self, perm_tuples=(), steplen: int = Page.steplen):
+        self.steplen = steplen
+        self._grants = {}
+
+        for perm_tuple in perm_tuples:
+            self.add(perm_tuple)
+
+    def __bool__(self):
+        return bool(self._grants)
+
+    def add(self, perm_tuple, value=None):
+        grant_on, path = perm_tuple
+        self._grants.setdefault(path, []).append((grant_on, value))
+
+    def _iter_matches(self, path: str):
+        steplen = self.steplen
+        depth = len(path) // steplen
+
+        for level in range(depth, 0, -1):
+            grants = self._grants.get(path[:level * steplen])
+
+            if not grants:
+                continue
+
+            distance = depth - level
+
+            for grant_on, value in grants:
+                if distance == 0:
+                    matches = grant_on in (ACCESS_PAGE, ACCESS_PAGE_AND_CHILDREN, ACCESS_PAGE_AND_DESCENDANTS)
+                elif distance == 1:
+                    matches = grant_on in (ACCESS_CHILDREN, ACCESS_DESCENDANTS, ACCESS_PAGE_AND_CHILDREN,
+                                           ACCESS_PAGE_AND_DESCENDANTS)
+                else:
+                    matches = grant_on in (ACCESS_DESCENDANTS, ACCESS_PAGE_AND_DESCENDANTS)
+
+                if matches:
+                    yield value
+
+    def contains(self, path: str) -> bool:
+        """
+        Returns True if any of the permission tuples applies to «path».
+        """
+        return next(self._iter_matches(path), _NO_MATCH) is not _NO_MATCH
+
+    def get_matches(self, path: str) -> list:
+        """
+        Returns the values of all grants which apply to «path».
+        """
+        return list(self._iter_matches(path))
+
+
+_NO_MATCH = object()
+
+
 class PagePermission(AbstractPagePermission):
     """Page permissions for a single page
     """
@@ -298,54 +298,11 @@ class Placeholder(models.Model):
 
         language = get_language_from_request(request, self.page)
         for instance, plugin in inner_plugin_iterator(language):
-            plugin_expiration = plugin.get_cache_expiration(request, instance, self)
+            ttl = self.get_plugin_cache_ttl(request, instance, plugin, response_timestamp)
 
-            # The plugin_expiration should only ever be either: None, a TZ-
-            # aware datetime, a timedelta, or an integer.
-            if plugin_expiration is None:
+            if ttl is None:
                 # Do not consider plugins that return None
                 continue
-            if isinstance(plugin_expiration, (datetime, timedelta)):
-                if isinstance(plugin_expiration, datetime):
-                    # We need to convert this to a TTL against the
-                    # response timestamp.
-                    try:
-                        delta = plugin_expiration - response_timestamp
-                    except TypeError:
-                        # Attempting to take the difference of a naive datetime
-                        # and a TZ-aware one results in a TypeError. Ignore
-                        # this plugin.
-                        warnings.warn(
-                            "Plugin %(plugin_class)s (%(pk)d) returned a naive "
-                            "datetime : %(value)s for get_cache_expiration(), "
-                            "ignoring."
-                            % {
-                                "plugin_class": plugin.__class__.__name__,
-                                "pk": instance.pk,
-                                "value": force_str(plugin_expiration),
-                            }
-                        )
-                        continue
-                else:
-                    # Its already a timedelta instance...
-                    delta = plugin_expiration
-                ttl = int(delta.total_seconds() + 0.5)
-            else:  # must be an int-like value
-                try:
-                    ttl = int(plugin_expiration)
-                except ValueError:
-                    # Looks like it was not very int-ish. Ignore this plugin.
-                    warnings.warn(
-                        "Plugin %(plugin_class)s (%(pk)d) returned "
-                        "unexpected value %(value)s for "
-                        "get_cache_expiration(), ignoring."
-                        % {
-                            "plugin_class": plugin.__class__.__name__,
-                            "pk": instance.pk,
-                            "value": force_str(plugin_expiration),
-                        }
-                    )
-                    continue
 
             min_ttl = min(ttl, min_ttl)
             if min_ttl <= 0:
@@ -355,6 +312,66 @@ class Placeholder(models.Model):
 
         return min_ttl
 
+    def get_plugin_cache_ttl(self, request, instance, plugin, response_timestamp):
+        """
+        Returns the number of seconds (from «response_timestamp») the given
+        plugin «instance» declares its content can be cached or ``None`` if
+        the plugin is not to be considered.
+
+        :type request: HTTPRequest
+        :type response_timestamp: datetime
+        :rtype: int or None
+        """
+        plugin_expiration = plugin.get_cache_expiration(request, instance, self)
+
+        # The plugin_expiration should only ever be either: None, a TZ-
+        # aware datetime, a timedelta, or an integer.
+        if plugin_expiration is None:
+            # Do not consider plugins that return None
+            return None
+        if isinstance(plugin_expiration, (datetime, timedelta)):
+            if isinstance(plugin_expiration, datetime):
+                # We need to convert this to a TTL against the
+                # response timestamp.
+                try:
+                    delta = plugin_expiration - response_timestamp
+                except TypeError:
+                    # Attempting to take the difference of a naive datetime
+                    # and a TZ-aware one results in a TypeError. Ignore
+                    # this plugin.
+                    warnings.warn(
+                        "Plugin %(plugin_class)s (%(pk)d) returned a naive "
+                        "datetime : %(value)s for get_cache_expiration(), "
+                        "ignoring."
+                        % {
+                            "plugin_class": plugin.__class__.__name__,
+                            "pk": instance.pk,
+                            "value": force_str(plugin_expiration),
+                        }
+                    )
+                    return None
+            else:
+                # Its already a timedelta instance...
+                delta = plugin_expiration
+            ttl = int(delta.total_seconds() + 0.5)
+        else:  # must be an int-like value
+            try:
+                ttl = int(plugin_expiration)
+            except ValueError:
+                # Looks like it was not very int-ish. Ignore this plugin.
+                warnings.warn(
+                    "Plugin %(plugin_class)s (%(pk)d) returned "
+                    "unexpected value %(value)s for "
+                    "get_cache_expiration(), ignoring."
+                    % {
+                        "plugin_class": plugin.__class__.__name__,
+                        "pk": instance.pk,
+                        "value": force_str(plugin_expiration),
+                    }
+                )
+                return None
+        return ttl
+
     def clear_cache(self, language, site_id=None):
         if get_cms_setting("PAGE_CACHE"):
             # Clears all the page caches
@@ -507,11 +524,37 @@ class Placeholder(models.Model):
             )
 
         target_tree = self.get_plugins(plugin.language)
-        last_plugin = self.get_last_plugin(plugin.language)
         source_plugin_desc_count = plugin._get_descendants_count()
         # Attn: The following line assumes that all children and grand-children have consecutive positions!
         source_plugin_range = (plugin.position, plugin.position + source_plugin_desc_count)
 
+        if self._can_renumber_plugin_positions():
+            # Sort the plugin and its descendants in between the other plugins
+            # and renumber them all in two statements. Other plugins keep their
+            # order, their positions are spread to make room for the moved plugins.
+            spread = source_plugin_desc_count + 2
+
+            if target_position < plugin.position:
+                # Moving left: in front of the plugin at the target position
+                moved_start = target_position * spread - source_plugin_desc_count - 1
+            else:
+                # Moving right: behind the plugin at the target position (and its descendants)
+                moved_start = (target_position + source_plugin_desc_count) * spread + 1
+
+            self._renumber_plugin_positions(
+                plugin.language,
+                sort_key="CASE WHEN position BETWEEN %s AND %s THEN position + %s ELSE position * %s END",
+                params=[*source_plugin_range, moved_start - plugin.position, spread],
+                offset=True,
+            )
+
+            if plugin.parent != target_plugin:
+                plugin.update(parent=target_plugin)
+            self._renumber_plugin_positions(plugin.language)
+            return
+
+        last_plugin = self.get_last_plugin(plugin.language)
+
         if target_position < plugin.position:
             # Moving left
             # Make a big hole on the right side of the current plugin's position
@@ -604,9 +647,10 @@ class Placeholder(models.Model):
             offset=source_offset,
         )
 
-        plugin.update(parent=target_plugin, placeholder=target_placeholder)
         # TODO: More efficient is to do raw sql update
+        # Descendants first, as their lookup might depend on the plugin's parent
         plugin_descendants.update(placeholder=target_placeholder)
+        plugin.update(parent=target_plugin, placeholder=target_placeholder)
         self._recalculate_plugin_positions(plugin.language)
         target_placeholder._recalculate_plugin_positions(plugin.language)
 
@@ -684,6 +728,53 @@ class Placeholder(models.Model):
 
         self.get_plugins(language).filter(position__gte=start).update(position=models.F("position") + offset)
 
+    def _can_renumber_plugin_positions(self):
+        from cms.models.pluginmodel import _get_database_connection
+
+        db_connection = _get_database_connection("write")
+        return db_connection.features.supports_over_clause and db_connection.vendor in (
+            "sqlite",
+            "postgresql",
+            "mysql",
+            "oracle",
+        )
+
+    def _renumber_plugin_positions(self, language, sort_key="position", params=(), offset=False):
+        """Sets the positions of all plugins to 1 to *n* in the order given by the
+        SQL expression «sort_key» (with «params») in a single ``ROW_NUMBER()`` UPDATE.
+        If «offset» is True, the plugins are numbered behind the current last position
+        instead.
+
+        Requires window functions, see ``_can_renumber_plugin_positions``."""
+        from cms.models.pluginmodel import CMSPlugin, _get_database_connection
+
+        db_connection = _get_database_connection("write")
+        table = db_connection.ops.quote_name(CMSPlugin._meta.db_table)
+        new_position = "subquery.new_pos + subquery.max_pos" if offset else "subquery.new_pos"
+        subquery = (
+            f"SELECT id, ROW_NUMBER() OVER (ORDER BY {sort_key}, id) AS new_pos, MAX(position) OVER () AS max_pos "
+            f"FROM {table} WHERE placeholder_id=%s AND language=%s"
+        )
+
+        if db_connection.vendor in ("sqlite", "postgresql"):
+            sql = (
+                f"UPDATE {table} SET position = {new_position} "
+                f"FROM ({subquery}) subquery WHERE {table}.id=subquery.id"
+            )
+        elif db_connection.vendor == "mysql":
+            sql = (
+                f"UPDATE {table} INNER JOIN ({subquery}) subquery ON {table}.id=subquery.id "
+                f"SET {table}.position = {new_position}"
+            )
+        else:
+            sql = (
+                f"MERGE INTO {table} USING ({subquery}) subquery ON ({table}.id=subquery.id) "
+                f"WHEN MATCHED THEN UPDATE SET {table}.position = {new_position}"
+            )
+
+        with db_connection.cursor() as cursor:
+            cursor.execute(sql, [*params, self.pk, language])
+
     def _recalculate_plugin_positions(self, language):
         """Closes gaps in the plugin tree by re-calculating the positions of all plugins.
         IMPORTANT: This method requires any gap to be large enough to be able to
@@ -696,33 +787,15 @@ class Placeholder(models.Model):
             _get_database_vendor,
         )
 
+        if self._can_renumber_plugin_positions():
+            self._renumber_plugin_positions(language)
+            return
+
         cursor = _get_database_cursor("write")
         db_vendor = _get_database_vendor("write")
 
-        if db_vendor in ("sqlite", "postgresql"):
-            sql = (
-                "UPDATE {0} "
-                "SET position = subquery.new_pos "
-                "FROM ("
-                "  SELECT  ID, ROW_NUMBER() OVER (ORDER BY position, id) AS new_pos "
-                "  FROM {0} WHERE placeholder_id=%s AND language=%s "
-                ") subquery "
-                "WHERE {0}.id=subquery.id"
-            )
-            sql = sql.format(connection.ops.quote_name(CMSPlugin._meta.db_table))
-            cursor.execute(sql, [self.pk, language])
-        elif db_vendor == "mysql":
-            sql = (
-                "UPDATE {0} "
-                "SET position = ("
-                "SELECT COUNT(*)+1 FROM (SELECT * FROM {0}) t "
-                "WHERE placeholder_id={0}.placeholder_id AND language={0}.language "
-                "AND {0}.position > t.position"
-                ") WHERE placeholder_id=%s AND language=%s"
-            )
-            sql = sql.format(connection.ops.quote_name(CMSPlugin._meta.db_table))
-            cursor.execute(sql, [self.pk, language])
-        elif db_vendor == "oracle":
+        if db_vendor in ("mysql", "oracle"):
+            # No window functions (MySQL < 8)
             sql = (
                 "UPDATE {0} "
                 "SET position = ("
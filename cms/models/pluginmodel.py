@@ -7,8 +7,9 @@ from functools import cache
 
 from django.core.exceptions import ObjectDoesNotExist
 from django.db import connection, connections, models, router
-from django.db.models import QuerySet
+from django.db.models import QuerySet, Value
 from django.db.models.base import ModelBase
+from django.db.models.functions import Concat, Substr
 from django.utils import timezone
 from django.utils.encoding import force_str
 from django.utils.translation import gettext_lazy as _
@@ -177,6 +178,9 @@ class CMSPlugin(models.Model, metaclass=PluginModelBase):
     creation_date = models.DateTimeField(_("creation date"), editable=False, default=timezone.now)
     #: `django:django.db.models.DateTimeField`: Datetime the plugin was last changed
     changed_date = models.DateTimeField(auto_now=True)
+    #: `django:django.db.models.CharField`: Ids of the plugin's ancestors starting with the root plugin,
+    #: e.g., ``"12/34/"``. Empty for plugins at root level.
+    path = models.CharField(_("path"), max_length=512, blank=True, default="", db_index=True, editable=False)
     child_plugin_instances = None
 
     class Meta:
@@ -324,16 +328,88 @@ class CMSPlugin(models.Model, metaclass=PluginModelBase):
         instance, plugin = self.get_plugin_instance()
         return force_str(plugin.icon_alt(instance)) if instance else ''
 
+    def save(self, *args, **kwargs):
+        if not self._has_valid_path():
+            old_descendants_path = self._get_descendants_path()
+            self.path = self._get_path()
+
+            if kwargs.get("update_fields") is not None:
+                kwargs["update_fields"] = {*kwargs["update_fields"], "path"}
+
+            if not self._state.adding:
+                self._update_descendants_path(old_descendants_path)
+        super().save(*args, **kwargs)
+
     def update(self, refresh=False, **fields):
+        if "parent" in fields or "parent_id" in fields:
+            old_descendants_path = self._get_descendants_path()
+
+            if "parent" in fields:
+                self.parent = fields["parent"]
+            else:
+                self.parent_id = fields["parent_id"]
+            self.path = fields["path"] = self._get_path()
+            self._update_descendants_path(old_descendants_path)
         CMSPlugin.objects.filter(pk=self.pk).update(**fields)
         if refresh:
             return self.reload()
         return
 
+    def _has_valid_path(self):
+        if not self.parent_id:
+            return self.path == ""
+        return self.path == f"{self.parent_id}/" or self.path.endswith(f"/{self.parent_id}/")
+
+    def _get_path(self):
+        """
+        Returns the plugin's path according to its parent.
+        """
+        if not self.parent_id:
+            return ""
+
+        parent = self._state.fields_cache.get("parent")
+
+        if parent is not None and parent.pk == self.parent_id:
+            parent_path = parent.path
+        else:
+            parent_path = CMSPlugin.objects.filter(pk=self.parent_id).values_list("path", flat=True).first() or ""
+        return f"{parent_path}{self.parent_id}/"
+
+    def _get_descendants_path(self):
+        """
+        Returns the path all descendants of the plugin start with.
+        """
+        return f"{self.path}{self.pk}/"
+
+    def _update_descendants_path(self, old_descendants_path):
+        """
+        Replaces the path of the plugin's descendants after the plugin's path has
+        changed to «self.path».
+        """
+        new_descendants_path = self._get_descendants_path()
+
+        if old_descendants_path == new_descendants_path:
+            return
+
+        (
+            CMSPlugin.objects
+            .using(router.db_for_write(CMSPlugin))
+            .filter(path__startswith=old_descendants_path)
+            .update(path=Concat(Value(new_descendants_path), Substr("path", len(old_descendants_path) + 1)))
+        )
+
     def reload(self):
         return CMSPlugin.objects.select_related("parent", "placeholder").get(pk=self.pk)
 
     def _get_descendants_count(self):
+        if get_cms_setting('PLUGIN_PATH_LOOKUPS'):
+            return (
+                CMSPlugin.objects
+                .using(router.db_for_write(CMSPlugin))
+                .filter(path__startswith=self._get_descendants_path())
+                .count()
+            )
+
         cursor = _get_database_cursor('write')
         sql = _get_descendants_cte() + '\n'
         sql += 'SELECT COUNT(*) FROM descendants;'
@@ -342,6 +418,14 @@ class CMSPlugin(models.Model, metaclass=PluginModelBase):
         return cursor.fetchall()[0][0]
 
     def _get_descendants_ids(self):
+        if get_cms_setting('PLUGIN_PATH_LOOKUPS'):
+            return list(
+                CMSPlugin.objects
+                .using(router.db_for_write(CMSPlugin))
+                .filter(path__startswith=self._get_descendants_path())
+                .values_list('pk', flat=True)
+            )
+
         cursor = _get_database_cursor('write')
         sql = _get_descendants_cte() + '\n'
         sql += 'SELECT id FROM descendants;'
@@ -353,6 +437,8 @@ class CMSPlugin(models.Model, metaclass=PluginModelBase):
         return self.cmsplugin_set.all()
 
     def get_descendants(self) -> QuerySet:
+        if get_cms_setting('PLUGIN_PATH_LOOKUPS'):
+            return CMSPlugin.objects.filter(path__startswith=self._get_descendants_path())
         return CMSPlugin.objects.filter(pk__in=self._get_descendants_ids())
 
     def get_ancestors(self) -> list[CMSPlugin]:
@@ -374,6 +460,10 @@ class CMSPlugin(models.Model, metaclass=PluginModelBase):
         return list(self.get_ancestors_qs())
 
     def get_ancestors_qs(self) -> QuerySet:
+        if get_cms_setting('PLUGIN_PATH_LOOKUPS'):
+            ancestor_ids = [int(pk) for pk in self.path.split('/') if pk]
+            return CMSPlugin.objects.filter(pk__in=ancestor_ids).order_by('position')
+
         cursor = _get_database_cursor("write")
         sql = f"{_get_ancestors_cte()} SELECT id FROM ancestors;"
         cursor.execute(sql, [self.parent_id])
@@ -381,7 +471,7 @@ class CMSPlugin(models.Model, metaclass=PluginModelBase):
         return CMSPlugin.objects.filter(pk__in=ancestor_ids).order_by('position')
 
     def set_base_attr(self, plugin):
-        for attr in ['parent_id', 'placeholder', 'language', 'plugin_type', 'creation_date', 'pk', 'position']:
+        for attr in ['parent_id', 'placeholder', 'language', 'plugin_type', 'creation_date', 'pk', 'position', 'path']:
             setattr(plugin, attr, getattr(self, attr))
 
     def post_copy(self, old_instance, new_old_ziplist):
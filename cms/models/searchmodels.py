@@ -0,0 +1,30 @@
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+
+from cms.models.pagemodel import Page
+
+
+class PageSearchDocument(models.Model):
+    """
+    Denormalized search document of a page in one language. It is filled
+    from the page content's titles and meta description and from the
+    ``search_fields`` of its plugins, see :mod:`cms.utils.search`.
+    """
+    page = models.ForeignKey(
+        Page,
+        on_delete=models.CASCADE,
+        related_name="search_documents",
+        verbose_name=_("page"),
+    )
+    language = models.CharField(_("language"), max_length=15, db_index=True)
+    title = models.CharField(_("title"), max_length=255, blank=True)
+    text = models.TextField(_("text"), blank=True)
+
+    class Meta:
+        app_label = "cms"
+        unique_together = (("page", "language"),)
+        verbose_name = _("page search document")
+        verbose_name_plural = _("page search documents")
+
+    def __str__(self):
+        return f"{self.title} ({self.language})"
@@ -1,11 +1,15 @@
 from django.conf import settings
-from django.http import Http404, HttpResponseRedirect
+from django.http import Http404, HttpResponseRedirect, StreamingHttpResponse
+from django.template.loader import get_template
 from django.template.response import TemplateResponse
 from django.urls import Resolver404, resolve, reverse
+from django.utils.cache import add_never_cache_headers
 
 from cms import __version__, constants
 from cms.cache.page import set_page_cache
 from cms.models import EmptyPageContent
+from cms.toolbar.utils import get_toolbar_from_request
+from cms.utils.conf import get_cms_setting
 from cms.utils.page_permissions import user_can_change_page, user_can_view_page
 from cms.utils.urlutils import admin_reverse
 
@@ -35,8 +39,12 @@ def render_page(request, page, current_language, slug=None):
 
         from cms.views import render_placeholder_content
         return render_placeholder_content(request, page_content, context)
-    response = TemplateResponse(request, template, context)
-    response.add_post_render_callback(set_page_cache)
+
+    if _can_stream_page(request):
+        response = _stream_page(request, template, context)
+    else:
+        response = TemplateResponse(request, template, context)
+        response.add_post_render_callback(set_page_cache)
 
     # Add headers for X Frame Options - this really should be changed upon moving to class based views
     xframe_options = page.get_xframe_options()
@@ -59,6 +67,37 @@ def render_page(request, page, current_language, slug=None):
     return response
 
 
+def _can_stream_page(request):
+    """
+    Pages are only streamed if enabled and if the response is neither
+    going to be stored in the page cache nor rendered with the toolbar.
+    """
+    if not get_cms_setting("STREAMING_RESPONSE"):
+        return False
+
+    toolbar = get_toolbar_from_request(request)
+
+    if toolbar.show_toolbar or toolbar.edit_mode_active or toolbar.preview_mode_active:
+        return False
+    # See set_page_cache(): the page cache needs the fully rendered response
+    return request.user.is_authenticated or toolbar._cache_disabled or not get_cms_setting("PAGE_CACHE")
+
+
+def _stream_page(request, template, context):
+    """
+    Renders the page template with all page placeholders left out and
+    streams the result. The placeholders are rendered one after the other
+    while the response is sent, so the client receives the markup in front
+    of the first placeholder (usually the <head>) early.
+    """
+    renderer = get_toolbar_from_request(request).content_renderer
+    renderer.defer_page_placeholders()
+    content = get_template(template).render(context, request)
+    response = StreamingHttpResponse(renderer.render_deferred_placeholders(content))
+    add_never_cache_headers(response)
+    return response
+
+
 def _handle_no_page(request):
     try:
         match = resolve(request.path)
@@ -1,25 +1,41 @@
 import contextlib
 import logging
+import re
+import secrets
 import sys
-from collections import OrderedDict
+from collections import OrderedDict, defaultdict
 from collections.abc import Generator
+from concurrent.futures import ThreadPoolExecutor
+from copy import copy
 from functools import partial
 from typing import Any, Optional, Union
 
 from classytags.utils import flatten_context
 from django.conf import settings
 from django.contrib.sites.models import Site
+from django.db import connections
 from django.http import HttpRequest
 from django.template import Context
+from django.utils import timezone, translation
 from django.utils.functional import cached_property
 from django.utils.module_loading import import_string
 from django.utils.safestring import SafeText, mark_safe
 from django.utils.translation import override
 from django.views.debug import ExceptionReporter
 
-from cms.cache.placeholder import get_placeholder_cache, set_placeholder_cache
+from cms.cache.placeholder import (
+    _get_placeholder_cache_version,
+    get_placeholder_cache,
+    set_placeholder_cache,
+)
+from cms.cache.plugin import (
+    get_plugin_cache,
+    get_plugin_cache_expirations,
+    set_plugin_cache,
+)
 from cms.exceptions import PlaceholderNotFound
 from cms.models import CMSPlugin, Page, PageContent, Placeholder
+from cms.plugin_base import CMSPluginBase
 from cms.plugin_pool import PluginPool
 from cms.toolbar.utils import (
     get_placeholder_toolbar_js,
@@ -35,6 +51,7 @@ from cms.utils.placeholder import (
     restore_sekizai_context,
 )
 from cms.utils.plugins import get_plugin_restrictions
+from cms.utils.profiling import annotate_render_timing, profile_render
 
 logger = logging.getLogger(__name__)
 
@@ -89,6 +106,10 @@ class RenderedPlaceholder:
         return hash(self.placeholder)
 
 
+def _in_atomic_block():
+    return any(connection.in_atomic_block for connection in connections.all(initialized_only=True))
+
+
 class BaseRenderer:
     load_structure: bool = False
     placeholder_edit_template: str = ""
@@ -101,6 +122,10 @@ class BaseRenderer:
         self._placeholders_by_page_cache = {}
         self._rendered_placeholders = OrderedDict()
         self._rendered_plugins_by_placeholder = {}
+        # Toolbar markup only depends on slot and template, not on
+        # the placeholder itself. Placeholders sharing both reuse it.
+        self._placeholder_allowed_plugins = {}
+        self._placeholder_plugin_menus = {}
 
     @cached_property
     def current_page(self) -> Page:
@@ -128,31 +153,49 @@ class BaseRenderer:
     def request_language(self) -> str:
         return get_language_from_request(self.request)
 
-    def get_placeholder_plugin_menu(
-        self, placeholder: Placeholder, page: Optional[Page] = None
-    ):
+    @cached_property
+    def addable_plugins(self) -> list[type[CMSPluginBase]]:
+        """
+        Registered plugins the current user is allowed to add.
+        """
         registered_plugins = self.plugin_pool.registered_plugins
         can_add_plugin = partial(
             has_plugin_permission, user=self.request.user, permission_type="add"
         )
-        plugins = [
+        return [
             plugin
             for plugin in registered_plugins
             if can_add_plugin(plugin_type=plugin.value)
         ]
+
+    def get_placeholder_plugin_menu(
+        self, placeholder: Placeholder, page: Optional[Page] = None
+    ):
         plugin_menu = get_toolbar_plugin_struct(
-            plugins=plugins,
+            plugins=self.addable_plugins,
             slot=placeholder.slot,
             page=page,
         )
-        plugin_menu_template = self.templates.placeholder_plugin_menu_template
-        return plugin_menu_template.render({"plugin_menu": plugin_menu})
+        # Labels and modules can be configured per slot and template,
+        # the rendered menu is shared by all placeholders with the same menu.
+        menu_key = tuple(tuple(item.items()) for item in plugin_menu)
 
-    def get_placeholder_toolbar_js(self, placeholder, page=None):
-        plugins = self.plugin_pool.get_all_plugins(placeholder.slot, page)  # original
+        if menu_key not in self._placeholder_plugin_menus:
+            plugin_menu_template = self.templates.placeholder_plugin_menu_template
+            self._placeholder_plugin_menus[menu_key] = plugin_menu_template.render({"plugin_menu": plugin_menu})
+        return self._placeholder_plugin_menus[menu_key]
 
-        plugin_types = [cls.__name__ for cls in plugins]
-        allowed_plugins = plugin_types + self.plugin_pool.get_system_plugins()
+    def get_placeholder_allowed_plugins(self, placeholder: Placeholder, page: Optional[Page] = None) -> list[str]:
+        key = (placeholder.slot, page.get_template() if page else None)
+
+        if key not in self._placeholder_allowed_plugins:
+            plugins = self.plugin_pool.get_all_plugins(placeholder.slot, page)
+            plugin_types = [cls.__name__ for cls in plugins]
+            self._placeholder_allowed_plugins[key] = plugin_types + self.plugin_pool.get_system_plugins()
+        return self._placeholder_allowed_plugins[key]
+
+    def get_placeholder_toolbar_js(self, placeholder, page=None):
+        allowed_plugins = self.get_placeholder_allowed_plugins(placeholder, page)
         placeholder_toolbar_js = get_placeholder_toolbar_js(
             placeholder=placeholder,
             allowed_plugins=allowed_plugins,
@@ -227,6 +270,12 @@ class ContentRenderer(BaseRenderer):
     def __init__(self, request: HttpRequest):
         super().__init__(request)
         self._placeholders_are_editable = bool(self.toolbar.edit_mode_active)
+        self._prerendered_placeholders = {}
+        self._plugin_cache_versions = {}
+        self._plugin_cache_expirations = {}
+        # Set by defer_page_placeholders()
+        self._deferred_placeholders = None
+        self._deferred_placeholder_marker = None
 
     def placeholder_cache_is_enabled(self):
         if not get_cms_setting("PLACEHOLDER_CACHE"):
@@ -235,6 +284,30 @@ class ContentRenderer(BaseRenderer):
             return False
         return not self._placeholders_are_editable
 
+    def plugin_cache_is_enabled(self):
+        if not get_cms_setting("PLUGIN_FRAGMENT_CACHE"):
+            return False
+        if self.request.user.is_staff:
+            return False
+        return not self._placeholders_are_editable
+
+    def plugin_tree_cache_is_enabled(self):
+        if not get_cms_setting("PLUGIN_TREE_CACHE"):
+            return False
+        if self.request.user.is_staff:
+            return False
+        return not self._placeholders_are_editable
+
+    def placeholder_prerendering_is_enabled(self):
+        if not get_cms_setting("PLACEHOLDER_RENDER_WORKERS"):
+            return False
+        if _in_atomic_block():
+            # Worker threads use their own database connections and would
+            # not see uncommitted changes, e.g., with ATOMIC_REQUESTS
+            return False
+        return not self._placeholders_are_editable
+
+    @profile_render("render_placeholder", lambda self, placeholder, *args, **kwargs: {"slot": placeholder.slot})
     def render_placeholder(
         self,
         placeholder: Placeholder,
@@ -261,6 +334,7 @@ class ContentRenderer(BaseRenderer):
                 placeholder=placeholder,
                 language=language,
             )
+            annotate_render_timing(self.request, cache=cached_value is not None)
         else:
             cached_value = None
 
@@ -272,43 +346,45 @@ class ContentRenderer(BaseRenderer):
 
         context.push()
 
-        width = width or placeholder.default_width
         template = page.get_template() if page else None
-
-        if width:
-            context["width"] = width
-
-        # Add extra context as defined in settings, but do not overwrite existing context variables,
-        # since settings are general and database/template are specific
-        # TODO this should actually happen as a plugin context processor, but these currently overwrite
-        # existing context -- maybe change this order?
-        for key, value in placeholder.get_extra_context(template).items():
-            if key not in context:
-                context[key] = value
+        self._update_placeholder_context(placeholder, context, template, width)
 
         if use_cache:
             watcher = Watcher(context)
 
-        plugin_content = self.render_plugins(
-            placeholder,
-            language=language,
-            context=context,
-            editable=editable,
-            template=template,
-        )
-        try:
-            placeholder_content = "".join(plugin_content)
-        except Exception as e:
-            context["exc_info"] = sys.exc_info()
-            placeholder_content = self.render_exception(
-                "rendering placeholder", context, placeholder, editable
+        if editable:
+            prerendered = None
+        else:
+            prerendered = self._prerendered_placeholders.pop(
+                (placeholder.pk, language), None
             )
-            if not get_cms_setting("CATCH_PLUGIN_500_EXCEPTION"):
-                if (
-                    not self.toolbar.edit_mode_active
-                    and not self.toolbar.preview_mode_active
-                ):
-                    raise e from None
+
+        if prerendered is not None:
+            # Content was rendered ahead of time by a worker thread,
+            # replay its sekizai data as if it was rendered in place.
+            restore_sekizai_context(context, prerendered["sekizai"])
+            placeholder_content = prerendered["content"]
+        else:
+            plugin_content = self.render_plugins(
+                placeholder,
+                language=language,
+                context=context,
+                editable=editable,
+                template=template,
+            )
+            try:
+                placeholder_content = "".join(plugin_content)
+            except Exception as e:
+                context["exc_info"] = sys.exc_info()
+                placeholder_content = self.render_exception(
+                    "rendering placeholder", context, placeholder, editable
+                )
+                if not get_cms_setting("CATCH_PLUGIN_500_EXCEPTION"):
+                    if (
+                        not self.toolbar.edit_mode_active
+                        and not self.toolbar.preview_mode_active
+                    ):
+                        raise e from None
 
         if not placeholder_content and nodelist:
             # should be nodelist from a template
@@ -326,6 +402,7 @@ class ContentRenderer(BaseRenderer):
                 content=content,
                 request=self.request,
             )
+            self._set_cached_placeholder_content(placeholder, language, content)
 
         rendered_placeholder = RenderedPlaceholder(
             placeholder=placeholder,
@@ -358,6 +435,26 @@ class ContentRenderer(BaseRenderer):
         context.pop()
         return mark_safe(placeholder_content)
 
+    def _update_placeholder_context(
+        self,
+        placeholder: Placeholder,
+        context: Context,
+        template: Optional[str],
+        width: Optional[int] = None,
+    ):
+        width = width or placeholder.default_width
+
+        if width:
+            context["width"] = width
+
+        # Add extra context as defined in settings, but do not overwrite existing context variables,
+        # since settings are general and database/template are specific
+        # TODO this should actually happen as a plugin context processor, but these currently overwrite
+        # existing context -- maybe change this order?
+        for key, value in placeholder.get_extra_context(template).items():
+            if key not in context:
+                context[key] = value
+
     def get_editable_placeholder_context(
         self, placeholder: Placeholder, page: Optional[Page] = None
     ) -> dict:
@@ -384,6 +481,14 @@ class ContentRenderer(BaseRenderer):
     ):
         # Check if page, if so delegate to render_page_placeholder
         if self.current_page:
+            if self._deferred_placeholders is not None:
+                return self._defer_page_placeholder(
+                    slot,
+                    context,
+                    inherit,
+                    nodelist=nodelist,
+                    editable=editable,
+                )
             return self.render_page_placeholder(
                 slot,
                 context,
@@ -408,6 +513,108 @@ class ContentRenderer(BaseRenderer):
         )
         return content
 
+    def defer_page_placeholders(self):
+        """
+        Lets page placeholders render as markers instead of their content.
+        The markers are replaced with the rendered placeholders by
+        render_deferred_placeholders().
+        """
+        self._deferred_placeholders = []
+        self._deferred_placeholder_marker = f"<!--cms-placeholder:{secrets.token_hex(8)}:{{}}-->"
+
+    def _defer_page_placeholder(
+        self,
+        slot: str,
+        context: Context,
+        inherit: bool,
+        nodelist=None,
+        editable: bool = True,
+    ):
+        # Keep the context as it is at the placeholder's position
+        # in the template, the template rendering continues meanwhile.
+        placeholder_context = copy(context)
+        placeholder_context.dicts = [context.flatten()]
+        index = len(self._deferred_placeholders)
+        self._deferred_placeholders.append(
+            (slot, placeholder_context, inherit, nodelist, editable)
+        )
+        return mark_safe(self._deferred_placeholder_marker.format(index))
+
+    def render_deferred_placeholders(self, content: str) -> Generator[str, None, None]:
+        """
+        Yields the given «content» in chunks split at the markers of the
+        deferred page placeholders. Each placeholder is rendered when it is
+        reached.
+
+        Sekizai data added by the placeholders cannot be rendered by the
+        ``{% render_block %}`` tags anymore, since they have been rendered
+        with the rest of the template. It is emitted in front of the closing
+        ``</body>`` tag instead (or at the end if there is none).
+
+        Placeholders failing to render are logged and left empty, the
+        response status cannot be changed once streaming has started.
+        """
+        from sekizai.helpers import Watcher, get_varname
+
+        marker_pattern = re.escape(self._deferred_placeholder_marker).replace(
+            re.escape("{}"), r"(\d+)"
+        )
+        # Splitting with a group yields content and placeholder indices in turns
+        bits = re.split(marker_pattern, content)
+        watchers = {
+            id(placeholder_context.get(get_varname())): Watcher(placeholder_context)
+            for _slot, placeholder_context, *_options in self._deferred_placeholders
+        }
+        active_language = translation.get_language()
+        active_timezone = timezone.get_current_timezone()
+
+        for position, bit in enumerate(bits[:-1]):
+            if position % 2 == 0:
+                yield bit
+                continue
+
+            slot, placeholder_context, inherit, nodelist, editable = self._deferred_placeholders[int(bit)]
+
+            try:
+                with override(active_language), timezone.override(active_timezone):
+                    content = self.render_page_placeholder(
+                        slot,
+                        placeholder_context,
+                        inherit,
+                        nodelist=nodelist,
+                        editable=editable,
+                    )
+            except Exception:
+                # The status and headers have been sent already, the error
+                # cannot turn the response into an error page anymore.
+                # Leave the placeholder empty and send the rest of the page.
+                logger.exception(
+                    'Placeholder "%s" failed to render in the streamed response for %s',
+                    slot,
+                    self.request.path,
+                )
+                content = ""
+            yield str(content)
+
+        late_data = []
+
+        for watcher in watchers.values():
+            for values in watcher.get_changes().values():
+                late_data.extend(values)
+
+        last_bit = bits[-1]
+
+        if late_data:
+            late_data = "\n".join(late_data) + "\n"
+            head, body_end, tail = last_bit.rpartition("</body>")
+
+            if body_end:
+                last_bit = f"{head}{late_data}{body_end}{tail}"
+            else:
+                last_bit += late_data
+        yield last_bit
+
+    @profile_render("render_page_placeholder", lambda self, slot, *args, **kwargs: {"slot": slot})
     def render_page_placeholder(
         self,
         slot: str,
@@ -429,6 +636,9 @@ class ContentRenderer(BaseRenderer):
             # try and load them for all placeholders on the page.
             self._preload_placeholders_for_page(current_page)
 
+            if self.placeholder_prerendering_is_enabled():
+                self._prerender_placeholders_for_page(current_page, context)
+
         try:
             placeholder = placeholder_cache[current_page.pk][slot]
         except KeyError:
@@ -483,6 +693,7 @@ class ContentRenderer(BaseRenderer):
             return content + nodelist.render(context)
         return content
 
+    @profile_render("render_plugin", lambda self, instance, *args, **kwargs: {"plugin_type": instance.plugin_type})
     def render_plugin(
         self,
         instance: CMSPlugin,
@@ -490,6 +701,8 @@ class ContentRenderer(BaseRenderer):
         placeholder: Optional[Placeholder] = None,
         editable: bool = False,
     ):
+        from sekizai.helpers import Watcher
+
         context["_last_plugin"] = instance  # Used if an exception is rendered
         if placeholder is None:
             placeholder = instance.placeholder
@@ -499,6 +712,20 @@ class ContentRenderer(BaseRenderer):
         if not instance or not plugin.render_plugin:
             return ""
 
+        if not editable and self.plugin_cache_is_enabled():
+            cache_duration = self._get_plugin_cache_expiration(instance, placeholder)
+        else:
+            cache_duration = 0
+
+        if cache_duration > 0:
+            cached_value = self._get_cached_plugin_content(instance, placeholder)
+            annotate_render_timing(self.request, cache=cached_value is not None)
+
+            if cached_value is not None:
+                restore_sekizai_context(context, cached_value["sekizai"])
+                return mark_safe(cached_value["content"])
+            watcher = Watcher(context)
+
         # we'd better pass a flat dict to template.render
         # as plugin.render can return pretty much any kind of context / dictionary
         # we'd better flatten it and force to a Context object
@@ -509,6 +736,7 @@ class ContentRenderer(BaseRenderer):
         context = plugin.render(context, instance, placeholder.slot)
         context = flatten_context(context)
         template_name = plugin._get_render_template(context, instance, placeholder)
+        annotate_render_timing(self.request, template=getattr(template_name, "name", template_name))
         template = self.templates.get_cached_template(template_name)
         content = template.render(context)
 
@@ -516,6 +744,18 @@ class ContentRenderer(BaseRenderer):
             processor = import_string(path)
             content = processor(instance, placeholder, content, context)
 
+        if cache_duration > 0:
+            set_plugin_cache(
+                instance,
+                placeholder,
+                lang=instance.language,
+                site_id=self.current_site.pk,
+                content={"content": content, "sekizai": watcher.get_changes()},
+                request=self.request,
+                duration=cache_duration,
+                version=self._get_plugin_cache_version(placeholder, instance.language),
+            )
+
         if editable:
             content = self.plugin_edit_template.format(
                 pk=instance.pk,
@@ -591,32 +831,69 @@ class ContentRenderer(BaseRenderer):
             plugin._placeholder_cache = placeholder
             yield self.render_plugin(plugin, context, placeholder, editable)
 
-    def _get_cached_placeholder_content(self, placeholder, language):
+    def _get_plugin_cache_version(self, placeholder, language):
+        # All plugins of a placeholder share the placeholder's cache version,
+        # only look it up once per request.
+        key = (placeholder.pk, language)
+
+        if key not in self._plugin_cache_versions:
+            version, _vary_on_list = _get_placeholder_cache_version(
+                placeholder, language, self.current_site.pk
+            )
+            self._plugin_cache_versions[key] = version
+        return self._plugin_cache_versions[key]
+
+    def _get_plugin_cache_expiration(self, instance, placeholder):
+        # The expirations of a plugin tree are computed when its root is
+        # rendered, the descendants reuse them.
+        if instance.pk not in self._plugin_cache_expirations:
+            self._plugin_cache_expirations.update(
+                get_plugin_cache_expirations(instance, placeholder, self.request)
+            )
+        return self._plugin_cache_expirations[instance.pk]
+
+    def _get_cached_plugin_content(self, instance, placeholder):
         """
-        Returns a dictionary mapping placeholder content and sekizai data.
+        Returns a dictionary mapping plugin content and sekizai data.
         Returns None if no cache is present.
         """
+        return get_plugin_cache(
+            instance,
+            placeholder,
+            lang=instance.language,
+            site_id=self.current_site.pk,
+            request=self.request,
+            version=self._get_plugin_cache_version(placeholder, instance.language),
+        )
+
+    def _get_placeholder_content_cache(self, language):
         # Placeholders can be rendered multiple times under different sites
         # it's important to have a per-site "cache".
-        site_id = self.current_site.pk
-        site_cache = self._placeholders_content_cache.setdefault(site_id, {})
+        site_cache = self._placeholders_content_cache.setdefault(self.current_site.pk, {})
         # Placeholders can be rendered multiple times under different languages
         # it's important to have a per-language "cache".
-        language_cache = site_cache.setdefault(language, {})
+        return site_cache.setdefault(language, {})
+
+    def _get_cached_placeholder_content(self, placeholder, language):
+        """
+        Returns a dictionary mapping placeholder content and sekizai data.
+        Returns None if no cache is present. The cache is read once per
+        placeholder and request, misses included.
+        """
+        language_cache = self._get_placeholder_content_cache(language)
 
         if placeholder.pk not in language_cache:
-            cached_value = get_placeholder_cache(
+            # None means nothing in the cache
+            language_cache[placeholder.pk] = get_placeholder_cache(
                 placeholder,
                 lang=language,
-                site_id=site_id,
+                site_id=self.current_site.pk,
                 request=self.request,
             )
+        return language_cache[placeholder.pk]
 
-            if cached_value is not None:
-                # None means nothing in the cache
-                # Anything else is a valid value
-                language_cache[placeholder.pk] = cached_value
-        return language_cache.get(placeholder.pk)
+    def _set_cached_placeholder_content(self, placeholder, language, content):
+        self._get_placeholder_content_cache(language)[placeholder.pk] = content
 
     def _get_content_object(self, page, slots=None):
         toolbar_obj = self.toolbar.get_object()
@@ -649,6 +926,7 @@ class ContentRenderer(BaseRenderer):
         else:
             return Placeholder.objects.none()
 
+    @profile_render("_preload_placeholders_for_page")
     def _preload_placeholders_for_page(self, page, slots=None, inherit=False):
         """
         Populates the internal plugin cache of each placeholder
@@ -693,6 +971,7 @@ class ContentRenderer(BaseRenderer):
                 placeholders=placeholders_to_fetch,
                 template=page.get_template(),
                 lang=self.request_language,
+                site_id=self.current_site.pk if self.plugin_tree_cache_is_enabled() else None,
             )
 
         # Inherit only placeholders that have no plugins
@@ -722,6 +1001,125 @@ class ContentRenderer(BaseRenderer):
 
         self._placeholders_by_page_cache[page.pk] = page_placeholder_cache
 
+    def _prerender_placeholders_for_page(self, page, context):
+        """
+        Renders all cacheable placeholders of the given page which have
+        plugins loaded in a bounded thread pool. The results are picked up
+        by render_placeholder() once the template reaches the placeholder.
+        Placeholders failing to render are logged and left to be rendered
+        in-line.
+        """
+        language = self.request_language
+        placeholders = [
+            placeholder
+            for placeholder in self._placeholders_by_page_cache[page.pk].values()
+            if placeholder.cache_placeholder
+            and getattr(placeholder, "_plugins_cache", None)
+            and (placeholder.pk, language) not in self._prerendered_placeholders
+        ]
+
+        if self.placeholder_cache_is_enabled():
+            # Placeholders served from the cache need no rendering at all
+            _cached_content = self._get_cached_placeholder_content
+            placeholders = [
+                placeholder
+                for placeholder in placeholders
+                if _cached_content(placeholder, language) is None
+            ]
+
+        if len(placeholders) < 2:
+            # Nothing to gain from rendering in parallel
+            return
+
+        from sekizai.data import UniqueSequence
+        from sekizai.helpers import get_varname
+
+        template = page.get_template()
+        max_workers = min(get_cms_setting("PLACEHOLDER_RENDER_WORKERS"), len(placeholders))
+        # Translations and time zones are thread-local,
+        # hand the ones of the current thread over to the workers.
+        active_language = translation.get_language()
+        active_timezone = timezone.get_current_timezone()
+
+        def render(renderer, placeholder, placeholder_context):
+            try:
+                with override(active_language), timezone.override(active_timezone):
+                    return renderer._prerender_placeholder(
+                        placeholder, placeholder_context, language, template
+                    )
+            finally:
+                connections.close_all()
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {}
+
+            for placeholder in placeholders:
+                # Each placeholder gets its own context and sekizai data
+                placeholder_context = copy(context)
+                placeholder_context.push({get_varname(): defaultdict(UniqueSequence)})
+                futures[placeholder] = executor.submit(
+                    render, self._get_worker_renderer(), placeholder, placeholder_context
+                )
+
+        for placeholder, future in futures.items():
+            if (exception := future.exception()) is not None:
+                logger.exception(
+                    'Placeholder "%s" failed to render in a worker thread, rendering it in-line',
+                    placeholder.slot,
+                    exc_info=exception,
+                )
+                continue
+
+            if (prerendered := future.result()) is not None:
+                self._prerendered_placeholders[(placeholder.pk, language)] = prerendered
+
+    def _get_worker_renderer(self):
+        """
+        Returns a copy of the renderer for a worker thread. The caches a
+        renderer fills while rendering are its own, so that workers never
+        write to this renderer or to each other's. The request, toolbar and
+        loaded placeholders are shared and only read.
+        """
+        renderer = copy(self)
+        # Look-ups which do not depend on the placeholder
+        renderer._cached_templates = dict(self._cached_templates)
+        renderer._cached_plugin_classes = dict(self._cached_plugin_classes)
+        renderer._plugin_cache_versions = dict(self._plugin_cache_versions)
+        # Results of the rendering
+        renderer._placeholders_content_cache = {}
+        renderer._rendered_placeholders = OrderedDict()
+        renderer._rendered_plugins_by_placeholder = {}
+        renderer._placeholder_allowed_plugins = {}
+        renderer._placeholder_plugin_menus = {}
+        renderer._prerendered_placeholders = {}
+        renderer._plugin_cache_expirations = {}
+        return renderer
+
+    def _prerender_placeholder(self, placeholder, context, language, template):
+        from sekizai.helpers import Watcher
+
+        self._update_placeholder_context(placeholder, context, template)
+        watcher = Watcher(context)
+        plugin_content = self.render_plugins(
+            placeholder,
+            language=language,
+            context=context,
+            editable=False,
+            template=template,
+        )
+
+        try:
+            content = "".join(plugin_content)
+        except Exception:
+            # Render again in-line to keep the error handling in one place
+            logger.debug(
+                "Placeholder %s failed to pre-render, rendering it in-line",
+                placeholder.pk,
+                exc_info=True,
+            )
+            return None
+        return {"content": content, "sekizai": watcher.get_changes()}
+
 
 class StructureRenderer(BaseRenderer):
     load_structure = True
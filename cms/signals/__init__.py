@@ -7,7 +7,9 @@ from django.dispatch import Signal, receiver
 from cms.exceptions import ConfirmationOfVersion4Required
 from cms.models import (
     GlobalPagePermission,
+    PageContent,
     PagePermission,
+    PageSearchDocument,
     PageUser,
     PageUserGroup,
 )
@@ -17,6 +19,7 @@ from cms.signals.log_entries import (
     log_placeholder_operations,
 )
 from cms.signals.permissions import (
+    globalpagepermission_sites_m2m_changed,
     post_save_user,
     post_save_user_group,
     pre_delete_globalpagepermission,
@@ -29,6 +32,11 @@ from cms.signals.permissions import (
     pre_save_user,
     user_m2m_changed,
 )
+from cms.signals.search import (
+    delete_search_document,
+    update_search_index_for_page_content,
+    update_search_index_for_placeholders,
+)
 from cms.utils.conf import get_cms_setting
 
 
@@ -83,6 +91,21 @@ urls_need_reloading.connect(
 post_obj_operation.connect(log_page_operations)
 post_placeholder_operation.connect(log_placeholder_operations)
 
+# ##################### search index #######################
+
+post_placeholder_operation.connect(
+    update_search_index_for_placeholders, dispatch_uid='cms_update_search_index_for_placeholders'
+)
+signals.post_save.connect(
+    update_search_index_for_page_content, sender=PageContent, dispatch_uid='cms_post_save_search_index'
+)
+signals.post_delete.connect(
+    update_search_index_for_page_content, sender=PageContent, dispatch_uid='cms_post_delete_search_index'
+)
+signals.post_delete.connect(
+    delete_search_document, sender=PageSearchDocument, dispatch_uid='cms_post_delete_search_document'
+)
+
 # ##################### permissions #######################
 
 if get_cms_setting('PERMISSION'):
@@ -116,3 +139,7 @@ if get_cms_setting('PERMISSION'):
         pre_delete_globalpagepermission, sender=GlobalPagePermission,
         dispatch_uid='cms_pre_delete_globalpagepermission'
     )
+    signals.m2m_changed.connect(
+        globalpagepermission_sites_m2m_changed, sender=GlobalPagePermission.sites.through,
+        dispatch_uid='cms_globalpagepermission_sites_m2m_changed'
+    )
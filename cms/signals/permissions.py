@@ -1,12 +1,92 @@
 from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import F
 
-from cms.cache.permissions import clear_user_permission_cache
-from cms.models import PageUser, PageUserGroup
+from cms.cache.permissions import clear_users_permission_cache
+from cms.models import GlobalPagePermission, PagePermission, PageUser, PageUserGroup
 from menus.menu_pool import menu_pool
 
 User = get_user_model()
 
 
+class PermissionCacheInvalidation:
+    """
+    Collects the users whose cached permissions and menus are outdated and
+    the sites whose menus are affected by changed view restrictions.
+
+    All changes made within one transaction are invalidated at once, after
+    the transaction has been committed.
+    """
+
+    def __init__(self, using=None):
+        self.using = using
+        self.user_ids = set()
+        self.group_ids = set()
+        self.site_ids = set()
+        self.run_on_commit = None
+        self.done = False
+
+    def __call__(self):
+        if self.done:
+            return
+
+        self.done = True
+        user_ids = set(self.user_ids)
+
+        if self.group_ids:
+            # Members of changed groups are resolved once committed
+            user_ids.update(
+                User.objects.using(self.using).filter(groups__in=self.group_ids).values_list('pk', flat=True)
+            )
+
+        clear_users_permission_cache(user_ids)
+
+        for site_id in self.site_ids:
+            menu_pool.clear(site_id=site_id)
+        menu_pool.clear_user_menus(user_ids)
+
+
+def _get_pending_invalidation(connection):
+    """
+    Returns the invalidation which runs once the current transaction of
+    «connection» has been committed. A new one is registered if there is
+    none yet, if it already ran or if its callback was discarded by a
+    rollback, which replaces the list of callbacks of the connection.
+    """
+    pending = getattr(connection, '_cms_permission_cache_invalidation', None)
+
+    if pending is None or pending.done or pending.run_on_commit is not connection.run_on_commit:
+        pending = PermissionCacheInvalidation(connection.alias)
+        transaction.on_commit(pending, using=connection.alias)
+        pending.run_on_commit = connection.run_on_commit
+        connection._cms_permission_cache_invalidation = pending
+    return pending
+
+
+def invalidate_permission_cache(user_ids=(), group_ids=(), site_ids=(), using=None):
+    """
+    Clears the permission cache and the menus of the given users and the
+    members of the given groups. Menus of all users are cleared for the
+    given «site_ids».
+
+    Within a transaction, all calls are coalesced into one invalidation
+    which runs once the transaction has been committed.
+    """
+    connection = transaction.get_connection(using)
+
+    if connection.in_atomic_block:
+        pending = _get_pending_invalidation(connection)
+    else:
+        pending = PermissionCacheInvalidation(connection.alias)
+
+    pending.user_ids.update(user_ids)
+    pending.group_ids.update(group_ids)
+    pending.site_ids.update(site_ids)
+
+    if not connection.in_atomic_block:
+        pending()
+
+
 def post_save_user(instance, raw, created, **kwargs):
     """Signal called when new user is created, required only when CMS_PERMISSION.
     Assigns creator of the user to PageUserInfo model, so we know who had created
@@ -27,8 +107,7 @@ def post_save_user(instance, raw, created, **kwargs):
     page_user.__dict__.update(instance.__dict__)
     page_user.save()
 
-    clear_user_permission_cache(instance)
-    menu_pool.clear(all=True)
+    invalidate_permission_cache(user_ids=[instance.pk])
 
 
 def post_save_user_group(instance, raw, created, **kwargs):
@@ -51,65 +130,117 @@ def post_save_user_group(instance, raw, created, **kwargs):
 
 
 def pre_save_user(instance, raw, **kwargs):
-    clear_user_permission_cache(instance)
-    menu_pool.clear(all=True)
+    if instance.pk:
+        invalidate_permission_cache(user_ids=[instance.pk])
 
 
 def pre_delete_user(instance, **kwargs):
-    clear_user_permission_cache(instance)
-    menu_pool.clear(all=True)
+    invalidate_permission_cache(user_ids=[instance.pk])
 
 
 def pre_save_group(instance, raw, **kwargs):
     if instance.pk:
-        menu_pool.clear(all=True)
-        user_set = instance.user_set
-        for user in user_set.all():
-            clear_user_permission_cache(user)
+        invalidate_permission_cache(group_ids=[instance.pk])
 
 
 def pre_delete_group(instance, **kwargs):
-    user_set = instance.user_set
-    menu_pool.clear(all=True)
-    for user in user_set.all():
-        clear_user_permission_cache(user)
+    # The members are gone once the group has been deleted
+    user_ids = instance.user_set.values_list('pk', flat=True)
+    invalidate_permission_cache(user_ids=list(user_ids))
 
 
 def user_m2m_changed(instance, action, reverse, pk_set, **kwargs):
-    if action in (
-        "pre_add",
-        "pre_remove",
-    ):
-        menu_pool.clear(all=True)
+    if action in ("pre_add", "pre_remove"):
+        if reverse:
+            invalidate_permission_cache(user_ids=pk_set)
+        else:
+            invalidate_permission_cache(user_ids=[instance.pk])
+    elif action == "pre_clear":
         if reverse:
-            for user in User.objects.filter(pk__in=pk_set):
-                clear_user_permission_cache(user)
+            user_ids = instance.user_set.values_list('pk', flat=True)
+            invalidate_permission_cache(user_ids=list(user_ids))
         else:
-            clear_user_permission_cache(instance)
+            invalidate_permission_cache(user_ids=[instance.pk])
+
+
+def _clear_users_permissions(*permissions):
+    """
+    Invalidates the caches of the users and groups a permission (given as
+    dictionaries of its values, e.g. before and after a change) applies to.
+    """
+    user_ids = set()
+    group_ids = set()
+    site_ids = set()
+
+    for values in filter(None, permissions):
+        if values['user_id']:
+            user_ids.add(values['user_id'])
+        if values['group_id']:
+            group_ids.add(values['group_id'])
+        if values.get('can_view') and values.get('site_id'):
+            # View restrictions change the menus of all users of the site
+            site_ids.add(values['site_id'])
+
+    if group_ids:
+        # Members are resolved now, the group might lose them before
+        # the invalidation happens.
+        user_ids.update(User.objects.filter(groups__in=group_ids).values_list('pk', flat=True))
+    invalidate_permission_cache(user_ids=user_ids, site_ids=site_ids)
+
+
+def _get_permission_values(instance):
+    return {'user_id': instance.user_id, 'group_id': instance.group_id}
 
 
-def _clear_users_permissions(instance):
-    if instance.user:
-        clear_user_permission_cache(instance.user)
-        menu_pool.clear(all=True)
-    if instance.group:
-        user_set = instance.group.user_set
-        for user in user_set.all():
-            clear_user_permission_cache(user)
-        menu_pool.clear(all=True)
+def _get_page_permission_values(instance):
+    values = _get_permission_values(instance)
+    values['can_view'] = instance.can_view
+    values['site_id'] = instance.page.site_id if instance.page_id else None
+    return values
 
 
 def pre_save_pagepermission(instance, raw, **kwargs):
-    _clear_users_permissions(instance)
+    old_values = None
+
+    if instance.pk:
+        old_values = (
+            PagePermission
+            .objects
+            .filter(pk=instance.pk)
+            .values('user_id', 'group_id', 'can_view', site_id=F('page__site_id'))
+            .first()
+        )
+    _clear_users_permissions(_get_page_permission_values(instance), old_values)
 
 
 def pre_delete_pagepermission(instance, **kwargs):
-    _clear_users_permissions(instance)
+    _clear_users_permissions(_get_page_permission_values(instance))
 
 
 def pre_save_globalpagepermission(instance, raw, **kwargs):
-    _clear_users_permissions(instance)
+    old_values = None
+
+    if instance.pk:
+        old_values = GlobalPagePermission.objects.filter(pk=instance.pk).values('user_id', 'group_id').first()
+    _clear_users_permissions(_get_permission_values(instance), old_values)
 
 
 def pre_delete_globalpagepermission(instance, **kwargs):
-    _clear_users_permissions(instance)
+    _clear_users_permissions(_get_permission_values(instance))
+
+
+def globalpagepermission_sites_m2m_changed(instance, action, reverse, pk_set, **kwargs):
+    if action not in ("pre_add", "pre_remove", "pre_clear"):
+        return
+
+    if not reverse:
+        _clear_users_permissions(_get_permission_values(instance))
+        return
+
+    permissions = GlobalPagePermission.objects.all()
+
+    if action == "pre_clear":
+        permissions = permissions.filter(sites=instance)
+    else:
+        permissions = permissions.filter(pk__in=pk_set)
+    _clear_users_permissions(*permissions.values('user_id', 'group_id'))
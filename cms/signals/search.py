@@ -0,0 +1,41 @@
+from cms.models import PageContent, Placeholder
+from cms.utils.conf import get_cms_setting
+
+
+def update_search_index_for_placeholders(sender, **kwargs):
+    """
+    Updates the search documents of the page contents whose placeholders
+    have been changed by a placeholder operation.
+    """
+    from cms.utils.search import update_search_index
+
+    if not get_cms_setting('SEARCH_INDEX'):
+        return
+
+    page_contents = []
+
+    for value in kwargs.values():
+        if isinstance(value, Placeholder) and isinstance(value.source, PageContent):
+            page_contents.append(value.source)
+    update_search_index(page_contents)
+
+
+def update_search_index_for_page_content(instance, raw=False, **kwargs):
+    from cms.utils.search import update_search_index
+
+    if raw or not get_cms_setting('SEARCH_INDEX'):
+        return
+    update_search_index([instance])
+
+
+def delete_search_document(instance, using, **kwargs):
+    """
+    Removes a deleted search document from the search backend, e.g., after
+    its page has been deleted.
+    """
+    from cms.utils.search import get_search_backend
+
+    backend = get_search_backend(using)
+
+    if backend is not None:
+        backend.delete([instance.pk])
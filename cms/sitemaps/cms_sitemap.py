@@ -1,10 +1,24 @@
+import hashlib
+from urllib.parse import quote
+
 from django.contrib.sitemaps import Sitemap
-from django.db.models import OuterRef, Q, QuerySet, Subquery
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.db.models import Count, Max, OuterRef, Q, QuerySet, Subquery, Sum
+from django.db.models.functions import Length
+from django.urls import NoReverseMatch, reverse
+from django.utils.functional import cached_property
+from django.utils.http import RFC3986_SUBDELIMS
+from django.utils.translation import override as force_language
 
-from cms.models import PageContent, PageUrl
+from cms.models import Page, PageContent, PageUrl
 from cms.utils import get_current_site
+from cms.utils.conf import get_cms_setting
 from cms.utils.i18n import get_public_languages
 
+# Slug used to find the url prefix and suffix of the page urls
+URL_MARKER = "cms-sitemap-slug"
+
 
 def from_iterable(iterables):
     """
@@ -14,6 +28,39 @@ def from_iterable(iterables):
         yield from it
 
 
+class ShardPaginator(Paginator):
+    """
+    Paginator of a :class:`CMSSitemap` whose pages (shards) are ranges of page
+    paths: shard *n* holds the urls of the pages with a path from
+    ``boundaries[n - 1]`` up to (excluding) ``boundaries[n]``. The urls of a
+    page are never split across shards.
+    """
+
+    def __init__(self, sitemap, boundaries):
+        super().__init__([], sitemap.limit)
+        self.sitemap = sitemap
+        self.boundaries = boundaries
+
+    @cached_property
+    def count(self):
+        return self.sitemap.items().count()
+
+    @cached_property
+    def num_pages(self):
+        return len(self.boundaries)
+
+    def get_range(self, number):
+        """Returns the first path and the path after the last one of a shard."""
+        number = self.validate_number(number)
+        end = self.boundaries[number] if number < len(self.boundaries) else None
+        return self.boundaries[number - 1], end
+
+    def page(self, number):
+        number = self.validate_number(number)
+        start, end = self.get_range(number)
+        return self._get_page(list(self.sitemap.get_shard_items(start, end)), number, self)
+
+
 class CMSSitemap(Sitemap):
     changefreq: str = "monthly"
     priority: float = 0.5
@@ -47,7 +94,11 @@ class CMSSitemap(Sitemap):
         # QuerySet in this case in order to be compatible with
         # djangocms-page-sitemap.
         site = get_current_site()
-        languages = get_public_languages(site_id=site.pk)
+        # Leaves out languages without page urls (e.g., not in i18n_patterns)
+        languages = [
+            language for language in get_public_languages(site_id=site.pk)
+            if self._get_url_format(language) is not None
+        ]
 
         return (
             PageUrl.objects.get_for_site(site)
@@ -64,8 +115,162 @@ class CMSSitemap(Sitemap):
             .filter(content_changed_date__isnull=False)  # Remove page content with redirects
         )
 
+    def get_shard_items(self, start, end=None):
+        """
+        Returns the items of the pages with a path from «start» up to
+        (excluding) «end».
+        """
+        items = self.items().filter(page__path__gte=start)
+
+        if end is not None:
+            items = items.filter(page__path__lt=end)
+        return items
+
     def lastmod(self, page_url):
         return page_url.content_changed_date
 
     def location(self, page_url):
-        return page_url.get_absolute_url(page_url.language)
+        url_format = self._get_url_format(page_url.language)
+
+        if url_format is None:
+            raise NoReverseMatch(f"Page urls in {page_url.language} can't be reversed.")
+
+        root, prefix, suffix = url_format
+
+        if page_url.path == "":
+            return root
+        return f"{prefix}{quote(page_url.path, safe=RFC3986_SUBDELIMS + '/~:@')}{suffix}"
+
+    def _get_url_format(self, language):
+        """
+        Returns the url of the root page and the strings before and after the
+        path of the page urls in «language». Only two urls are reversed per
+        language instead of one per item.
+        """
+        url_formats = self.__dict__.setdefault("_url_formats", {})
+
+        if language not in url_formats:
+            with force_language(language):
+                try:
+                    root = reverse("pages-root")
+                    marker_url = reverse("pages-details-by-slug", kwargs={"slug": URL_MARKER})
+                except NoReverseMatch:
+                    url_formats[language] = None
+                else:
+                    prefix, marker, suffix = marker_url.rpartition(URL_MARKER)
+                    url_formats[language] = (root, prefix, suffix)
+        return url_formats[language]
+
+    def get_latest_lastmod(self):
+        return self.items().aggregate(lastmod=Max("content_changed_date"))["lastmod"]
+
+    @property
+    def paginator(self):
+        if "_paginator" not in self.__dict__:
+            self._paginator = ShardPaginator(self, self._get_shard_boundaries())
+        return self._paginator
+
+    def get_urls(self, page=1, site=None, protocol=None):
+        """
+        Returns the urls of a shard. The urls are cached and only re-created
+        if a page in the shard (or one of their ancestors) changed.
+        """
+        protocol = self.get_protocol(protocol)
+        domain = self.get_domain(site)
+        start, end = self.paginator.get_range(page)
+        duration = get_cms_setting("SITEMAP_CACHE_DURATION")
+
+        if not duration:
+            return self._urls(page, protocol, domain)
+
+        key = self._get_cache_key("urls", protocol, domain, start, end)
+        fingerprint = self._get_fingerprint(start, end)
+        cached = cache.get(key)
+
+        if cached and cached[0] == fingerprint:
+            urls, latest_lastmod = cached[1:]
+        else:
+            urls = self._urls(page, protocol, domain)
+            latest_lastmod = getattr(self, "latest_lastmod", None)
+            cache.set(key, (fingerprint, urls, latest_lastmod), duration)
+
+            if len(urls) > self.limit:
+                # Pages have been added or moved into the shard
+                cache.delete(self._get_cache_key("shards"))
+
+        if latest_lastmod:
+            self.latest_lastmod = latest_lastmod
+        return urls
+
+    def _get_shard_boundaries(self):
+        """
+        Returns the first page path of each shard. Shards hold up to
+        ``limit`` urls. The boundaries are cached until the number of urls
+        changes.
+        """
+        key = self._get_cache_key("shards")
+        count = self.items().count()
+        cached = cache.get(key)
+
+        if cached and cached[0] == count:
+            return cached[1]
+
+        boundaries = [""]
+        urls = 0
+        pages = (
+            self.items()
+            .values_list("page__path")
+            .annotate(urls=Count("pk"))
+            .order_by("page__path")
+        )
+
+        for path, page_urls in pages.iterator():
+            if urls and urls + page_urls > self.limit:
+                boundaries.append(path)
+                urls = 0
+            urls += page_urls
+
+        duration = get_cms_setting("SITEMAP_CACHE_DURATION")
+
+        if duration:
+            cache.set(key, (count, boundaries), duration)
+        return boundaries
+
+    def _get_fingerprint(self, start, end):
+        """
+        Returns aggregates of the urls and contents of the pages with a path
+        from «start» up to (excluding) «end» and of the ancestors of the first
+        one, whose slugs are part of the urls. They change if a page or url is
+        added, deleted, moved or changed.
+        """
+        site = get_current_site()
+        languages = get_public_languages(site_id=site.pk)
+        paths = Q(path__gte=start)
+
+        if end is not None:
+            paths &= Q(path__lt=end)
+
+        ancestors = [start[:pos] for pos in range(Page.steplen, len(start), Page.steplen)]
+        pages = Page.objects.on_site(site).filter(paths | Q(path__in=ancestors)).values("pk")
+        urls = PageUrl.objects.filter(page__in=pages, language__in=languages).aggregate(
+            count=Count("pk"),
+            length=Sum(Length("path")),
+            changed=Max("page__changed_date"),
+        )
+        contents = PageContent.admin_manager.filter(page__in=pages, language__in=languages).aggregate(
+            count=Count("pk"),
+            changed=Max("changed_date"),
+        )
+        return urls["count"], urls["length"], urls["changed"], contents["count"], contents["changed"]
+
+    def _get_cache_key(self, name, *args):
+        site = get_current_site()
+        languages = get_public_languages(site_id=site.pk)
+        sitemap = f"{type(self).__module__}.{type(self).__qualname__}"
+        key = ":".join(str(arg) for arg in (sitemap, self.limit, *languages, *args))
+        return "{prefix}sitemap_{name}:{site_id}:{hash}".format(
+            prefix=get_cms_setting("CACHE_PREFIX"),
+            name=name,
+            site_id=site.pk,
+            hash=hashlib.sha1(key.encode("utf-8")).hexdigest(),
+        )
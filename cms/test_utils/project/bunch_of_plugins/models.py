@@ -1,3 +1,5 @@
+from django.db import models
+
 from cms.models import CMSPlugin
 
 
@@ -15,3 +17,15 @@ class RightMixin:
 
 class TestPlugin2(LeftMixin, CMSPlugin, RightMixin):
     pass
+
+
+class TestPlugin3(CMSPlugin):
+    # The pointer to CMSPlugin is not the first column of the table
+    title = models.CharField(max_length=32, blank=True)
+    cmsplugin_ptr = models.OneToOneField(
+        CMSPlugin,
+        on_delete=models.CASCADE,
+        parent_link=True,
+        primary_key=True,
+        related_name='bunch_of_plugins_testplugin3',
+    )
@@ -1,7 +1,10 @@
 import time
+from unittest.mock import patch
 
 from django.conf import settings
+from django.db import connection
 from django.template import Context
+from django.test.utils import CaptureQueriesContext, override_settings
 from sekizai.context import SekizaiContext
 
 from cms.api import add_plugin, create_page, create_page_content
@@ -16,7 +19,7 @@ from cms.cache.placeholder import (
     set_placeholder_cache,
 )
 from cms.exceptions import PluginAlreadyRegistered
-from cms.models import Page
+from cms.models import Page, Placeholder
 from cms.plugin_pool import plugin_pool
 from cms.test_utils.project.placeholderapp.models import Example1
 from cms.test_utils.project.pluginapp.plugins.caching.cms_plugins import (
@@ -827,3 +830,149 @@ class PlaceholderCacheTestCase(CMSTestCase):
                 self.placeholder_en, "en", 1, en_crazy_request
             )
             self.assertEqual(en_crazy_content, cached_en_crazy_content)
+
+
+@override_settings(CMS_PLUGIN_FRAGMENT_CACHE=True)
+class PluginCacheTestCase(CMSTestCase):
+    def setUp(self):
+        from django.core.cache import cache
+
+        super().setUp()
+        cache.clear()
+
+        plugin_pool.register_plugin(NoCachePlugin)
+        example = Example1.objects.create(char_1="one", char_2="two", char_3="tree", char_4="four")
+        self.placeholder = example.placeholder
+        self.text_plugin = add_plugin(self.placeholder, "TextPlugin", "en", body="Cached text")
+        add_plugin(self.placeholder, "NoCachePlugin", "en")
+
+    def tearDown(self):
+        from django.core.cache import cache
+
+        super().tearDown()
+        plugin_pool.unregister_plugin(NoCachePlugin)
+        cache.clear()
+
+    def render_placeholder(self):
+        request = self.get_request()
+        context = SekizaiContext()
+        context["request"] = request
+        content_renderer = self.get_content_renderer(request)
+        # Fresh instance, so no plugins are cached on the placeholder
+        placeholder = Placeholder.objects.get(pk=self.placeholder.pk)
+        return content_renderer.render_placeholder(placeholder, context, language="en")
+
+    def test_cacheable_plugins_are_cached(self):
+        text_plugin_class = plugin_pool.get_plugin("TextPlugin")
+        content = self.render_placeholder()
+        self.assertIn("Cached text", content)
+
+        with patch.object(
+            text_plugin_class, "render", autospec=True, side_effect=text_plugin_class.render
+        ) as text_render, patch.object(
+            NoCachePlugin, "render", autospec=True, side_effect=NoCachePlugin.render
+        ) as nocache_render:
+            content = self.render_placeholder()
+        self.assertIn("Cached text", content)
+        # Only the plugin with cache = False is rendered again
+        text_render.assert_not_called()
+        nocache_render.assert_called_once()
+
+    def test_plugin_cache_cleared_with_placeholder_cache(self):
+        text_plugin_class = plugin_pool.get_plugin("TextPlugin")
+        self.render_placeholder()
+        self.placeholder.clear_cache("en")
+
+        with patch.object(
+            text_plugin_class, "render", autospec=True, side_effect=text_plugin_class.render
+        ) as text_render:
+            self.render_placeholder()
+        text_render.assert_called_once()
+
+    def test_plugin_cache_changed_plugin(self):
+        self.assertIn("Cached text", self.render_placeholder())
+        self.text_plugin.body = "Changed text"
+        self.text_plugin.save()
+        self.assertIn("Changed text", self.render_placeholder())
+
+    def test_plugin_cache_expirations_computed_once_per_plugin(self):
+        from cms.cache.plugin import get_plugin_cache_expirations
+        from cms.utils.plugins import get_plugins
+
+        columns = add_plugin(self.placeholder, "MultiColumnPlugin", "en")
+        column = add_plugin(self.placeholder, "ColumnPlugin", "en", target=columns)
+        text = add_plugin(self.placeholder, "TextPlugin", "en", target=column, body="Nested text")
+        request = self.get_request()
+        placeholder = Placeholder.objects.get(pk=self.placeholder.pk)
+        root = next(plugin for plugin in get_plugins(request, placeholder, None, "en") if plugin.pk == columns.pk)
+
+        with patch.object(
+            Placeholder, "get_plugin_cache_ttl", autospec=True, side_effect=Placeholder.get_plugin_cache_ttl
+        ) as get_ttl:
+            expirations = get_plugin_cache_expirations(root, placeholder, request)
+        # Each plugin of the tree is looked at once, not once per ancestor
+        self.assertEqual(get_ttl.call_count, 3)
+        self.assertEqual(set(expirations), {columns.pk, column.pk, text.pk})
+        self.assertEqual(expirations[columns.pk], min(expirations.values()))
+
+    @override_settings(CMS_PLUGIN_FRAGMENT_CACHE=False)
+    def test_plugin_cache_disabled(self):
+        text_plugin_class = plugin_pool.get_plugin("TextPlugin")
+        self.render_placeholder()
+
+        with patch.object(
+            text_plugin_class, "render", autospec=True, side_effect=text_plugin_class.render
+        ) as text_render:
+            self.render_placeholder()
+        text_render.assert_called_once()
+
+
+@override_settings(CMS_PLUGIN_TREE_CACHE=True, CMS_PAGE_CACHE=False, CMS_PLACEHOLDER_CACHE=False)
+class PluginTreeCacheTestCase(CMSTestCase):
+    def setUp(self):
+        from django.core.cache import cache
+
+        super().setUp()
+        cache.clear()
+
+        self.page = create_page("home", "nav_playground.html", "en")
+        self.placeholder = self.page.get_placeholders("en").get(slot="body")
+        columns = add_plugin(self.placeholder, "MultiColumnPlugin", "en")
+        column = add_plugin(self.placeholder, "ColumnPlugin", "en", target=columns)
+        self.text_plugin = add_plugin(self.placeholder, "TextPlugin", "en", target=column, body="Cached tree")
+
+    def tearDown(self):
+        from django.core.cache import cache
+
+        super().tearDown()
+        cache.clear()
+
+    def get_plugin_queries(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(self.page.get_absolute_url("en"))
+        self.assertContains(response, "Cached tree")
+        return [query["sql"] for query in ctx.captured_queries if "cms_cmsplugin" in query["sql"]]
+
+    def test_plugin_tree_is_cached(self):
+        self.assertTrue(self.get_plugin_queries())
+        self.assertEqual(self.get_plugin_queries(), [])
+
+    def test_plugin_tree_cache_cleared_with_placeholder_cache(self):
+        self.get_plugin_queries()
+        self.text_plugin.body = "Changed tree"
+        self.text_plugin.save()
+        self.placeholder.clear_cache("en")
+
+        response = self.client.get(self.page.get_absolute_url("en"))
+        self.assertContains(response, "Changed tree")
+
+    def test_plugin_tree_cache_not_used_for_staff(self):
+        self.get_plugin_queries()
+
+        with self.login_user_context(self.get_superuser()):
+            self.assertTrue(self.get_plugin_queries())
+
+    @override_settings(CMS_PLUGIN_TREE_CACHE=False)
+    def test_plugin_tree_cache_disabled(self):
+        self.get_plugin_queries()
+        self.assertTrue(self.get_plugin_queries())
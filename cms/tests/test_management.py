@@ -1,16 +1,17 @@
 import uuid
 from io import StringIO
+from unittest.mock import patch
 
 from django.conf import settings
 from django.contrib.sites.models import Site
 from django.core import management
 from django.core.management import CommandError
-from django.db import models
-from django.test.utils import override_settings
+from django.db import connection, models
+from django.test.utils import CaptureQueriesContext, override_settings
 from djangocms_text_ckeditor.cms_plugins import TextPlugin
 
 from cms.api import add_plugin, create_page, create_page_content
-from cms.management.commands.subcommands.list import plugin_report
+from cms.management.commands.subcommands.list import get_unsaved_instances, plugin_report
 from cms.models import Page
 from cms.models.placeholdermodel import Placeholder
 from cms.models.pluginmodel import CMSPlugin
@@ -106,6 +107,62 @@ class ManagementTestCase(CMSTestCase):
         for page, path in tree:
             self.assertEqual(page.path, path)
 
+    def test_fix_tree_paths_and_urls(self):
+        home = create_page("Home", "nav_playground.html", "en")
+        home.set_as_homepage()
+        about = create_page("About", "nav_playground.html", "en", parent=home)
+        create_page_content("de", "Ueber uns", about)
+        team = create_page("Team", "nav_playground.html", "en", parent=about)
+        create_page_content("de", "Team", team)
+        contact = create_page("Contact", "nav_playground.html", "en")
+        loop = create_page("Loop", "nav_playground.html", "en")
+        loop_child = create_page("Child", "nav_playground.html", "en", parent=loop)
+
+        # Gaps, wrong depth and numchild, broken urls and a parent cycle
+        Page.objects.filter(pk=home.pk).update(path="0007", numchild=0)
+        Page.objects.filter(pk=about.pk).update(path="00070009", depth=5)
+        Page.objects.filter(pk=team.pk).update(path="000700090003")
+        Page.objects.filter(pk=contact.pk).update(path="0010")
+        Page.objects.filter(pk=loop.pk).update(parent=loop_child)
+        team.urls.update(path="broken")
+
+        out = StringIO()
+        management.call_command('cms', 'fix-tree', interactive=False, stdout=out)
+        self.assertIn("1 page(s) in a parent cycle moved to the root level", out.getvalue())
+
+        expected = [
+            (home.pk, "0001", 1, 1),
+            (about.pk, "00010001", 2, 1),
+            (team.pk, "000100010001", 3, 0),
+            (contact.pk, "0002", 1, 0),
+            (loop.pk, "0003", 1, 1),
+            (loop_child.pk, "00030001", 2, 0),
+        ]
+        self.assertEqual(
+            list(Page.objects.order_by("path").values_list("pk", "path", "depth", "numchild")),
+            expected,
+        )
+        self.assertIsNone(Page.objects.get(pk=loop.pk).parent_id)
+        self.assertEqual(Page.find_problems(), ([], [], [], [], []))
+        self.assertEqual(team.urls.get(language="en").path, "about/team")
+        self.assertEqual(team.urls.get(language="de").path, "ueber-uns/team")
+        self.assertEqual(loop_child.urls.get().path, "loop/child")
+
+    def test_fix_tree_queries(self):
+        create_page("home", "nav_playground.html", "en")
+        management.call_command('cms', 'fix-tree', interactive=False, stdout=StringIO())
+
+        with CaptureQueriesContext(connection) as ctx:
+            management.call_command('cms', 'fix-tree', interactive=False, stdout=StringIO())
+
+        for i in range(10):
+            page = create_page(f"page {i}", "nav_playground.html", "en")
+            create_page(f"child {i}", "nav_playground.html", "en", parent=page)
+
+        # The number of queries doesn't depend on the number of pages
+        with self.assertNumQueries(len(ctx.captured_queries)):
+            management.call_command('cms', 'fix-tree', interactive=False, stdout=StringIO())
+
     @override_settings(INSTALLED_APPS=TEST_INSTALLED_APPS)
     def test_uninstall_apphooks_with_apphook(self):
         with apphooks(SampleApp):
@@ -210,9 +267,18 @@ class ManagementTestCase(CMSTestCase):
             instanceless_plugin)
 
         self.assertEqual(
-            text_plugins_report["unsaved_instances"],
+            list(text_plugins_report["unsaved_instances"]),
             [instanceless_plugin])
 
+    def test_list_plugins_ignores_default_manager(self):
+        placeholder = Placeholder.objects.create(slot="test")
+        add_plugin(placeholder, TextPlugin, "en", body="en body")
+        plugins = CMSPlugin.objects.filter(plugin_type="TextPlugin")
+
+        # A default manager hiding rows must not make plugins look unsaved
+        with patch.object(TextPlugin.model, "objects", TextPlugin.model.objects.none()):
+            self.assertEqual(list(get_unsaved_instances(plugins, TextPlugin.model)), [])
+
     @override_settings(INSTALLED_APPS=TEST_INSTALLED_APPS)
     def test_delete_orphaned_plugins(self):
         placeholder = Placeholder.objects.create(slot="test")
@@ -288,6 +354,33 @@ class ManagementTestCase(CMSTestCase):
         max_position = placeholder.cmsplugin_set.aggregate(models.Max('position'))['position__max']
         self.assertEqual(max_position, 3)
 
+    @override_settings(INSTALLED_APPS=TEST_INSTALLED_APPS)
+    def test_delete_orphaned_plugins_in_chunks(self):
+        placeholder = Placeholder.objects.create(slot="test")
+        for language in ("en", "de"):
+            for i in range(3):
+                add_plugin(placeholder, TextPlugin, language, body="body")
+                bogus_plugin = CMSPlugin(language=language, plugin_type="BogusPlugin", placeholder=placeholder)
+                placeholder.add_plugin(bogus_plugin)
+                # Descendants of orphaned plugins are deleted with them
+                add_plugin(placeholder, "LinkPlugin", language, target=bogus_plugin, name="A Link")
+
+        out = StringIO()
+        management.call_command('cms', 'delete-orphaned-plugins', '--dry-run', interactive=False, stdout=out)
+        self.assertIn("6 uninstalled plugins", out.getvalue())
+        self.assertIn("dry run, nothing deleted", out.getvalue())
+        self.assertEqual(placeholder.cmsplugin_set.count(), 18)
+
+        out = StringIO()
+        management.call_command('cms', 'delete-orphaned-plugins', '--chunk-size=4', interactive=False, stdout=out)
+        self.assertIn("4/6 plugins deleted", out.getvalue())
+        self.assertIn("6/6 plugins deleted", out.getvalue())
+
+        for language in ("en", "de"):
+            plugins = placeholder.get_plugins(language)
+            self.assertEqual(list(plugins.values_list("plugin_type", flat=True)), ["TextPlugin"] * 3)
+            self.assertEqual(list(plugins.values_list("position", flat=True)), [1, 2, 3])
+
     def test_uninstall_plugins_without_plugin(self):
         out = StringIO()
         management.call_command('cms', 'uninstall', 'plugins', PLUGIN, interactive=False, stdout=out)
@@ -378,6 +471,61 @@ class PageFixtureManagementTestCase(NavextendersFixture, CMSTestCase):
         self.assertEqual(stack_text_en.plugin_type, stack_text_de.plugin_type)
         self.assertEqual(stack_text_en.body, stack_text_de.body)
 
+    def test_copy_langs_in_batches(self):
+        """
+        Pages are copied in chunks, the number of queries does not grow with
+        the number of pages of a chunk and an interrupted copy can be resumed
+        after the last page reported
+        """
+        site = 1
+        pages = list(Page.objects.on_site(site).order_by('pk'))
+        number_start_plugins = CMSPlugin.objects.count()
+        number_first_plugins = CMSPlugin.objects.filter(placeholder__in=pages[0].get_placeholders('en')).count()
+
+        out = StringIO()
+        management.call_command(
+            'cms', 'copy', 'lang', '--from-lang=en', '--to-lang=de', '--batch-size=2',
+            '--resume-after=%d' % pages[0].pk, '--userid=%d' % self.get_superuser().id,
+            interactive=False, stdout=out
+        )
+        text = out.getvalue()
+
+        self.assertEqual(['en'], pages[0].get_languages())
+        self.assertIn('2/%d pages copied, last page id %d' % (len(pages) - 1, pages[2].pk), text)
+        self.assertIn('%d/%d pages copied, last page id %d' % (len(pages) - 1, len(pages) - 1, pages[-1].pk), text)
+        self.assertEqual(
+            CMSPlugin.objects.filter(language='de').count(), number_start_plugins - number_first_plugins
+        )
+
+        # Resume the copy from the beginning: only the first page is left
+        management.call_command(
+            'cms', 'copy', 'lang', '--from-lang=en', '--to-lang=de', '--userid=%d' % self.get_superuser().id,
+            interactive=False, stdout=StringIO()
+        )
+
+        self.assertEqual({'en', 'de'}, set(Page.objects.get(pk=pages[0].pk).get_languages()))
+        self.assertEqual(CMSPlugin.objects.filter(language='de').count(), number_start_plugins)
+
+    def test_copy_pages_to_language_queries(self):
+        from cms.utils.language_copy import copy_pages_to_language
+
+        pages = list(Page.objects.on_site(1))
+        user = self.get_superuser()
+
+        with CaptureQueriesContext(connection) as one_page:
+            copy_pages_to_language(pages[:1], 'en', 'de', user=user)
+
+        with CaptureQueriesContext(connection) as all_pages:
+            created, copied = copy_pages_to_language(pages[1:], 'en', 'de', user=user)
+
+        self.assertEqual(created, len(pages) - 1)
+        self.assertEqual(copied, sum(
+            CMSPlugin.objects.filter(placeholder__in=page.get_placeholders('en'), language='en').count()
+            for page in pages[1:]
+        ))
+        # Plugins are loaded and inserted for all pages at once
+        self.assertLess(len(all_pages.captured_queries), len(one_page.captured_queries) * (len(pages) - 1))
+
     def test_copy_langs_no_content(self):
         """
         Various checks here:
@@ -634,6 +782,20 @@ class PageFixtureManagementTestCase(NavextendersFixture, CMSTestCase):
         # global number of plugins
         self.assertEqual(CMSPlugin.objects.all().count(), number_start_plugins + number_site2_plugins * 2)
 
+    def test_copy_langs_without_user(self):
+        with self.assertRaisesMessage(CommandError, 'Specify either --userid or --username'):
+            management.call_command(
+                'cms', 'copy', 'lang', '--from-lang=en', '--to-lang=de', interactive=False, stdout=StringIO()
+            )
+
+        # Other errors are not reported as a missing user
+        with patch('cms.management.commands.subcommands.copy.copy_pages_to_language', side_effect=ValueError):
+            with self.assertRaises(ValueError):
+                management.call_command(
+                    'cms', 'copy', 'lang', '--from-lang=en', '--to-lang=de',
+                    '--userid=%d' % self.get_superuser().id, interactive=False, stdout=StringIO()
+                )
+
     def test_copy_bad_languages(self):
         out = StringIO()
         with self.assertRaises(CommandError) as command_error:
@@ -486,6 +486,19 @@ class FixturesMenuTests(MenusFixture, BaseMenuTest):
         menu_pool.clear(site_id=1, language="fr")
         self.assertEqual(CacheKey.objects.count(), 0)
 
+    def test_clear_user_menus(self):
+        CacheKey.objects.create(language="en", site=1, key="menu_nodes_en_1_1_user:public")
+        CacheKey.objects.create(language="de", site=2, key="menu_nodes_de_2_1_user:edit")
+        CacheKey.objects.create(language="en", site=1, key="menu_nodes_en_1_11_user:public")
+        CacheKey.objects.create(language="en", site=1, key="menu_nodes_en_1:public")
+
+        menu_pool.clear_user_menus([1])
+
+        self.assertEqual(
+            sorted(CacheKey.objects.values_list("key", flat=True)),
+            ["menu_nodes_en_1:public", "menu_nodes_en_1_11_user:public"],
+        )
+
     def test_only_active_tree(self):
         context = self.get_context(page=self.get_page(1))
         # test standard show_menu
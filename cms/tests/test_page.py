@@ -2,14 +2,16 @@ import datetime
 import functools
 import os.path
 from unittest import skipIf
+from unittest.mock import patch
 
 from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.contrib.sites.models import Site
 from django.core.cache import cache
-from django.db import models
+from django.db import connection, models
 from django.db.utils import IntegrityError
 from django.http import HttpResponse, HttpResponseNotFound
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django.utils.timezone import now as tz_now
 from django.utils.translation import override as force_language
@@ -19,10 +21,12 @@ from cms.api import add_plugin, create_page, create_page_content
 from cms.cache.page import get_page_cache
 from cms.forms.validators import validate_url_uniqueness
 from cms.models import Page, PageContent
+from cms.models.managers import PageContentManager
 from cms.models.placeholdermodel import Placeholder
 from cms.models.pluginmodel import CMSPlugin
 from cms.sitemaps import CMSSitemap
 from cms.test_utils.testcases import CMSTestCase, TransactionCMSTestCase
+from cms.test_utils.util.fuzzy_int import FuzzyInt
 from cms.utils.conf import get_cms_setting
 from cms.utils.page import (
     get_available_slug,
@@ -365,6 +369,142 @@ class PagesTestCase(TransactionCMSTestCase):
         for page, path in tree:
             self.assertEqual(page.path, path)
 
+    def _create_subtree(self, parent, depth, width):
+        pages = []
+
+        for index in range(width):
+            page = create_page(f"Page {depth}-{index}", "nav_playground.html", "en", parent=parent)
+            create_page_content("de", f"Seite {depth}-{index}", page)
+            pages.append(page)
+
+            if depth > 1 and index == 0:
+                pages.extend(self._create_subtree(page, depth - 1, width))
+        return pages
+
+    def _move_subtree(self, depth, width):
+        source = create_page(f"Source {depth}-{width}", "nav_playground.html", "en")
+        target = create_page(f"Target {depth}-{width}", "nav_playground.html", "en")
+        create_page_content("de", f"Quelle {depth}-{width}", source)
+        create_page_content("de", f"Ziel {depth}-{width}", target)
+        descendants = self._create_subtree(source, depth, width)
+
+        with self.assertNumQueries(FuzzyInt(0, 1000)) as context:
+            source.move_page(target, position="last-child")
+
+        for page in [source, *descendants]:
+            page = Page.objects.get(pk=page.pk)
+            parent = page.parent
+
+            for language in ("en", "de"):
+                self.assertEqual(
+                    page.get_path(language),
+                    f"{parent.get_path(language)}/{page.get_slug(language)}",
+                )
+        return len(context.captured_queries)
+
+    def test_move_page_url_path_queries_independent_of_subtree(self):
+        queries = self._move_subtree(depth=1, width=1)
+        # The url paths of deep and wide subtrees are rewritten with the
+        # same number of queries as those of a single child.
+        self.assertEqual(self._move_subtree(depth=6, width=2), queries)
+        self.assertEqual(self._move_subtree(depth=2, width=15), queries)
+
+    def test_move_page_keeps_unmanaged_descendant_urls(self):
+        source = create_page("Source", "nav_playground.html", "en")
+        target = create_page("Target", "nav_playground.html", "en")
+        child = create_page("Child", "nav_playground.html", "en", parent=source)
+        grandchild = create_page("Grandchild", "nav_playground.html", "en", parent=child)
+        child.urls.filter(language="en").update(path="custom/child", managed=False)
+        grandchild.urls.filter(language="en").update(path="custom/child/grandchild")
+
+        source.move_page(target, position="last-child")
+
+        self.assertEqual(Page.objects.get(pk=source.pk).get_path("en"), "target/source")
+        self.assertEqual(Page.objects.get(pk=child.pk).get_path("en"), "custom/child")
+        self.assertEqual(Page.objects.get(pk=grandchild.pk).get_path("en"), "custom/child/grandchild")
+
+    def test_move_page_keeps_descendant_urls_below_unmanaged_url(self):
+        source = create_page("Source", "nav_playground.html", "en")
+        target = create_page("Target", "nav_playground.html", "en")
+        child = create_page("Child", "nav_playground.html", "en", parent=source)
+        grandchild = create_page("Grandchild", "nav_playground.html", "en", parent=child)
+        # The unmanaged url starts with the path of the moved page
+        child.urls.filter(language="en").update(path="source/custom", managed=False)
+        grandchild.urls.filter(language="en").update(path="source/custom/grandchild")
+
+        source.move_page(target, position="last-child")
+
+        self.assertEqual(Page.objects.get(pk=source.pk).get_path("en"), "target/source")
+        self.assertEqual(Page.objects.get(pk=child.pk).get_path("en"), "source/custom")
+        self.assertEqual(Page.objects.get(pk=grandchild.pk).get_path("en"), "source/custom/grandchild")
+
+    def test_move_page_matches_descendant_url_prefix_case_sensitively(self):
+        source = create_page("Source", "nav_playground.html", "en")
+        target = create_page("Target", "nav_playground.html", "en")
+        child = create_page("Child", "nav_playground.html", "en", parent=source)
+        other = create_page("Other", "nav_playground.html", "en", parent=source)
+        other.urls.filter(language="en").update(path="SOURCE/other")
+
+        source.move_page(target, position="last-child")
+
+        self.assertEqual(Page.objects.get(pk=child.pk).get_path("en"), "target/source/child")
+        self.assertEqual(Page.objects.get(pk=other.pk).get_path("en"), "SOURCE/other")
+
+    def test_copy_with_descendants(self):
+        superuser = self.get_superuser()
+        source = create_page("Source", "nav_playground.html", "en")
+        target = create_page("Target", "nav_playground.html", "en")
+        create_page_content("de", "Quelle", source)
+        descendants = self._create_subtree(source, depth=3, width=2)
+
+        for page in descendants:
+            placeholder = page.get_placeholders("en").get(slot="body")
+            add_plugin(placeholder, "TextPlugin", "en", body=f"Text {page.pk}")
+        # Reserve the path the copy of the first child would get
+        other = create_page("Other", "nav_playground.html", "en")
+        other.urls.filter(language="en").update(path="target/source/page-3-0", managed=False)
+
+        new_source = source.copy_with_descendants(target, position="last-child", user=superuser)
+
+        self.assertEqual(Page.find_problems(), ([], [], [], [], []))
+        self.assertEqual(Page.objects.count(), 4 + 2 * len(descendants))
+        self.assertEqual(new_source.get_path("en"), "target/source")
+        new_descendants = list(new_source.get_descendant_pages())
+        self.assertEqual(len(new_descendants), len(descendants))
+
+        for page, new_page in zip(descendants, new_descendants):
+            self.assertEqual(new_page.depth, page.depth + 1)
+            self.assertEqual(new_page.numchild, page.numchild)
+            self.assertEqual(new_page.parent.path, new_page.path[:-Page.steplen])
+            self.assertEqual(set(new_page.get_languages()), {"en", "de"})
+            placeholder = new_page.get_placeholders("en").get(slot="body")
+            self.assertEqual(placeholder.get_plugins("en")[0].get_bound_plugin().body, f"Text {page.pk}")
+
+            for language in ("en", "de"):
+                new_path = new_page.get_path(language)
+                self.assertEqual(new_path.rpartition("/")[0], new_page.parent.get_path(language))
+
+        self.assertEqual(new_descendants[0].get_path("en"), "target/source/page-3-0-copy-2")
+        self.assertEqual(new_descendants[1].get_path("en"), "target/source/page-3-0-copy-2/page-2-0")
+
+    def test_copy_with_descendants_replaced_content_manager(self):
+        superuser = self.get_superuser()
+        source = create_page("Source", "nav_playground.html", "en")
+        target = create_page("Target", "nav_playground.html", "en")
+        descendants = self._create_subtree(source, depth=2, width=2)
+
+        # A versioning package replaces the manager with a subclass
+        with patch("cms.models.managers.PageContentManager", type("VersionedManager", (PageContentManager,), {})), \
+                patch.object(PageContentManager, "create", autospec=True, side_effect=PageContentManager.create) as create:
+            new_source = source.copy_with_descendants(target, position="last-child", user=superuser)
+
+        # Each content of the new pages is created through the manager
+        self.assertEqual(create.call_count, 1 + 2 * len(descendants))
+        self.assertEqual(
+            [set(page.get_languages()) for page in new_source.get_descendant_pages()],
+            [{"en", "de"}] * len(descendants),
+        )
+
     def test_move_page_inherit(self):
         parent = create_page("Parent", "col_three.html", "en")
         child = create_page("Child", constants.TEMPLATE_INHERITANCE_MAGIC, "en", parent=parent)
@@ -952,6 +1092,110 @@ class PageTreeTests(CMSTestCase):
         child.refresh_from_db()
         self.assertEqual(child.get_absolute_url(language="en"), "/en/parent/child/")
 
+    def test_set_tree_hierarchy(self):
+        home = create_page("home", "nav_playground.html", "en")
+        parent = create_page("parent", "nav_playground.html", "en")
+        child = create_page("child", "nav_playground.html", "en", parent=parent)
+        grandchild = create_page("grandchild", "nav_playground.html", "en", parent=child)
+        sibling = create_page("sibling", "nav_playground.html", "en", parent=parent)
+        other = create_page("other", "nav_playground.html", "en")
+        pages = list(Page.objects.filter(pk__in=[home.pk, parent.pk, child.pk, grandchild.pk, sibling.pk, other.pk]))
+        by_pk = {page.pk: page for page in pages}
+
+        Page._set_tree_hierarchy(reversed(pages))
+
+        self.assertEqual(by_pk[home.pk].get_cached_descendants(), [])
+        self.assertEqual(by_pk[home.pk].get_cached_ancestors(), [])
+        self.assertEqual(by_pk[parent.pk].get_cached_descendants(), [child, grandchild, sibling])
+        self.assertEqual(by_pk[child.pk].get_cached_descendants(), [grandchild])
+        self.assertEqual(by_pk[child.pk].get_cached_ancestors(), [parent])
+        self.assertEqual(by_pk[grandchild.pk].get_cached_ancestors(), [child, parent])
+        self.assertEqual(by_pk[sibling.pk].get_cached_ancestors(), [parent])
+        self.assertEqual(by_pk[other.pk].get_cached_descendants(), [])
+
+        # Hierarchy of a branch only
+        by_pk[child.pk]._set_hierarchy(pages, ancestors=[by_pk[parent.pk]])
+        self.assertEqual(by_pk[child.pk].get_cached_descendants(), [grandchild])
+        self.assertEqual(by_pk[grandchild.pk].get_cached_ancestors(), [child, parent])
+
+
+    def _create_branch(self, parent, children):
+        for index in range(children):
+            page = create_page(f"child-{index}", "nav_playground.html", "en", parent=parent)
+            create_page_content("de", f"child-{index}", page, template="nav_playground.html")
+
+            for language in ("en", "de"):
+                placeholder = page.get_placeholders(language).get(slot="body")
+                columns = add_plugin(placeholder, "MultiColumnPlugin", language)
+                column = add_plugin(placeholder, "ColumnPlugin", language, target=columns)
+                add_plugin(placeholder, "TextPlugin", language, target=column, body="text")
+                add_plugin(placeholder, "LinkPlugin", language, target=column, name="Link", external_link="https://a.b")
+            parent.refresh_from_db()
+
+    def test_delete_page_tree(self):
+        Text = self.get_plugin_model("TextPlugin")
+        home = create_page("home", "nav_playground.html", "en")
+        parent = create_page("parent", "nav_playground.html", "en", parent=home)
+        sibling = create_page("sibling", "nav_playground.html", "en", parent=home)
+        self._create_branch(parent, 3)
+        self._create_branch(sibling, 1)
+        home.refresh_from_db()
+        parent.refresh_from_db()
+        sibling_placeholders = list(Placeholder.objects.exclude(pk__in=[
+            placeholder.pk
+            for page in parent.get_descendants() | Page.objects.filter(pk=parent.pk)
+            for language in page.get_languages()
+            for placeholder in page.get_placeholders(language)
+        ]))
+
+        parent.delete()
+
+        home.refresh_from_db()
+        self.assertEqual(home.numchild, 1)
+        self.assertEqual(list(Page.objects.order_by("path")), [home, sibling, sibling.get_child_pages()[0]])
+        self.assertEqual(PageContent.admin_manager.count(), 4)
+        self.assertEqual(list(Placeholder.objects.all()), sibling_placeholders)
+        self.assertEqual(CMSPlugin.objects.count(), 8)
+        self.assertEqual(Text.objects.count(), 2)
+        self.assertEqual(set(CMSPlugin.objects.values_list("placeholder__object_id", flat=True)), {
+            content.pk for content in PageContent.admin_manager.filter(page__parent=sibling)
+        })
+
+    def test_delete_page_tree_queries(self):
+        home = create_page("home", "nav_playground.html", "en")
+        small = create_page("small", "nav_playground.html", "en", parent=home)
+        large = create_page("large", "nav_playground.html", "en", parent=home)
+        self._create_branch(small, 1)
+        self._create_branch(large, 4)
+        small.refresh_from_db()
+        large.refresh_from_db()
+
+        with CaptureQueriesContext(connection) as small_queries:
+            small.delete()
+
+        # Rows are deleted per table, not per page or plugin
+        with self.assertNumQueries(len(small_queries.captured_queries)):
+            large.delete()
+
+    def test_delete_page_tree_plugin_receivers(self):
+        Text = self.get_plugin_model("TextPlugin")
+        home = create_page("home", "nav_playground.html", "en")
+        self._create_branch(home, 2)
+        deleted = []
+
+        def receiver(instance, **kwargs):
+            deleted.append(instance.pk)
+
+        models.signals.pre_delete.connect(receiver, sender=Text)
+
+        try:
+            home.delete()
+        finally:
+            models.signals.pre_delete.disconnect(receiver, sender=Text)
+
+        self.assertEqual(len(deleted), 4)
+        self.assertEqual(Text.objects.count(), 0)
+        self.assertEqual(CMSPlugin.objects.count(), 0)
 
 class PageContentTests(CMSTestCase):
     def setUp(self):
@@ -2722,7 +2722,7 @@ class PermissionsOnGlobalTest(PermissionsTestCase):
         endpoint = self.get_admin_url(Page, 'advanced', page.pk) + '?language=en'
         set_permission_cache(staff_user, "change_page", [page.pk])
 
-        with self.login_user_context(self.get_superuser()):
+        with self.login_user_context(self.get_superuser()), self.captureOnCommitCallbacks(execute=True):
             data = self._get_page_permissions_data(page=page.pk, user=staff_user.pk)
             data['_continue'] = '1'
             self.client.post(endpoint, data)
@@ -2740,7 +2740,9 @@ class PermissionsOnGlobalTest(PermissionsTestCase):
 
         group = Group(name="test_group")
         group.save()
-        staff_user.groups.add(group)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            staff_user.groups.add(group)
 
         self.assertIsNone(get_permission_cache(staff_user, "change_page"))
 
@@ -2754,11 +2756,14 @@ class PermissionsOnGlobalTest(PermissionsTestCase):
         staff_user = self.get_staff_user_with_std_permissions()
         group = Group(name="test_group")
         group.save()
-        staff_user.groups.add(group)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            staff_user.groups.add(group)
 
         set_permission_cache(staff_user, "change_page", [page.pk])
 
-        group.user_set.remove(staff_user)
+        with self.captureOnCommitCallbacks(execute=True):
+            group.user_set.remove(staff_user)
 
         self.assertIsNone(get_permission_cache(staff_user, "change_page"))
 
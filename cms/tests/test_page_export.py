@@ -0,0 +1,116 @@
+import json
+from io import StringIO
+
+from django.core import management
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from cms.api import add_plugin, create_page, create_page_content, import_pages
+from cms.models import Page, PageContent
+from cms.test_utils.testcases import CMSTestCase
+from cms.utils.page_export import export_pages, write_page_records
+from cms.utils.page_import import read_page_records
+
+
+class PageExportTestCase(CMSTestCase):
+
+    def setUp(self):
+        self.home = create_page("Home", "nav_playground.html", "en")
+        self.home.set_as_homepage()
+        create_page_content("de", "Startseite", self.home)
+        self.about = create_page("About", "col_two.html", "en", parent=self.home, reverse_id="about")
+        self.team = create_page("Team", "INHERIT", "en", parent=self.about, overwrite_url="/our-team/")
+        self.contact = create_page("Contact", "simple.html", "en", in_navigation=True)
+
+        placeholder = self.about.get_placeholders("en").get(slot="col_left")
+        text = add_plugin(placeholder, "TextPlugin", "en", body="Hello")
+        link = add_plugin(placeholder, "LinkPlugin", "en", target=text, name="Link", external_link="https://x.org")
+        text.body = f'Hello <cms-plugin id="{link.pk}"></cms-plugin>'
+        text.save()
+        columns = add_plugin(placeholder, "MultiColumnPlugin", "en")
+        add_plugin(placeholder, "ColumnPlugin", "en", target=columns)
+        add_plugin(self.contact.get_placeholders("en").get(slot="placeholder"), "TextPlugin", "en", body="Write us")
+
+    def get_snapshot(self):
+        snapshot = []
+
+        for page in Page.objects.order_by("path"):
+            contents = []
+
+            for content in PageContent.admin_manager.filter(page=page).order_by("language"):
+                placeholders = []
+
+                for placeholder in content.get_placeholders().order_by("slot"):
+                    plugins = [
+                        (
+                            plugin.plugin_type,
+                            plugin.position,
+                            plugin.parent.plugin_type if plugin.parent_id else None,
+                            getattr(plugin, "name", None),
+                        )
+                        for plugin in placeholder.get_plugins_list(content.language)
+                    ]
+                    placeholders.append((placeholder.slot, plugins))
+
+                contents.append((
+                    content.language,
+                    content.title,
+                    content.template,
+                    content.in_navigation,
+                    page.get_path(content.language),
+                    placeholders,
+                ))
+            snapshot.append((page.depth, page.numchild, page.is_home, page.reverse_id, contents))
+        return snapshot
+
+    def test_export_pages(self):
+        records = list(export_pages())
+        self.assertEqual([record["key"] for record in records], [
+            self.home.pk, self.about.pk, self.team.pk, self.contact.pk,
+        ])
+        about = records[1]
+        self.assertEqual(about["parent"], self.home.pk)
+        self.assertEqual(about["reverse_id"], "about")
+        self.assertEqual(records[2]["translations"][0]["overwrite_url"], "our-team")
+
+        plugins = about["translations"][0]["placeholders"]["col_left"]
+        self.assertEqual([plugin["plugin_type"] for plugin in plugins], ["TextPlugin", "MultiColumnPlugin"])
+        self.assertEqual(plugins[0]["children"][0]["data"], {"name": "Link", "external_link": "https://x.org"})
+        self.assertEqual(plugins[1]["children"][0]["plugin_type"], "ColumnPlugin")
+
+        # A branch, its root becomes a root page
+        records = list(export_pages(root=self.about))
+        self.assertEqual([record["key"] for record in records], [self.about.pk, self.team.pk])
+        self.assertIsNone(records[0]["parent"])
+
+    def test_export_queries(self):
+        with CaptureQueriesContext(connection) as ctx:
+            list(export_pages(batch_size=10))
+
+        for i in range(5):
+            page = create_page(f"Page {i}", "col_two.html", "en", parent=self.about)
+            add_plugin(page.get_placeholders("en").get(slot="col_left"), "LinkPlugin", "en", name="Link")
+
+        # The number of queries doesn't depend on the number of pages in a batch
+        with self.assertNumQueries(len(ctx.captured_queries)):
+            self.assertEqual(len(list(export_pages(batch_size=10))), 9)
+
+    def test_export_and_import(self):
+        snapshot = self.get_snapshot()
+        stream = StringIO()
+        self.assertEqual(write_page_records(export_pages(batch_size=2), stream), 4)
+
+        Page.objects.all().delete()
+        stream.seek(0)
+        import_pages(read_page_records(stream), batch_size=2)
+
+        self.assertEqual(self.get_snapshot(), snapshot)
+        about = Page.objects.get(reverse_id="about")
+        text = about.get_placeholders("en").get(slot="col_left").get_plugins("en")[0].get_bound_plugin()
+        self.assertIn(f'id="{text.get_children().get().pk}"', text.body)
+
+    def test_export_pages_command(self):
+        out = StringIO()
+        management.call_command("cms", "export-pages", "-", f"--root={self.about.pk}", interactive=False, stdout=out)
+        lines = out.getvalue().splitlines()
+        self.assertEqual([json.loads(line)["key"] for line in lines], [self.about.pk, self.team.pk])
@@ -0,0 +1,222 @@
+import json
+import os
+import tempfile
+from io import StringIO
+from unittest.mock import patch
+
+from django.core import management
+from django.core.exceptions import ValidationError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from djangocms_text_ckeditor.models import Text
+
+from cms.api import create_page, import_pages
+from cms.models import CMSPlugin, Page, PageContent, PageUrl
+from cms.test_utils.project.pluginapp.plugins.multicolumn.models import MultiColumns
+from cms.test_utils.testcases import CMSTestCase
+from cms.utils.page_import import PageImporter, read_page_records
+from cms.utils.placeholder import get_placeholders
+
+
+def get_page_records():
+    return [
+        {
+            "key": 1,
+            "is_home": True,
+            "reverse_id": "home",
+            "translations": [
+                {"language": "en", "title": "Home", "template": "nav_playground.html", "in_navigation": True},
+                {"language": "de", "title": "Startseite", "template": "col_two.html"},
+            ],
+            "children": [
+                {
+                    "key": 2,
+                    "translations": [
+                        {
+                            "language": "en",
+                            "title": "About us",
+                            "placeholders": {
+                                "body": [
+                                    {
+                                        "id": 10,
+                                        "plugin_type": "TextPlugin",
+                                        "data": {"body": '<p>Hi</p><cms-plugin id="11"></cms-plugin>'},
+                                        "children": [
+                                            {"id": 11, "plugin_type": "LinkPlugin", "data": {
+                                                "name": "Link", "external_link": "https://example.com",
+                                            }},
+                                        ],
+                                    },
+                                    {
+                                        "plugin_type": "MultiColumnPlugin",
+                                        "children": [
+                                            {"plugin_type": "ColumnPlugin"},
+                                            {"plugin_type": "ColumnPlugin"},
+                                        ],
+                                    },
+                                ],
+                            },
+                        },
+                    ],
+                },
+            ],
+        },
+        {"key": 3, "parent": 2, "translations": [{"language": "en", "title": "Team", "slug": "the-team"}]},
+        {"key": 4, "translations": [{"language": "en", "title": "Contact", "overwrite_url": "/contact-us/"}]},
+    ]
+
+
+class PageImportTestCase(CMSTestCase):
+
+    def assertValidTree(self):
+        self.assertEqual(Page.find_problems(), ([], [], [], [], []))
+
+    def test_import_pages(self):
+        self.assertEqual(import_pages(get_page_records()), 4)
+        self.assertValidTree()
+
+        home = Page.objects.get(reverse_id="home")
+        about = home.get_child_pages().get()
+        team = about.get_child_pages().get()
+        contact = Page.objects.get(urls__path="contact-us")
+
+        self.assertTrue(home.is_home)
+        self.assertEqual(home.numchild, 1)
+        self.assertEqual(about.numchild, 1)
+        self.assertEqual(list(Page.get_root_nodes()), [home, contact])
+        self.assertEqual(home.get_content_obj("de").title, "Startseite")
+        self.assertTrue(home.get_content_obj("en").in_navigation)
+        self.assertEqual(home.get_absolute_url("en"), "/en/")
+        self.assertEqual(about.get_absolute_url("en"), "/en/about-us/")
+        self.assertEqual(team.get_absolute_url("en"), "/en/about-us/the-team/")
+        self.assertFalse(contact.get_url("en").managed)
+
+        # Placeholders of the (inherited) template and its plugins
+        about_content = about.get_content_obj("en")
+        self.assertEqual(about_content.get_template(), "nav_playground.html")
+        self.assertEqual(
+            set(about_content.get_placeholders().values_list("slot", flat=True)),
+            set(about.get_placeholders("en").values_list("slot", flat=True)),
+        )
+        self.assertEqual(
+            set(home.get_placeholders("de").values_list("slot", flat=True)),
+            {placeholder.slot for placeholder in get_placeholders("col_two.html")},
+        )
+
+        placeholder = about.get_placeholders("en").get(slot="body")
+        plugins = placeholder.get_plugins_list("en")
+        self.assertEqual(
+            [(plugin.plugin_type, plugin.position) for plugin in plugins],
+            [("TextPlugin", 1), ("LinkPlugin", 2), ("MultiColumnPlugin", 3), ("ColumnPlugin", 4), ("ColumnPlugin", 5)],
+        )
+        text, link, columns = plugins[0], plugins[1], plugins[2]
+        self.assertEqual(link.parent_id, text.pk)
+        self.assertEqual(link.path, f"{text.pk}/")
+        self.assertEqual(plugins[3].parent_id, columns.pk)
+        self.assertEqual(plugins[4].parent_id, columns.pk)
+        self.assertEqual(link.get_bound_plugin().external_link, "https://example.com")
+        # The reference to the child plugin has been updated
+        self.assertIn(f'id="{link.pk}"', Text.objects.get(pk=text.pk).body)
+        self.assertEqual(MultiColumns.objects.get().pk, columns.pk)
+
+    def test_import_pages_in_batches(self):
+        parent = create_page("Parent", "nav_playground.html", "en")
+        parent.set_as_homepage()
+        create_page("Sibling", "nav_playground.html", "en", parent=parent)
+
+        import_pages(get_page_records(), parent=parent, batch_size=1)
+
+        self.assertValidTree()
+        parent.refresh_from_db()
+        self.assertEqual(parent.numchild, 3)
+        self.assertEqual(
+            [page.get_title("en") for page in parent.get_child_pages()],
+            ["Sibling", "Home", "Contact"],
+        )
+        # The site has a home page already
+        about = Page.objects.get(pagecontent_set__title="About us")
+        self.assertEqual(about.get_absolute_url("en"), "/en/home/about-us/")
+        self.assertEqual(Page.objects.get(pagecontent_set__title="Team").depth, 4)
+
+    def test_import_queries(self):
+        def get_records(start, stop):
+            return [
+                {"translations": [{"language": "en", "title": f"Page {i}", "template": "simple.html", "placeholders": {
+                    "content": [
+                        {"plugin_type": "MultiColumnPlugin", "children": [{"plugin_type": "ColumnPlugin"}]},
+                        {"plugin_type": "LinkPlugin", "data": {"name": "Link", "external_link": "https://example.com"}},
+                    ],
+                }}]}
+                for i in range(start, stop)
+            ]
+
+        with CaptureQueriesContext(connection) as ctx:
+            import_pages(get_records(0, 5), batch_size=10)
+
+        # The number of queries doesn't depend on the number of pages in a batch
+        with self.assertNumQueries(len(ctx.captured_queries)):
+            import_pages(get_records(5, 15), batch_size=10)
+
+        self.assertValidTree()
+        self.assertEqual(CMSPlugin.objects.filter(parent__isnull=False).count(), 15)
+
+    def test_import_conflicts(self):
+        create_page("Contact", "nav_playground.html", "en", slug="contact-us")
+
+        with self.assertRaisesMessage(ValidationError, "A page with the url 'contact-us' (en) already exists."):
+            import_pages(get_page_records())
+
+        records = [{"key": 1, "translations": [{"language": "en", "title": "Team"}]}] * 2
+
+        with self.assertRaisesMessage(ValidationError, "The url 'team' (en) of page 1 is used more than once."):
+            import_pages(records)
+
+        with self.assertRaisesMessage(ValidationError, "The parent 5 of page 1 has not been imported."):
+            import_pages([{"key": 1, "parent": 5}])
+
+        with self.assertRaisesMessage(ValidationError, "Plugin type 'UnknownPlugin' is not registered."):
+            import_pages([{"translations": [
+                {"language": "en", "title": "Team", "placeholders": {"body": [{"plugin_type": "UnknownPlugin"}]}}
+            ]}])
+
+        self.assertEqual(Page.objects.count(), 1)
+        self.assertEqual(PageUrl.objects.count(), 1)
+        self.assertEqual(PageContent.admin_manager.count(), 1)
+        self.assertEqual(CMSPlugin.objects.count(), 0)
+        self.assertValidTree()
+
+    def test_import_error_clears_caches_of_imported_batches(self):
+        records = [{"key": 1, "translations": [{"language": "en", "title": "Team"}]}, {"key": 2, "parent": 5}]
+
+        with patch.object(PageImporter, "clear_caches") as clear_caches:
+            with self.assertRaises(ValidationError):
+                import_pages(records[1:])
+            clear_caches.assert_not_called()
+
+            with self.assertRaises(ValidationError):
+                import_pages(records, batch_size=1)
+            # The first batch has been imported
+            clear_caches.assert_called_once_with()
+
+    def test_read_page_records(self):
+        records = list(read_page_records(StringIO(json.dumps(get_page_records()))))
+        self.assertEqual(records, get_page_records())
+
+        lines = "\n".join(json.dumps(record) for record in get_page_records())
+        self.assertEqual(list(read_page_records(StringIO(lines))), records)
+
+    def test_import_pages_command(self):
+        fd, path = tempfile.mkstemp(suffix=".ndjson")
+
+        with os.fdopen(fd, "w") as stream:
+            stream.writelines(json.dumps(record) + "\n" for record in get_page_records())
+
+        out = StringIO()
+
+        try:
+            management.call_command("cms", "import-pages", path, "--batch-size=2", interactive=False, stdout=out)
+        finally:
+            os.remove(path)
+        self.assertEqual(out.getvalue(), "4 pages imported\n")
+        self.assertEqual(Page.objects.get(reverse_id="home").get_content_obj("en").created_by, "import-pages")
+        self.assertValidTree()
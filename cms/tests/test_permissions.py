@@ -1,19 +1,35 @@
+from unittest.mock import patch
+
+from django.contrib.auth.models import Group
 from django.contrib.sites.models import Site
+from django.db import DatabaseError, transaction
 from django.test.utils import override_settings
 
 from cms.api import assign_user_to_page, create_page
 from cms.cache.permissions import (
     clear_user_permission_cache,
     get_permission_cache,
+    get_permission_cache_many,
     set_permission_cache,
 )
-from cms.models.permissionmodels import ACCESS_PAGE_AND_DESCENDANTS, GlobalPagePermission
+from cms.models.permissionmodels import (
+    ACCESS_CHOICES,
+    ACCESS_PAGE_AND_DESCENDANTS,
+    GlobalPagePermission,
+    PagePermission,
+    PermissionMatcher,
+    PermissionTuple,
+)
 from cms.test_utils.testcases import CMSTestCase
 from cms.utils.page_permissions import (
     get_change_perm_tuples,
     has_generic_permission,
+    user_can_change_page,
+    user_can_move_page,
     user_can_publish_page,
+    user_can_view_page,
 )
+from cms.utils.permissions import clear_permission_lru_caches
 
 
 @override_settings(
@@ -98,3 +114,145 @@ class PermissionCacheTests(CMSTestCase):
 
         self.assertTrue(has_generic_permission(page_b, self.user_normal, "change_page"))
         self.assertFalse(has_generic_permission(page_b, self.user_normal, "publish_page"))
+
+    def test_permission_snapshot(self):
+        site = Site.objects.get_current()
+        parent = create_page("parent", "nav_playground.html", "en", created_by=self.user_super)
+        pages = [
+            create_page(f"child {i}", "nav_playground.html", "en", created_by=self.user_super, parent=parent)
+            for i in range(5)
+        ]
+        assign_user_to_page(pages[0], self.user_normal, can_view=True, can_change=True)
+        # Warm up the Django auth permission cache of the user
+        self.user_normal.has_perms([])
+        self.user_normal.get_all_permissions()
+
+        with patch(
+            "cms.cache.permissions.get_permission_cache_many",
+            wraps=get_permission_cache_many,
+        ) as get_cache_many:
+            # global actions, page actions and view restrictions
+            with self.assertNumQueries(3):
+                for page in [parent, *pages]:
+                    user_can_change_page(self.user_normal, page, site)
+                    user_can_move_page(self.user_normal, page, site)
+                    user_can_view_page(self.user_normal, page, site)
+        self.assertEqual(get_cache_many.call_count, 1)
+
+        self.assertTrue(user_can_change_page(self.user_normal, pages[0], site))
+        self.assertFalse(user_can_change_page(self.user_normal, pages[1], site))
+        self.assertTrue(user_can_view_page(self.user_normal, pages[0], site))
+        self.assertFalse(user_can_move_page(self.user_normal, pages[0], site))
+
+        # Without the lru caches, all page actions are read from the permission
+        # cache and only the global actions are queried again.
+        clear_permission_lru_caches(self.user_normal)
+        with self.assertNumQueries(1):
+            self.assertTrue(has_generic_permission(pages[0], self.user_normal, "change_page"))
+            self.assertFalse(has_generic_permission(pages[0], self.user_normal, "move_page"))
+
+    def test_permission_cache_invalidation_is_scoped(self):
+        other_user = self._create_user("otheruser", is_staff=True, add_default_permissions=True)
+        group = Group.objects.create(name="editors")
+        set_permission_cache(self.user_normal, "change_page", [])
+        set_permission_cache(other_user, "change_page", [])
+
+        with patch("cms.signals.permissions.clear_users_permission_cache") as clear_cache:
+            with self.captureOnCommitCallbacks(execute=True) as callbacks:
+                group.user_set.add(self.user_normal)
+                assign_user_to_page(self.home_page, self.user_normal, can_change=True)
+                PagePermission.objects.create(page=self.home_page, group=group, can_change=True)
+                # Not invalidated before the transaction is committed
+                clear_cache.assert_not_called()
+
+        # All changes are invalidated at once
+        self.assertEqual(len(callbacks), 1)
+        clear_cache.assert_called_once_with({self.user_normal.pk})
+
+        with self.captureOnCommitCallbacks(execute=True):
+            GlobalPagePermission.objects.create(user=self.user_normal, can_change=True)
+        self.assertIsNone(get_permission_cache(self.user_normal, "change_page"))
+        self.assertEqual(get_permission_cache(other_user, "change_page"), [])
+
+    def test_permission_cache_invalidation_after_rollback(self):
+        with patch("cms.signals.permissions.clear_users_permission_cache") as clear_cache:
+            with self.captureOnCommitCallbacks(execute=True) as callbacks:
+                try:
+                    with transaction.atomic():
+                        assign_user_to_page(self.home_page, self.user_normal, can_change=True)
+                        raise DatabaseError
+                except DatabaseError:
+                    pass
+                assign_user_to_page(self.home_page, self.user_normal, can_change=True)
+
+        # The callback of the rolled back changes was discarded
+        self.assertEqual(len(callbacks), 1)
+        clear_cache.assert_called_once_with({self.user_normal.pk})
+
+    def test_global_permission_changes_clear_old_and_new_users(self):
+        other_user = self._create_user("otheruser", is_staff=True, add_default_permissions=True)
+        with self.captureOnCommitCallbacks(execute=True):
+            permission = GlobalPagePermission.objects.create(user=self.user_normal, can_change=True)
+
+        with patch("cms.signals.permissions.clear_users_permission_cache") as clear_cache:
+            with self.captureOnCommitCallbacks(execute=True):
+                permission.user = other_user
+                permission.save()
+        # The user who lost the permission is invalidated as well
+        clear_cache.assert_called_once_with({self.user_normal.pk, other_user.pk})
+
+    def test_global_permission_sites_changes_clear_users(self):
+        site = Site.objects.get_current()
+        with self.captureOnCommitCallbacks(execute=True):
+            permission = GlobalPagePermission.objects.create(user=self.user_normal, can_change=True)
+
+        for change in (
+            lambda: permission.sites.add(site),
+            lambda: permission.sites.remove(site),
+            lambda: site.globalpagepermission_set.add(permission),
+            lambda: site.globalpagepermission_set.clear(),
+        ):
+            with patch("cms.signals.permissions.clear_users_permission_cache") as clear_cache:
+                with self.captureOnCommitCallbacks(execute=True):
+                    change()
+            clear_cache.assert_called_once_with({self.user_normal.pk})
+
+    def test_view_restrictions_clear_menus_of_site(self):
+        with patch("cms.signals.permissions.menu_pool") as menu_pool:
+            with self.captureOnCommitCallbacks(execute=True):
+                assign_user_to_page(self.home_page, self.user_normal, can_change=True)
+            menu_pool.clear.assert_not_called()
+            menu_pool.clear_user_menus.assert_called_once_with({self.user_normal.pk})
+
+            with self.captureOnCommitCallbacks(execute=True):
+                assign_user_to_page(self.home_page, self.user_normal, can_view=True)
+            menu_pool.clear.assert_called_once_with(site_id=self.home_page.site_id)
+
+
+class PermissionMatcherTests(CMSTestCase):
+
+    def test_matches_permission_tuples(self):
+        paths = ["0001", "00010001", "000100010001", "0001000100010001", "00010002", "0002", "00020001"]
+
+        for grant_on, _label in ACCESS_CHOICES:
+            for perm_path in paths:
+                perm_tuple = PermissionTuple((grant_on, perm_path))
+                matcher = PermissionMatcher([perm_tuple])
+
+                for path in paths:
+                    self.assertEqual(
+                        matcher.contains(path),
+                        perm_tuple.contains(path),
+                        msg=f"{perm_tuple} {path}",
+                    )
+
+    def test_get_matches(self):
+        matcher = PermissionMatcher()
+        matcher.add((ACCESS_PAGE_AND_DESCENDANTS, "0001"), "root")
+        matcher.add((ACCESS_PAGE_AND_DESCENDANTS, "00010001"), "child")
+
+        self.assertFalse(PermissionMatcher())
+        self.assertTrue(matcher)
+        self.assertEqual(matcher.get_matches("000100010001"), ["child", "root"])
+        self.assertEqual(matcher.get_matches("00010002"), ["root"])
+        self.assertEqual(matcher.get_matches("0002"), [])
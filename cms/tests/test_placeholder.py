@@ -28,6 +28,7 @@ from cms.test_utils.project.placeholderapp.models import (
 )
 from cms.test_utils.project.sampleapp.models import Category
 from cms.test_utils.testcases import CMSTestCase, TransactionCMSTestCase
+from cms.test_utils.util.fuzzy_int import FuzzyInt
 from cms.test_utils.util.mock import AttributeObject
 from cms.tests.test_toolbar import ToolbarTestBase
 from cms.toolbar.utils import (
@@ -1462,6 +1463,54 @@ class PlaceholderFlatPluginTests(PlaceholderPluginTestsBase):
             self.assertPluginTreeEquals(target_plugin_tree_all, placeholder=target)
 
 
+class PlaceholderLargePluginTreeTests(PlaceholderPluginTestsBase):
+    def create_plugins(self, placeholder):
+        # 250 root plugins with 3 children each
+        plugins = []
+
+        for position in range(1, 1001):
+            plugins.append(
+                CMSPlugin(
+                    language="en",
+                    plugin_type="StylePlugin",
+                    position=position,
+                    placeholder=placeholder,
+                )
+            )
+        CMSPlugin.objects.bulk_create(plugins)
+        plugins = list(self.get_plugins(placeholder))
+
+        for position, plugin in enumerate(plugins):
+            if position % 4:
+                plugin.parent_id = plugins[position - position % 4].pk
+                plugin.path = f"{plugin.parent_id}/"
+        CMSPlugin.objects.bulk_update(plugins, ["parent", "path"])
+
+    def test_move_plugin_queries(self):
+        plugin_tree_all = list(self.get_plugins().values_list("pk", flat=True))
+        root_plugins = list(self.get_plugins().filter(parent__isnull=True))
+
+        # Move the 3rd root plugin right behind the 200th, then the last one to the start
+        for plugin, target in ((root_plugins[2], root_plugins[199]), (root_plugins[-1], root_plugins[0])):
+            plugin.refresh_from_db()
+            target.refresh_from_db()
+            plugin_tree = plugin_tree_all[plugin.position - 1:plugin.position + 3]
+            target_position = target.position
+
+            with self.assertNumQueries(FuzzyInt(1, 4)):
+                self.placeholder.move_plugin(plugin, target_position)
+
+            for plugin_id in plugin_tree:
+                plugin_tree_all.remove(plugin_id)
+
+            if target_position > plugin.position:
+                index = plugin_tree_all.index(target.pk) + 4
+            else:
+                index = plugin_tree_all.index(target.pk)
+            plugin_tree_all[index:index] = plugin_tree
+            self.assertPluginTreeEquals(plugin_tree_all)
+
+
 class PlaceholderNestedPluginTests(PlaceholderFlatPluginTests):
     """
     Same tests as for PlaceholderFlatPluginTests but now with a different plugin tree:
@@ -1,4 +1,5 @@
 from collections import deque
+from unittest.mock import patch
 
 from django.template import Context
 from django.test.utils import override_settings
@@ -43,6 +44,29 @@ class TestStructureRenderer(CMSTestCase):
             expected = '<div class="cms-submenu-item cms-submenu-item-title"><span>Multi Columns</span></div>'
             self.assertTrue(expected in plugin_menu)
 
+    def test_get_placeholder_plugin_menu_is_shared(self):
+        cms_page = create_page("page", 'nav_playground.html', "en")
+        placeholder_1 = cms_page.get_placeholders("en").get(slot='body')
+        placeholder_2 = cms_page.get_placeholders("en").get(slot='right-column')
+        conf = {'right-column': {'plugin_labels': {'MultiColumnPlugin': 'Columns'}}}
+
+        with self.settings(CMS_PLACEHOLDER_CONF=conf), self.login_user_context(self.get_superuser()):
+            renderer = self.get_renderer()
+            menu_template = renderer.templates.placeholder_plugin_menu_template
+
+            with patch.object(menu_template, 'render', wraps=menu_template.render) as render:
+                plugin_menu_1 = renderer.get_placeholder_plugin_menu(placeholder_1, page=cms_page)
+                plugin_menu_2 = renderer.get_placeholder_plugin_menu(placeholder_2, page=cms_page)
+                # Same slot and template renders the same menu
+                self.assertEqual(renderer.get_placeholder_plugin_menu(placeholder_1, page=cms_page), plugin_menu_1)
+                self.assertEqual(render.call_count, 2)
+
+            with patch('cms.plugin_rendering.has_plugin_permission') as has_plugin_permission:
+                renderer.get_placeholder_plugin_menu(placeholder_1, page=cms_page)
+                has_plugin_permission.assert_not_called()
+        self.assertIn('href="MultiColumnPlugin">Multi Columns</a>', plugin_menu_1)
+        self.assertIn('href="MultiColumnPlugin">Columns</a>', plugin_menu_2)
+
     def test_render_placeholder_toolbar_js(self):
         cms_page = create_page("page", 'nav_playground.html', "en")
         renderer = self.get_renderer()
@@ -9,8 +9,10 @@ from django.conf import settings
 from django.contrib import admin
 from django.contrib.admin.widgets import FilteredSelectMultiple, RelatedFieldWidgetWrapper
 from django.core.exceptions import ImproperlyConfigured
+from django.db import connection
 from django.forms.widgets import Media
 from django.test.testcases import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import re_path, reverse
 from django.utils import timezone
 from django.utils.encoding import force_str
@@ -33,6 +35,7 @@ from cms.test_utils.project.pluginapp.plugins.meta.cms_plugins import (
     TestPlugin4,
     TestPlugin5,
 )
+from cms.test_utils.project.pluginapp.plugins.multicolumn.models import MultiColumns
 from cms.test_utils.project.pluginapp.plugins.validation.cms_plugins import (
     DynTemplate,
     NonExisitngRenderTemplate,
@@ -43,7 +46,7 @@ from cms.test_utils.testcases import CMSTestCase
 from cms.toolbar.toolbar import CMSToolbar
 from cms.toolbar.utils import get_object_edit_url
 from cms.utils.compat import DJANGO_5_1
-from cms.utils.plugins import copy_plugins_to_placeholder, get_plugins
+from cms.utils.plugins import copy_plugins_to_placeholder, downcast_plugins, get_plugins
 
 
 @contextmanager
@@ -503,6 +506,103 @@ class PluginsTestCase(PluginsTestBaseCase):
         self.assertEqual(ph_en.get_plugins("en").count(), 3)
         self.assertSequenceEqual(new_plugins_qs, new_plugins)
 
+    @skipIf(not connection.features.can_return_rows_from_bulk_insert, "Plugins are copied one by one")
+    def test_copy_plugins_in_bulk(self):
+        page_en = api.create_page("CopyPluginTestPage (EN)", "nav_playground.html", "en")
+        page_de = api.create_page("CopyPluginTestPage (DE)", "nav_playground.html", "de")
+        ph_en = page_en.get_placeholders("en").get(slot="body")
+        ph_de = page_de.get_placeholders("de").get(slot="body")
+
+        for i in range(10):
+            grid_plugin = api.add_plugin(ph_en, "MultiColumnPlugin", "en")
+            column_plugin = api.add_plugin(ph_en, "ColumnPlugin", "en", target=grid_plugin)
+            api.add_plugin(ph_en, "NoCustomModel", "en", target=column_plugin)
+        # Text overrides save() and is copied one by one
+        api.add_plugin(ph_en, "TextPlugin", "en", body="Text")
+
+        with CaptureQueriesContext(connection) as ctx:
+            copy_plugins_to_placeholder(ph_en.get_plugins_list("en"), ph_de, language="de")
+
+        plugin_inserts = [
+            query for query in ctx.captured_queries
+            if query["sql"].startswith(f'INSERT INTO "{CMSPlugin._meta.db_table}"')
+        ]
+        # One for the 30 nested plugins and one for the text plugin
+        self.assertEqual(len(plugin_inserts), 2)
+
+        old_plugins = ph_en.get_plugins_list("en")
+        new_plugins = ph_de.get_plugins_list("de")
+        self.assertEqual(len(new_plugins), 31)
+
+        for old_plugin, new_plugin in zip(old_plugins, new_plugins):
+            self.assertEqual(old_plugin.plugin_type, new_plugin.plugin_type)
+            self.assertEqual(old_plugin.position, new_plugin.position)
+            self.assertEqual(old_plugin.get_children().count(), new_plugin.get_children().count())
+            if old_plugin.parent_id:
+                self.assertEqual(old_plugin.parent.plugin_type, new_plugin.parent.plugin_type)
+                self.assertEqual(new_plugin.parent.placeholder_id, ph_de.pk)
+
+        self.assertEqual(Text.objects.get(placeholder=ph_de).body, "Text")
+        self.assertEqual(MultiColumns.objects.filter(placeholder=ph_de).count(), 10)
+
+    def test_downcast_plugins_with_union(self):
+        from cms.test_utils.project.bunch_of_plugins.models import TestPlugin1
+
+        class EmptyModelPlugin(CMSPluginBase):
+            model = TestPlugin1
+            render_plugin = False
+
+        page = api.create_page("DowncastTestPage", "nav_playground.html", "en")
+        placeholder = page.get_placeholders("en").get(slot="body")
+
+        with register_plugins(EmptyModelPlugin):
+            api.add_plugin(placeholder, "MultiColumnPlugin", "en")
+            api.add_plugin(placeholder, "EmptyModelPlugin", "en")
+            api.add_plugin(placeholder, "LinkPlugin", "en", name="A link", external_link="https://example.com")
+            api.add_plugin(placeholder, "StylePlugin", "en", tag_type="section", label="Styled")
+            api.add_plugin(placeholder, "TextPlugin", "en", body="Text")
+            api.add_plugin(placeholder, "NoCustomModel", "en")
+            plugins = list(CMSPlugin.objects.filter(placeholder=placeholder).order_by("position"))
+
+            with self.settings(CMS_PLUGIN_DOWNCAST_UNION=False), self.assertNumQueries(5):
+                expected = list(downcast_plugins(plugins))
+
+            with self.settings(CMS_PLUGIN_DOWNCAST_UNION=True):
+                # The two tables without fields of their own share a query
+                with self.assertNumQueries(4):
+                    downcasted = list(downcast_plugins(plugins))
+
+        self.assertEqual(len(downcasted), 6)
+        self.assertEqual(
+            {plugin.pk: type(plugin) for plugin in downcasted},
+            {plugin.pk: type(plugin) for plugin in expected},
+        )
+
+        for plugin in downcasted:
+            from_db = type(plugin).objects.get(pk=plugin.pk)
+            self.assertFalse(plugin._state.adding)
+            for field in plugin._meta.concrete_fields:
+                self.assertEqual(getattr(plugin, field.attname), getattr(from_db, field.attname))
+
+    def test_downcast_plugins_with_union_pointer_column(self):
+        from cms.test_utils.project.bunch_of_plugins.models import TestPlugin3
+
+        class PointerLastPlugin(CMSPluginBase):
+            model = TestPlugin3
+            render_plugin = False
+
+        page = api.create_page("DowncastTestPage", "nav_playground.html", "en")
+        placeholder = page.get_placeholders("en").get(slot="body")
+
+        with register_plugins(PointerLastPlugin):
+            plugin = api.add_plugin(placeholder, "PointerLastPlugin", "en", title="Title")
+            plugins = list(CMSPlugin.objects.filter(placeholder=placeholder))
+
+            with self.settings(CMS_PLUGIN_DOWNCAST_UNION=True):
+                downcasted = list(downcast_plugins(plugins))
+
+        self.assertEqual([(type(p), p.pk, p.title) for p in downcasted], [(TestPlugin3, plugin.pk, "Title")])
+
     def test_plugin_validation(self):
         self.assertRaises(ImproperlyConfigured, plugin_pool.validate_templates, NonExisitngRenderTemplate)
         self.assertRaises(ImproperlyConfigured, plugin_pool.validate_templates, NoRender)
@@ -1020,6 +1120,48 @@ class PluginsTestCase(PluginsTestBaseCase):
 
         self.assertEqual([ancestor.pk for ancestor in ancestors], [plugin.pk for plugin in plugins[:-1]])
 
+    def assertPluginPathsValid(self, placeholder):
+        plugins = {plugin.pk: plugin for plugin in CMSPlugin.objects.filter(placeholder=placeholder)}
+
+        for plugin in plugins.values():
+            parent = plugins.get(plugin.parent_id)
+            self.assertEqual(plugin.path, f"{parent.path}{parent.pk}/" if parent else "")
+
+    def test_plugin_paths(self):
+        placeholder = self.get_placeholder()
+        plugins = self._create_plugin_tree(placeholder, 5)
+        self.assertEqual(plugins[-1].path, "".join(f"{plugin.pk}/" for plugin in plugins[:-1]))
+
+        # Move the third plugin (with its two descendants) to the root
+        plugin = CMSPlugin.objects.get(pk=plugins[2].pk)
+        placeholder.move_plugin(plugin, 1, target_plugin=None)
+        self.assertPluginPathsValid(placeholder)
+
+        # ... and under the first one
+        plugin.refresh_from_db()
+        placeholder.move_plugin(plugin, 2, target_plugin=plugins[0])
+        self.assertPluginPathsValid(placeholder)
+
+        target = self.get_placeholder()
+        copy_plugins_to_placeholder(placeholder.get_plugins_list("en"), target, language="en")
+        self.assertPluginPathsValid(target)
+
+    def test_plugin_path_lookups(self):
+        placeholder = self.get_placeholder()
+        plugins = self._create_plugin_tree(placeholder, 10, downcast=False)
+
+        for plugin in plugins:
+            descendant_ids = plugin._get_descendants_ids()
+            ancestor_ids = [ancestor.pk for ancestor in plugin.get_ancestors_qs()]
+
+            with self.settings(CMS_PLUGIN_PATH_LOOKUPS=True):
+                self.assertCountEqual(plugin._get_descendants_ids(), descendant_ids)
+                self.assertEqual(plugin._get_descendants_count(), len(descendant_ids))
+                self.assertCountEqual(plugin.get_descendants().values_list("pk", flat=True), descendant_ids)
+
+                with self.assertNumQueries(1 if plugin.parent_id else 0):
+                    self.assertEqual([ancestor.pk for ancestor in plugin.get_ancestors_qs()], ancestor_ids)
+
 
 class PluginManyToManyTestCase(PluginsTestBaseCase):
     def setUp(self):
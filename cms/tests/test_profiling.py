@@ -0,0 +1,75 @@
+from django.test.utils import override_settings
+
+from cms.api import add_plugin
+from cms.test_utils.testcases import CMSTestCase
+from cms.utils.profiling import RenderProfiler
+
+
+class RecordingRenderProfiler(RenderProfiler):
+    instances = []
+
+    def __init__(self, request):
+        super().__init__(request)
+        self.instances.append(self)
+
+
+class RenderProfilerTestCase(CMSTestCase):
+
+    def setUp(self):
+        self.page = self.create_homepage("home", "nav_playground.html", "en")
+        placeholder = self.page.get_placeholders("en").get(slot="body")
+        add_plugin(placeholder, "TextPlugin", "en", body="Profiled")
+        RecordingRenderProfiler.instances = []
+
+    @override_settings(CMS_RENDER_PROFILER="cms.tests.test_profiling.RecordingRenderProfiler")
+    def test_render_path_is_measured(self):
+        response = self.client.get(self.page.get_absolute_url())
+        self.assertContains(response, "Profiled")
+        self.assertEqual(len(RecordingRenderProfiler.instances), 1)
+
+        timings = RecordingRenderProfiler.instances[0].timings
+        names = {timing.name for timing in timings}
+
+        for name in (
+            "render_page_placeholder",
+            "render_placeholder",
+            "render_plugin",
+            "_preload_placeholders_for_page",
+            "assign_plugins",
+            "downcast_plugins",
+            "_build_nodes",
+        ):
+            self.assertIn(name, names)
+
+        plugin_timing = next(timing for timing in timings if timing.name == "render_plugin")
+        self.assertEqual(plugin_timing.tags["plugin_type"], "TextPlugin")
+        self.assertIn("template", plugin_timing.tags)
+
+        preload_timing = next(timing for timing in timings if timing.name == "_preload_placeholders_for_page")
+        self.assertGreater(preload_timing.queries, 0)
+
+        body_timing = next(
+            timing for timing in timings
+            if timing.name == "render_placeholder" and timing.tags["slot"] == "body"
+        )
+        self.assertEqual(body_timing.cache, "miss")
+
+    @override_settings(CMS_RENDER_PROFILER="cms.utils.profiling.ServerTimingRenderProfiler")
+    def test_server_timing_header(self):
+        response = self.client.get(self.page.get_absolute_url())
+        self.assertIn("cms-render-plugin;dur=", response["Server-Timing"])
+        self.assertIn("cms-assign-plugins;dur=", response["Server-Timing"])
+
+    @override_settings(CMS_RENDER_PROFILER="cms.utils.profiling.LoggingRenderProfiler")
+    def test_logging_profiler(self):
+        with self.assertLogs("cms.profiling", level="INFO") as logs:
+            self.client.get(self.page.get_absolute_url())
+        self.assertTrue(
+            any("cms.render_plugin.TextPlugin:" in message and message.endswith("|ms") for message in logs.output)
+        )
+
+    def test_profiling_disabled(self):
+        response = self.client.get(self.page.get_absolute_url())
+        self.assertContains(response, "Profiled")
+        self.assertFalse(response.has_header("Server-Timing"))
+        self.assertIsNone(getattr(response.wsgi_request, "_cms_render_profiler", None))
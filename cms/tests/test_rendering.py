@@ -1,3 +1,5 @@
+from unittest.mock import patch
+
 from django.core.cache import cache
 from django.http.response import Http404
 from django.test.utils import override_settings
@@ -798,3 +800,56 @@ class RenderingTestCase(CMSTestCase):
         for plugin in plugins:
             start_tag = tag_format.format(plugin.pk, plugin.placeholder_id, plugin.position)
             self.assertIn(start_tag, output)
+
+    # Test cases run in a transaction, which disables pre-rendering
+    @patch.object(plugin_rendering, '_in_atomic_block', return_value=False)
+    @override_settings(CMS_PLACEHOLDER_RENDER_WORKERS=2)
+    def test_prerender_placeholders(self, in_atomic_block):
+        expected = '|' + self.test_data['text_main'] + '|' + self.test_data['text_sub'] + '|'
+
+        with patch.object(
+            plugin_rendering.ContentRenderer,
+            '_prerender_placeholder',
+            autospec=True,
+            side_effect=plugin_rendering.ContentRenderer._prerender_placeholder,
+        ) as prerender, patch.object(
+            plugin_rendering, 'get_placeholder_cache', wraps=plugin_rendering.get_placeholder_cache,
+        ) as get_cache:
+            self.assertEqual(self.render(self.test_page), expected)
+        # Both placeholders with plugins have been rendered by the workers
+        self.assertEqual(prerender.call_count, 2)
+        # The cache is read once per placeholder
+        self.assertEqual(sorted(call.args[0].slot for call in get_cache.call_args_list), ['empty', 'main', 'sub'])
+
+    @patch.object(plugin_rendering, '_in_atomic_block', return_value=False)
+    @override_settings(CMS_PLACEHOLDER_RENDER_WORKERS=2)
+    def test_prerender_placeholders_failure_renders_inline(self, in_atomic_block):
+        expected = '|' + self.test_data['text_main'] + '|' + self.test_data['text_sub'] + '|'
+
+        with patch.object(
+            plugin_rendering.ContentRenderer,
+            '_prerender_placeholder',
+            side_effect=RuntimeError,
+        ) as prerender, self.assertLogs('cms.plugin_rendering', 'ERROR') as logs:
+            self.assertEqual(self.render(self.test_page), expected)
+        self.assertEqual(prerender.call_count, 2)
+        self.assertEqual(len(logs.records), 2)
+        self.assertIn('failed to render in a worker thread', logs.output[0])
+
+    @override_settings(CMS_PLACEHOLDER_RENDER_WORKERS=2)
+    def test_prerender_placeholders_skipped_in_transaction(self):
+        expected = '|' + self.test_data['text_main'] + '|' + self.test_data['text_sub'] + '|'
+
+        with patch.object(plugin_rendering.ContentRenderer, '_prerender_placeholders_for_page') as prerender:
+            self.assertEqual(self.render(self.test_page), expected)
+        prerender.assert_not_called()
+
+    @override_settings(CMS_PLACEHOLDER_RENDER_WORKERS=2)
+    def test_prerender_placeholders_skipped_in_edit_mode(self):
+        page_content = self.get_pagecontent_obj(self.test_page)
+
+        with self.login_user_context(self.test_user):
+            with patch.object(plugin_rendering.ContentRenderer, '_prerender_placeholders_for_page') as prerender:
+                response = self.client.get(get_object_edit_url(page_content))
+        self.assertContains(response, self.test_data['text_main'])
+        prerender.assert_not_called()
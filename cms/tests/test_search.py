@@ -0,0 +1,149 @@
+from io import StringIO
+from unittest.mock import patch
+
+from django.core import management
+from django.db import connection
+from django.test.utils import override_settings
+
+from cms import operations
+from cms.api import add_plugin, create_page, create_page_content
+from cms.models import Page, PageSearchDocument
+from cms.signals import post_placeholder_operation
+from cms.test_utils.testcases import CMSTestCase
+from cms.utils.language_copy import copy_pages_to_language
+from cms.utils.plugins import copy_plugins_to_placeholders
+from cms.utils.search import SearchBackend, SQLiteSearchBackend, get_search_backend, rebuild_search_index
+
+
+@override_settings(CMS_SEARCH_INDEX=True)
+class SearchIndexTestCase(CMSTestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        # Created by the migrations, which don't run for the tests
+        with connection.cursor() as cursor:
+            cursor.execute(f"CREATE VIRTUAL TABLE {SQLiteSearchBackend.table_name} USING fts5(title, text)")
+
+    def setUp(self):
+        self.page = create_page("Hello world", "nav_playground.html", "en")
+        self.other_page = create_page("Another page", "nav_playground.html", "en")
+        placeholder = self.other_page.get_placeholders("en").get(slot="body")
+        add_plugin(placeholder, "TextPlugin", "en", body="<p>Hello there</p>")
+        rebuild_search_index()
+
+    def test_backend(self):
+        self.assertIsInstance(get_search_backend(), SQLiteSearchBackend)
+
+        with self.settings(CMS_SEARCH_INDEX=False):
+            self.assertIsNone(get_search_backend())
+
+        # The migrations don't create the FTS5 table without the module
+        with patch("cms.utils.search._sqlite_has_fts5", return_value=False):
+            self.assertIs(type(get_search_backend()), SearchBackend)
+
+    def test_documents(self):
+        document = PageSearchDocument.objects.get(page=self.other_page, language="en")
+        self.assertEqual(document.title, "Another page")
+        self.assertIn("Hello there", document.text)
+        self.assertNotIn("<p>", document.text)
+
+    def test_search(self):
+        # Matches in the title rank higher
+        self.assertEqual(list(Page.objects.search("hello")), [self.page, self.other_page])
+        self.assertEqual(list(Page.objects.search("hel")), [self.page, self.other_page])
+        self.assertEqual(list(Page.objects.search("hello there")), [self.other_page])
+        self.assertEqual(list(Page.objects.search("hi")), [])
+        self.assertEqual(list(Page.objects.search("hello", language="de")), [])
+        self.assertEqual(list(Page.objects.search('"')), [])
+
+    @override_settings(CMS_SEARCH_INDEX="cms.utils.search.SearchBackend")
+    def test_portable_backend(self):
+        self.assertIs(type(get_search_backend()), SearchBackend)
+        self.assertEqual(list(Page.objects.search("hello")), [self.page, self.other_page])
+        self.assertEqual(list(Page.objects.search("hello there")), [self.other_page])
+        self.assertEqual(list(Page.objects.search("hi")), [])
+
+    def test_search_without_index(self):
+        with self.settings(CMS_SEARCH_INDEX=False):
+            self.assertEqual(set(Page.objects.search("hello")), {self.page, self.other_page})
+
+    def test_page_content_changes_are_indexed(self):
+        page_content = self.page.get_content_obj("en")
+        page_content.title = "Goodbye"
+        page_content.save()
+
+        self.assertEqual(list(Page.objects.search("goodbye")), [self.page])
+        self.assertEqual(list(Page.objects.search("hello")), [self.other_page])
+
+        create_page_content("de", "Hallo Welt", self.page)
+        self.assertEqual(list(Page.objects.search("hallo", language="de")), [self.page])
+
+        self.page.get_content_obj("de").delete()
+        self.assertEqual(list(Page.objects.search("hallo")), [])
+
+    def test_deleted_pages_are_removed_from_the_index(self):
+        def get_indexed_ids():
+            with connection.cursor() as cursor:
+                cursor.execute(f"SELECT rowid FROM {SQLiteSearchBackend.table_name}")
+                return {row[0] for row in cursor.fetchall()}
+
+        document = PageSearchDocument.objects.get(page=self.other_page)
+        self.assertIn(document.pk, get_indexed_ids())
+
+        self.other_page.delete()
+
+        self.assertNotIn(document.pk, get_indexed_ids())
+        self.assertEqual(len(get_indexed_ids()), PageSearchDocument.objects.count())
+
+    def test_placeholder_operations_are_indexed(self):
+        placeholder = self.page.get_placeholders("en").get(slot="body")
+        add_plugin(placeholder, "TextPlugin", "en", body="Indexed later")
+        self.assertEqual(list(Page.objects.search("later")), [])
+
+        request = self.get_request()
+        request.user = self.get_superuser()
+        post_placeholder_operation.send(
+            sender=Page,
+            operation=operations.ADD_PLUGIN,
+            request=request,
+            language="en",
+            token="",
+            origin="/",
+            placeholder=placeholder,
+        )
+        self.assertEqual(list(Page.objects.search("later")), [self.page])
+
+    def test_copied_pages_are_indexed(self):
+        create_page("Child", "nav_playground.html", "en", parent=self.other_page)
+        child = self.other_page.get_child_pages().get()
+        placeholder = child.get_placeholders("en").get(slot="body")
+        add_plugin(placeholder, "TextPlugin", "en", body="Nested text")
+        rebuild_search_index()
+
+        self.other_page.copy_with_descendants(target_page=self.page, position="last-child", user=self.get_superuser())
+
+        self.assertEqual(len(Page.objects.search("hello there")), 2)
+        self.assertEqual(len(Page.objects.search("nested")), 2)
+
+    def test_copied_languages_are_indexed(self):
+        page_content = create_page_content("de", "Noch eine Seite", self.other_page, template="nav_playground.html")
+        source = self.other_page.get_placeholders("en").get(slot="body")
+        target = page_content.rescan_placeholders()["body"]
+
+        copy_plugins_to_placeholders([(source, target)], "en", "de")
+
+        self.assertEqual(list(Page.objects.search("there", language="de")), [self.other_page])
+
+    def test_plugins_in_other_languages_are_not_indexed(self):
+        copy_pages_to_language([self.other_page], "en", "de", user=self.get_superuser())
+
+        # The plugins are copied to the placeholders of the source language
+        self.assertEqual(list(Page.objects.search("another", language="de")), [self.other_page])
+        self.assertEqual(list(Page.objects.search("there", language="de")), [])
+
+    def test_rebuild_search_index_command(self):
+        PageSearchDocument.objects.all().delete()
+        out = StringIO()
+        management.call_command("cms", "rebuild-search-index", interactive=False, stdout=out)
+        self.assertEqual(out.getvalue(), "2 page contents indexed\n")
+        self.assertEqual(list(Page.objects.search("hello there")), [self.other_page])
@@ -1,6 +1,12 @@
 import copy
+from unittest.mock import patch
 
+from django.contrib.sitemaps import Sitemap
+from django.core.paginator import EmptyPage
 from django.db.models import QuerySet
+from django.test.utils import override_settings
+from django.urls import NoReverseMatch, reverse
+from django.utils.translation import get_language
 
 from cms.api import create_page, create_page_content
 from cms.models import PageUrl
@@ -8,10 +14,15 @@ from cms.sitemaps import CMSSitemap
 from cms.test_utils.testcases import CMSTestCase
 from cms.utils.compat import DJANGO_4_2
 from cms.utils.conf import get_cms_setting
+from cms.utils.i18n import get_public_languages
 
 protocol = "http" if DJANGO_4_2 else "https"
 
 
+class ShardedSitemap(CMSSitemap):
+    limit = 5
+
+
 class SitemapTestCase(CMSTestCase):
     def setUp(self):
         """
@@ -129,3 +140,84 @@ class SitemapTestCase(CMSTestCase):
         sitemap = CMSSitemap()
         items = sitemap.items()
         self.assertIsInstance(items, QuerySet, "CMSSitemap.items() must return a QuerySet.")
+
+    def test_sitemap_shards(self):
+        """
+        The urls are split into shards by page path, the urls of a page
+        are in the same shard.
+        """
+        sitemap = ShardedSitemap()
+        self.assertEqual(sitemap.paginator.num_pages, 5)
+
+        locations = []
+        pages = []
+
+        for number in sitemap.paginator.page_range:
+            urls = ShardedSitemap().get_urls(page=str(number))
+            self.assertLessEqual(len(urls), 5)
+            locations.extend(url["location"] for url in urls)
+            pages.append({url["item"].page_id for url in urls})
+
+        self.assertEqual(locations, [url["location"] for url in CMSSitemap().get_urls()])
+        for shard, other in zip(pages, pages[1:]):
+            self.assertFalse(shard & other)
+
+        with self.assertRaises(EmptyPage):
+            sitemap.get_urls(page=6)
+
+    def test_sitemap_location_without_reverse(self):
+        sitemap = CMSSitemap()
+
+        with patch("cms.sitemaps.cms_sitemap.reverse", wraps=reverse) as reverse_mock:
+            items = list(sitemap.items())
+            locations = [sitemap.location(page_url) for page_url in items]
+
+        # Two urls per language
+        self.assertEqual(reverse_mock.call_count, 2 * len(get_public_languages(site_id=1)))
+        self.assertEqual(locations, [page_url.get_absolute_url(page_url.language) for page_url in items])
+
+    def test_sitemap_skips_languages_without_page_urls(self):
+        def reverse_en(*args, **kwargs):
+            if get_language() != "en":
+                raise NoReverseMatch
+            return reverse(*args, **kwargs)
+
+        with patch("cms.sitemaps.cms_sitemap.reverse", side_effect=reverse_en):
+            sitemap = CMSSitemap()
+            urls = sitemap.get_urls()
+
+            self.assertEqual({url["item"].language for url in urls}, {"en"})
+            self.assertTrue(all(url["location"].startswith(f"{protocol}://example.com/en/") for url in urls))
+
+            with self.assertRaises(NoReverseMatch):
+                sitemap.location(PageUrl.objects.filter(language="de").first())
+
+    @override_settings(CMS_SITEMAP_CACHE_DURATION=60 * 60)
+    def test_sitemap_shard_cache(self):
+        with patch.object(Sitemap, "_urls", autospec=True, side_effect=Sitemap._urls) as urls_mock:
+            for number in (1, 2):
+                ShardedSitemap().get_urls(page=number)
+            self.assertEqual(urls_mock.call_count, 2)
+
+            # Cached
+            for number in (1, 2):
+                ShardedSitemap().get_urls(page=number)
+            self.assertEqual(urls_mock.call_count, 2)
+
+            # Only the shard of the changed page is re-created
+            page = ShardedSitemap().get_urls(page=2)[0]["item"].page
+            page.get_content_obj("en").save()
+            ShardedSitemap().get_urls(page=1)
+            self.assertEqual(urls_mock.call_count, 2)
+            urls = ShardedSitemap().get_urls(page=2)
+            self.assertEqual(urls_mock.call_count, 3)
+
+            # A slug change of the parent page changes the urls of the shard
+            parent = page.parent
+            parent_content = parent.get_content_obj("en")
+            parent_content.save()
+            PageUrl.objects.filter(page=parent, language="en").update(slug="renamed")
+            parent._update_url_path("en")
+            parent._update_descendant_url_paths("en", "p1")
+            self.assertNotEqual(ShardedSitemap().get_urls(page=2), urls)
+            self.assertEqual(urls_mock.call_count, 4)
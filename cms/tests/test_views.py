@@ -1,12 +1,13 @@
 import re
 import sys
+from unittest.mock import patch
 
 from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.contrib.auth.models import Permission
 from django.contrib.contenttypes.models import ContentType
 from django.core.cache import cache
-from django.http import Http404, HttpResponse
+from django.http import Http404, HttpResponse, StreamingHttpResponse
 from django.template import Variable
 from django.test.utils import override_settings
 from django.urls import clear_url_caches, reverse
@@ -14,7 +15,7 @@ from django.utils import translation
 from django.utils.deprecation import MiddlewareMixin
 from django.utils.translation import override as force_language
 
-from cms.api import create_page, create_page_content
+from cms.api import add_plugin, create_page, create_page_content
 from cms.middleware.toolbar import ToolbarMiddleware
 from cms.models import PageContent, PagePermission, Placeholder, UserSettings
 from cms.page_rendering import _handle_no_page
@@ -259,7 +260,7 @@ class ViewTests(CMSTestCase):
 
         # Superuser
         user = self.get_superuser()
-        with self.login_user_context(user):
+        with self.captureOnCommitCallbacks(execute=True), self.login_user_context(user):
             response = self.client.get(page_preview_url)
         toolbar = response.wsgi_request.toolbar
         edit_button = toolbar.get_right_items()[2].buttons[0]
@@ -268,15 +269,17 @@ class ViewTests(CMSTestCase):
         self.assertEqual(edit_button.extra_classes, ["cms-btn", "cms-btn-action", "cms-btn-switch-edit"])
 
         # Admin but with no permission
-        user = self.get_staff_user_with_no_permissions()
-        user.user_permissions.add(Permission.objects.get(codename="change_page"))
+        with self.captureOnCommitCallbacks(execute=True):
+            user = self.get_staff_user_with_no_permissions()
+            user.user_permissions.add(Permission.objects.get(codename="change_page"))
 
-        with self.login_user_context(user):
-            response = self.client.get(page_preview_url)
+            with self.login_user_context(user):
+                response = self.client.get(page_preview_url)
         toolbar = response.wsgi_request.toolbar
         self.assertEqual(len(toolbar.get_right_items()), 2)  # Only has Create button and color switch
 
-        PagePermission.objects.create(can_change=True, user=user, page=page)
+        with self.captureOnCommitCallbacks(execute=True):
+            PagePermission.objects.create(can_change=True, user=user, page=page)
         with self.login_user_context(user):
             response = self.client.get(page_preview_url)
         toolbar = response.wsgi_request.toolbar
@@ -489,6 +492,87 @@ class ContextTests(CMSTestCase):
                 self.assertEqual(template, page_template)
 
 
+@override_settings(CMS_STREAMING_RESPONSE=True)
+class StreamingResponseTests(CMSTestCase):
+
+    def setUp(self):
+        from cms.plugin_pool import plugin_pool
+        from cms.test_utils.project.pluginapp.plugins.caching.cms_plugins import SekizaiPlugin
+
+        super().setUp()
+        if "SekizaiPlugin" not in plugin_pool.plugins:
+            plugin_pool.register_plugin(SekizaiPlugin)
+            self.addCleanup(plugin_pool.unregister_plugin, SekizaiPlugin)
+        self.page = self.create_homepage("page", "nav_playground.html", "en")
+        body = self.page.get_placeholders("en").get(slot="body")
+        right_column = self.page.get_placeholders("en").get(slot="right-column")
+        add_plugin(body, "TextPlugin", "en", body="Streamed body")
+        add_plugin(right_column, "SekizaiPlugin", "en")
+        add_plugin(right_column, "TextPlugin", "en", body="Streamed column")
+
+    def _get_content(self, response):
+        if response.streaming:
+            return b"".join(response.streaming_content).decode()
+        return response.content.decode()
+
+    @override_settings(CMS_PAGE_CACHE=False)
+    def test_streamed_page_matches_rendered_page(self):
+        url = self.page.get_absolute_url()
+
+        with self.settings(CMS_STREAMING_RESPONSE=False):
+            response = self.client.get(url)
+        self.assertNotIsInstance(response, StreamingHttpResponse)
+        expected = self._get_content(response)
+
+        response = self.client.get(url)
+        self.assertIsInstance(response, StreamingHttpResponse)
+        self.assertIn("no-cache", response["Cache-Control"])
+        content = self._get_content(response)
+        self.assertIn("Streamed body", content)
+        self.assertIn("Streamed column", content)
+        self.assertNotIn("cms-placeholder:", content)
+        # The sekizai data of the placeholders is still part of the page
+        self.assertEqual(content.count("alert("), 1)
+        self.assertLess(content.index("alert("), content.index("</body>"))
+        # Apart from the sekizai data (and the random numbers rendered
+        # by the sekizai plugin) the page is identical
+        pattern = re.compile(r"<script>\s*alert\('\d+'\);\s*</script>|\$\$\$\d+\$\$\$|\s+")
+        self.assertEqual(pattern.sub("", content), pattern.sub("", expected))
+
+    @override_settings(CMS_PAGE_CACHE=False)
+    def test_streamed_placeholder_error_is_logged(self):
+        from cms.plugin_rendering import ContentRenderer
+
+        render_page_placeholder = ContentRenderer.render_page_placeholder
+
+        def fail_for_body(renderer, slot, *args, **kwargs):
+            if slot == "body":
+                raise RuntimeError("broken placeholder")
+            return render_page_placeholder(renderer, slot, *args, **kwargs)
+
+        with patch.object(ContentRenderer, "render_page_placeholder", autospec=True, side_effect=fail_for_body):
+            response = self.client.get(self.page.get_absolute_url())
+
+            with self.assertLogs("cms.plugin_rendering", level="ERROR") as logs:
+                content = self._get_content(response)
+        self.assertIn('Placeholder "body" failed to render', logs.output[0])
+        self.assertNotIn("Streamed body", content)
+        self.assertIn("Streamed column", content)
+        self.assertIn("</html>", content)
+
+    @override_settings(CMS_PAGE_CACHE=True)
+    def test_cacheable_page_is_not_streamed(self):
+        response = self.client.get(self.page.get_absolute_url())
+        self.assertNotIsInstance(response, StreamingHttpResponse)
+        self.assertContains(response, "Streamed body")
+
+    def test_toolbar_page_is_not_streamed(self):
+        with self.login_user_context(self.get_superuser()):
+            response = self.client.get(self.page.get_absolute_url())
+        self.assertNotIsInstance(response, StreamingHttpResponse)
+        self.assertContains(response, "Streamed body")
+
+
 class EndpointTests(CMSTestCase):
     def setUp(self) -> None:
         page_template = "simple.html"
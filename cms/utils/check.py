@@ -276,10 +276,9 @@ def check_plugin_instances(output):
             if not plugin_type["model"]:
                 section.error("%s has instances but is no longer installed" % plugin_type["type"])
             # warn about those that have unsaved instances
-            if plugin_type["unsaved_instances"]:
-                section.error(
-                    "{} has {} unsaved instances".format(plugin_type["type"], len(plugin_type["unsaved_instances"]))
-                )
+            unsaved_instances = plugin_type["unsaved_instances"].count()
+            if unsaved_instances:
+                section.error("{} has {} unsaved instances".format(plugin_type["type"], unsaved_instances))
 
         if section.successful:
             section.finish_success("The plugins in your database are in good order")
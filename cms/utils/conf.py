@@ -64,6 +64,15 @@ DEFAULTS = {
     'PAGE_CACHE': True,
     'PLACEHOLDER_CACHE': True,
     'PLUGIN_CACHE': True,
+    'PLUGIN_FRAGMENT_CACHE': False,
+    'PLUGIN_DOWNCAST_UNION': False,
+    'PLUGIN_TREE_CACHE': False,
+    'PLUGIN_PATH_LOOKUPS': False,
+    'SEARCH_INDEX': False,
+    'SITEMAP_CACHE_DURATION': 0,
+    'STREAMING_RESPONSE': False,
+    'RENDER_PROFILER': None,
+    'PLACEHOLDER_RENDER_WORKERS': 0,
     'CACHE_PREFIX': f'cms_{__version__}_',
     'PLUGIN_PROCESSORS': [],
     'PLUGIN_CONTEXT_PROCESSORS': [],
@@ -0,0 +1,79 @@
+"""
+Copy of page translations to another language.
+
+:func:`copy_pages_to_language` copies the contents and plugins of many
+pages from one language to another in one call, e.g., to roll out a new
+language. Missing page contents in the target language are created from
+the source language, the plugins of all pages are copied with
+:func:`cms.utils.plugins.copy_plugins_to_placeholders`: the source plugins
+are loaded with one query (and one per plugin model) and inserted in bulk.
+
+Like :func:`cms.api.copy_plugins_to_language`, the plugins are copied to
+the placeholders of the page content in the source language.
+"""
+from django.contrib.contenttypes.models import ContentType
+from django.forms import model_to_dict
+
+from cms.exceptions import UserRequiredError
+from cms.models import PageContent, Placeholder
+from cms.utils.plugins import copy_plugins_to_placeholders
+
+# Number of pages copied in one transaction by the copy lang command
+COPY_BATCH_SIZE = 100
+
+
+def copy_pages_to_language(pages, source_language, target_language, user=None, only_empty=True, copy_content=True):
+    """
+    Copies the page contents and plugins of «pages» in «source_language» to
+    «target_language». Pages without a content in «source_language» are
+    skipped. Returns the number of created page contents and of copied
+    plugins.
+
+    :param pages: Pages to copy
+    :param user: User creating the page contents, required if page contents
+        have to be created, otherwise :class:`~cms.exceptions.UserRequiredError`
+        is raised
+    :param bool only_empty: if False, plugins are copied even if the
+        placeholder already has plugins in «target_language»
+    :param bool copy_content: if False, only the page contents are created
+    """
+    pages = {page.pk: page for page in pages}
+    source_contents = {
+        page_content.page_id: page_content
+        for page_content in PageContent.admin_manager.current_content(page__in=pages, language=source_language)
+    }
+    existing = set(
+        PageContent.admin_manager
+        .current_content(page__in=source_contents, language=target_language)
+        .values_list("page", flat=True)
+    )
+    created = 0
+
+    for page_id, page_content in source_contents.items():
+        if page_id in existing:
+            continue
+
+        if not user:
+            raise UserRequiredError("A user is required to create page contents.")
+
+        new_content = model_to_dict(page_content)
+        new_content.pop("id", None)  # No PK
+        new_content["language"] = target_language
+        new_content["page"] = pages[page_id]
+        PageContent.objects.with_user(user).create(**new_content)
+        created += 1
+
+    if not copy_content:
+        return created, 0
+
+    placeholders = Placeholder.objects.filter(
+        content_type=ContentType.objects.get_for_model(PageContent),
+        object_id__in=[page_content.pk for page_content in source_contents.values()],
+    )
+    copied = copy_plugins_to_placeholders(
+        [(placeholder, placeholder) for placeholder in placeholders],
+        source_language,
+        target_language,
+        only_empty=only_empty,
+    )
+    return created, copied
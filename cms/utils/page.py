@@ -112,17 +112,19 @@ def get_page_from_request(request, use_path=None, clean_path=None):
     return page
 
 
-def get_available_slug(site, path, language, suffix='copy', modified=False):
+def get_available_slug(site, path, language, suffix='copy', modified=False, reserved_paths=frozenset()):
     """
     Generates slug for path.
     If path is used, appends the value of suffix to the end.
+
+    «reserved_paths» are treated as used in addition to the paths in the
+    database, e.g., paths of pages that are about to be created.
     """
     from cms.models.pagemodel import PageUrl
 
     base, _, slug = path.rpartition('/')
-    page_urls = PageUrl.objects.get_for_site(site, path=path, language=language)
 
-    if page_urls.exists():
+    if path in reserved_paths or PageUrl.objects.get_for_site(site, path=path, language=language).exists():
         match = SUFFIX_REGEX.match(slug)
 
         if match and modified:
@@ -133,5 +135,5 @@ def get_available_slug(site, path, language, suffix='copy', modified=False):
         else:
             slug += '-2'
         path = f'{base}/{slug}' if base else slug
-        return get_available_slug(site, path, language, suffix, modified=True)
+        return get_available_slug(site, path, language, suffix, modified=True, reserved_paths=reserved_paths)
     return slug
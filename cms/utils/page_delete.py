@@ -0,0 +1,193 @@
+"""
+Bulk deletion of pages.
+
+:meth:`cms.models.Page.delete` removes a page along with its descendants and
+their contents, placeholders and plugins. Leaving this to Django's deletion
+collector would load every plugin and every row of the plugin models into
+memory, since the collector has to follow the relations of each plugin
+model. Instead, the ids of the affected placeholders and plugins are
+computed with set-based queries and the rows are deleted table by table, in
+chunks: first the rows of the plugin models, then the plugins, the
+placeholders, the page contents and finally the pages.
+
+Rows of a model are deleted with a plain ``DELETE`` if no ``pre_delete`` or
+``post_delete`` receivers are connected for the model and no rows of other
+tables refer to them. Otherwise they are deleted with the collector, so that
+receivers are called and relations are followed as usual. Caches are
+invalidated once, after all rows have been deleted.
+"""
+from collections import defaultdict
+
+from django.contrib.contenttypes.models import ContentType
+from django.db import models, router, transaction
+from django.db.models import signals
+from django.db.models.deletion import get_candidate_relations_to_delete
+
+from cms.models import CMSPlugin, Page, PageContent, Placeholder
+from cms.plugin_pool import plugin_pool
+
+# Number of rows deleted with one query
+DELETE_BATCH_SIZE = 500
+
+
+def _get_batches(items, batch_size):
+    for offset in range(0, len(items), batch_size):
+        yield items[offset:offset + batch_size]
+
+
+def can_raw_delete(model):
+    """
+    Returns True if rows of «model» may be deleted without the deletion
+    collector: no delete receivers are connected for the model and it has
+    no generic relations.
+    """
+    if signals.pre_delete.has_listeners(model) or signals.post_delete.has_listeners(model):
+        return False
+    return not any(hasattr(field, "bulk_related_objects") for field in model._meta.private_fields)
+
+
+def get_cascading_relations(model, handled_relations=()):
+    """
+    Returns the relations to «model» which do something when a row of
+    «model» is deleted, except «handled_relations» (fields referring to the
+    model whose rows the caller deletes itself). Relations to the parents
+    of «model» are left out.
+    """
+    return [
+        related
+        for related in get_candidate_relations_to_delete(model._meta)
+        if related.model is model
+        and related.field not in handled_relations
+        and related.field.remote_field.on_delete is not models.DO_NOTHING
+    ]
+
+
+def _is_referenced(relations, pks):
+    for related in relations:
+        if related.field.target_field is not related.model._meta.pk:
+            return True
+
+        if related.related_model._base_manager.filter(**{f"{related.field.name}__in": pks}).exists():
+            return True
+    return False
+
+
+def _delete_rows(model, pks, batch_size, handled_relations=None):
+    """
+    Deletes the rows of «model» with the primary keys «pks» in chunks of
+    «batch_size». A chunk is deleted with a plain ``DELETE`` if the model
+    allows it (see ``can_raw_delete``) and no rows of other tables refer to
+    it, otherwise with the deletion collector. If «handled_relations» is
+    None, the collector is always used.
+    """
+    using = router.db_for_write(model)
+    raw = handled_relations is not None and can_raw_delete(model)
+    relations = get_cascading_relations(model, handled_relations) if raw else []
+
+    for batch in _get_batches(pks, batch_size):
+        queryset = model._base_manager.using(using).filter(pk__in=batch)
+
+        if raw and not _is_referenced(relations, batch):
+            queryset._raw_delete(using)
+        else:
+            queryset.delete()
+
+
+def _get_plugin_model(plugin_type):
+    try:
+        return plugin_pool.get_plugin(plugin_type).model
+    except KeyError:
+        return None
+
+
+def delete_plugins(plugins, batch_size=DELETE_BATCH_SIZE):
+    """
+    Deletes the plugins of the queryset «plugins» along with the rows of
+    their plugin models. The queryset has to include the descendants of
+    its plugins. Positions of remaining plugins are not updated.
+
+    The rows of each plugin model are deleted in chunks of «batch_size»
+    with a plain ``DELETE`` if the model directly inherits from
+    :class:`~cms.models.pluginmodel.CMSPlugin` and can be deleted without
+    the collector (see ``can_raw_delete``), otherwise the plugins are
+    deleted with the collector.
+    """
+    plugin_ids = defaultdict(list)
+    depths = {}
+
+    for pk, plugin_type, path in plugins.values_list("pk", "plugin_type", "path"):
+        plugin_ids[plugin_type].append(pk)
+        depths[pk] = path.count("/")
+
+    collected = []
+
+    for plugin_type, pks in plugin_ids.items():
+        plugin_model = _get_plugin_model(plugin_type)
+
+        if plugin_model is CMSPlugin:
+            continue
+
+        if (
+            plugin_model is not None
+            and list(plugin_model._meta.parents) == [CMSPlugin]
+            and can_raw_delete(plugin_model)
+        ):
+            _delete_rows(plugin_model, pks, batch_size, handled_relations=())
+        else:
+            # Uninstalled plugins, plugin models with receivers or further parents
+            collected.extend(pks)
+
+    _delete_rows(CMSPlugin, collected, batch_size)
+
+    # The rows of the plugin models are gone, as are the descendants of
+    # the plugins. Children are deleted first, in case the database checks
+    # the parent key immediately.
+    collected = set(collected)
+    remaining = sorted((pk for pk in depths if pk not in collected), key=depths.get, reverse=True)
+    handled_relations = [
+        related.field
+        for related in get_candidate_relations_to_delete(CMSPlugin._meta)
+        if related.parent_link or related.field.name == "parent"
+    ]
+    _delete_rows(CMSPlugin, remaining, batch_size, handled_relations)
+
+
+def delete_placeholders(placeholders, batch_size=DELETE_BATCH_SIZE):
+    """
+    Deletes the placeholders of the queryset «placeholders» along with
+    their plugins, see ``delete_plugins``.
+    """
+    placeholder_ids = list(placeholders.values_list("pk", flat=True))
+
+    for batch in _get_batches(placeholder_ids, batch_size):
+        delete_plugins(CMSPlugin.objects.filter(placeholder__in=batch), batch_size=batch_size)
+
+    _delete_rows(Placeholder, placeholder_ids, batch_size, [CMSPlugin._meta.get_field("placeholder")])
+
+
+def delete_page_tree(page, batch_size=DELETE_BATCH_SIZE):
+    """
+    Deletes «page» and its descendants along with their contents,
+    placeholders and plugins and returns the number of deleted pages.
+    Caches are cleared once.
+    """
+    pages = Page.get_tree(page)
+    count = pages.count()
+    page_contents = PageContent.admin_manager.filter(page__in=pages)
+
+    with transaction.atomic():
+        delete_placeholders(
+            Placeholder.objects.filter(
+                content_type=ContentType.objects.get_for_model(PageContent),
+                object_id__in=page_contents.values("pk"),
+            ),
+            batch_size=batch_size,
+        )
+        _delete_rows(PageContent, list(page_contents.values_list("pk", flat=True)), batch_size)
+        pages.delete_fast()
+
+        if page.parent_id:
+            Page.objects.filter(pk=page.parent_id).update(numchild=models.F("numchild") - 1)
+
+    page.clear_cache(menu=True)
+    return count
@@ -0,0 +1,189 @@
+"""
+Export of pages.
+
+:func:`export_pages` yields the pages of a site (or of a branch) as page
+records in the format read by :func:`cms.api.import_pages`, see
+:mod:`cms.utils.page_import`, and :func:`write_page_records` writes them
+as newline delimited JSON.
+
+Pages are read in batches in tree order, using the last path of a batch
+to get the next one. The urls, contents, placeholders and plugins of a
+batch are fetched with one query each, and one query per concrete plugin
+model. Only one batch is held in memory at a time. Page types are not
+exported.
+"""
+import json
+from collections import defaultdict
+
+from django.contrib.contenttypes.models import ContentType
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils.encoding import is_protected_type
+
+from cms.models import CMSPlugin, Page, PageContent, PageUrl, Placeholder
+from cms.plugin_pool import plugin_pool
+from cms.utils import get_current_site
+from cms.utils.page_import import PAGE_CONTENT_DEFAULTS, PAGE_FIELDS
+
+# Number of pages exported at once
+EXPORT_BATCH_SIZE = 500
+
+
+def export_pages(site=None, root=None, batch_size=EXPORT_BATCH_SIZE):
+    """
+    Yields the page records of the pages of «site» or of the branch starting
+    at the page «root», parents before their children.
+    """
+    if root is not None:
+        pages = Page.objects.filter(path__startswith=root.path, depth__gte=root.depth)
+    else:
+        pages = Page.objects.on_site(site or get_current_site())
+
+    pages = pages.filter(is_page_type=False).order_by("path")
+    last_path = ""
+
+    while True:
+        batch = list(pages.filter(path__gt=last_path)[:batch_size])
+
+        if not batch:
+            break
+
+        yield from _get_page_records(batch, root=root)
+        last_path = batch[-1].path
+
+
+def write_page_records(records, stream):
+    """
+    Writes the page «records» to the (text) «stream», one JSON document per
+    line. Returns the number of records.
+    """
+    count = 0
+
+    for record in records:
+        stream.write(json.dumps(record, cls=DjangoJSONEncoder) + "\n")
+        count += 1
+    return count
+
+
+def _get_page_records(pages, root=None):
+    page_ids = [page.pk for page in pages]
+    urls = defaultdict(dict)
+
+    for page_url in PageUrl.objects.filter(page__in=page_ids):
+        urls[page_url.page_id][page_url.language] = page_url
+
+    page_contents = list(PageContent.admin_manager.current_content(page__in=page_ids).order_by("pk"))
+    plugins_by_content = _get_plugin_records(page_contents)
+    translations = defaultdict(list)
+
+    for page_content in page_contents:
+        page_url = urls[page_content.page_id].get(page_content.language)
+        translation = {"language": page_content.language, "title": page_content.title}
+
+        if page_url is not None:
+            translation["slug"] = page_url.slug
+            translation["overwrite_url"] = None if page_url.managed else page_url.path
+
+        for field in PAGE_CONTENT_DEFAULTS:
+            translation[field] = getattr(page_content, field)
+        translation["placeholders"] = plugins_by_content[page_content.pk]
+        translations[page_content.page_id].append(translation)
+
+    for page in pages:
+        record = {
+            "key": page.pk,
+            "parent": None if root is not None and page.pk == root.pk else page.parent_id,
+            "is_home": page.is_home,
+        }
+
+        for field in PAGE_FIELDS:
+            record[field] = getattr(page, field)
+        record["translations"] = translations[page.pk]
+        yield record
+
+
+def _get_plugin_records(page_contents):
+    """
+    Returns the plugin trees of the given page contents by the primary key
+    of the page content and the placeholder slot.
+    """
+    plugin_pool.discover_plugins()
+    placeholders = Placeholder.objects.filter(
+        content_type=ContentType.objects.get_for_model(PageContent),
+        object_id__in=[page_content.pk for page_content in page_contents],
+    ).order_by("pk")
+    plugins_by_content = {page_content.pk: {} for page_content in page_contents}
+    languages = {page_content.pk: page_content.language for page_content in page_contents}
+    slots = {}
+
+    for placeholder in placeholders:
+        slots[placeholder.pk] = (placeholder.object_id, placeholder.slot)
+        plugins_by_content[placeholder.object_id][placeholder.slot] = []
+
+    plugins = list(CMSPlugin.objects.filter(placeholder__in=slots).order_by("placeholder", "position"))
+    data = _get_plugin_data(plugins)
+    records = {}
+
+    for plugin in plugins:
+        content_id, slot = slots[plugin.placeholder_id]
+
+        if plugin.language != languages[content_id] or plugin.plugin_type not in plugin_pool.plugins:
+            # Plugins of other languages are not shown in this placeholder,
+            # plugins which are not installed anymore can't be imported.
+            continue
+
+        if plugin.parent_id and plugin.parent_id not in records:
+            # Descendant of a skipped plugin
+            continue
+
+        record = records[plugin.pk] = {
+            "id": plugin.pk,
+            "plugin_type": plugin.plugin_type,
+            "data": data.get(plugin.pk, {}),
+            "children": [],
+        }
+
+        if plugin.parent_id in records:
+            records[plugin.parent_id]["children"].append(record)
+        else:
+            plugins_by_content[content_id][slot].append(record)
+    return plugins_by_content
+
+
+def _get_plugin_data(plugins):
+    """
+    Returns the field values of the plugin models of «plugins» by the
+    primary keys of the plugins. Each plugin model is queried once per
+    chunk of EXPORT_BATCH_SIZE plugins.
+    """
+    ids_by_model = defaultdict(list)
+
+    for plugin in plugins:
+        if plugin.plugin_type in plugin_pool.plugins:
+            plugin_model = plugin_pool.get_plugin(plugin.plugin_type).model
+
+            if plugin_model is not CMSPlugin:
+                ids_by_model[plugin_model].append(plugin.pk)
+
+    data = {}
+
+    for plugin_model, plugin_ids in ids_by_model.items():
+        fields = [
+            field for field in plugin_model._meta.local_concrete_fields
+            if not (field.remote_field and field.remote_field.parent_link)
+        ]
+
+        for offset in range(0, len(plugin_ids), EXPORT_BATCH_SIZE):
+            chunk = plugin_ids[offset:offset + EXPORT_BATCH_SIZE]
+
+            for instance in plugin_model.objects.filter(pk__in=chunk):
+                data[instance.pk] = {field.name: _get_field_value(instance, field) for field in fields}
+    return data
+
+
+def _get_field_value(instance, field):
+    # Same as django.core.serializers.python.Serializer
+    value = field.value_from_object(instance)
+
+    if is_protected_type(value):
+        return value
+    return field.value_to_string(instance)
@@ -0,0 +1,574 @@
+"""
+Bulk import of pages.
+
+:func:`cms.api.import_pages` creates pages along with their urls, contents,
+placeholders and plugins from an iterable of page records. Records are
+dictionaries, e.g., read by :func:`read_page_records` from a JSON array or
+from newline delimited JSON with one record per line::
+
+    {
+        "key": 12,
+        "parent": 3,
+        "reverse_id": null,
+        "login_required": false,
+        "navigation_extenders": null,
+        "application_urls": null,
+        "application_namespace": null,
+        "is_home": false,
+        "translations": [
+            {
+                "language": "en",
+                "title": "About us",
+                "slug": "about-us",
+                "overwrite_url": null,
+                "menu_title": null,
+                "page_title": null,
+                "meta_description": null,
+                "redirect": null,
+                "template": "INHERIT",
+                "in_navigation": true,
+                "soft_root": false,
+                "limit_visibility_in_menu": null,
+                "xframe_options": 0,
+                "placeholders": {
+                    "content": [
+                        {"id": 45, "plugin_type": "TextPlugin", "data": {"body": "..."}, "children": []}
+                    ]
+                }
+            }
+        ],
+        "children": []
+    }
+
+All keys but the ``language`` and ``title`` of translations are optional.
+``key`` identifies a page within the import and ``parent`` refers to the
+key of a page imported before. Pages without a parent are added as root
+pages, or as children of the ``parent`` passed to
+:func:`~cms.api.import_pages`. Child pages can also be nested in
+``children``. The slug defaults to the slugified title. ``is_home`` is only
+honoured if the site has no home page yet.
+
+Plugin ``data`` holds the values of the fields of the plugin model. If
+plugins carry the ``id`` they had when exported, ``post_copy`` of the
+plugin models is called, so that plugins referring to other plugins (e.g.,
+text plugins with child plugins) can update the references. Relations of
+plugins (see ``copy_relations``) are not imported.
+
+Records are imported in batches, each in one transaction. Treebeard paths
+are allocated in memory and the rows of each batch are inserted with a
+few bulk inserts. No model signals are sent for pages, urls, contents or
+placeholders, caches are invalidated once at the end.
+"""
+import json
+from collections import Counter, defaultdict
+from itertools import chain
+
+from django.contrib.auth import get_user_model
+from django.contrib.contenttypes.models import ContentType
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db import connections, router, transaction
+from django.db.models import F
+from django.template.defaultfilters import slugify
+
+from cms import constants
+from cms.models import CMSPlugin, Page, PageContent, PageUrl, Placeholder
+from cms.plugin_pool import plugin_pool
+from cms.utils import get_current_site
+from cms.utils.conf import get_cms_setting
+from cms.utils.i18n import get_language_list
+from cms.utils.page import get_clean_username
+from cms.utils.placeholder import get_placeholders
+from cms.utils.plugins import _insert_plugins
+
+# Number of pages imported in one transaction
+IMPORT_BATCH_SIZE = 500
+
+PAGE_FIELDS = (
+    "reverse_id",
+    "login_required",
+    "navigation_extenders",
+    "application_urls",
+    "application_namespace",
+)
+
+PAGE_CONTENT_DEFAULTS = {
+    "menu_title": None,
+    "page_title": None,
+    "meta_description": None,
+    "redirect": None,
+    "template": constants.TEMPLATE_INHERITANCE_MAGIC,
+    "in_navigation": False,
+    "soft_root": False,
+    "limit_visibility_in_menu": constants.VISIBILITY_ALL,
+    "xframe_options": constants.X_FRAME_OPTIONS_INHERIT,
+}
+
+
+def read_page_records(stream):
+    """
+    Yields the page records of a JSON array or of newline delimited JSON
+    read from the (text) «stream».
+    """
+    lines = iter(stream)
+
+    for line in lines:
+        if not line.strip():
+            continue
+
+        if line.lstrip().startswith("["):
+            records = json.loads(line + "".join(lines))
+        else:
+            records = chain([json.loads(line)], (json.loads(line) for line in lines if line.strip()))
+
+        yield from records
+
+
+def _flatten_page_record(record, parent=None):
+    record = dict(record)
+    children = record.pop("children", None) or ()
+
+    if parent is not None:
+        record["parent"] = parent["key"]
+
+    if children and record.get("key") is None:
+        # Only used to refer to the parent
+        record["key"] = object()
+    yield record
+
+    for child in children:
+        yield from _flatten_page_record(child, parent=record)
+
+
+class _ImportedPage:
+    """
+    What is needed to add children to a page: its position in the tree and
+    its url paths and templates by language.
+    """
+    __slots__ = ("pk", "path", "depth", "numchild", "is_home", "urls", "templates")
+
+    def __init__(self, path, depth, is_home=False, pk=None, urls=None, templates=None):
+        self.pk = pk
+        self.path = path
+        self.depth = depth
+        self.numchild = 0
+        self.is_home = is_home
+        self.urls = urls or {}
+        self.templates = templates or {}
+
+
+class PageImporter:
+    """
+    Imports pages to a «site», see :func:`cms.api.import_pages`. Keeps track of the
+    imported pages, so that later records can refer to them as parents.
+    """
+
+    def __init__(self, site=None, parent=None, created_by="python-api", batch_size=IMPORT_BATCH_SIZE):
+        self.site = site or get_current_site()
+        self.batch_size = batch_size
+        self.languages = get_language_list(self.site.pk)
+        self.templates = {template for template, name in get_cms_setting("TEMPLATES")}
+
+        if isinstance(created_by, get_user_model()):
+            created_by = get_clean_username(created_by)
+        self.created_by = created_by
+
+        if parent is not None:
+            self.parent = _ImportedPage(
+                pk=parent.pk,
+                path=parent.path,
+                depth=parent.depth,
+                is_home=parent.is_home,
+                urls=dict(parent.urls.values_list("language", "path")),
+                templates={language: parent.get_template(language) for language in self.languages},
+            )
+        else:
+            self.parent = None
+
+        self.pages = {}
+        self.count = 0
+        # Last allocated path of a child by the path of the parent ("" for root pages)
+        self.last_child_paths = {}
+        # (language, path) of the urls and the reverse ids of imported pages
+        self.url_paths = set()
+        self.reverse_ids = set()
+        self.has_home = Page.objects.filter(site=self.site, is_home=True).exists()
+        self.has_apphooks = False
+        self.content_type = ContentType.objects.get_for_model(PageContent)
+        self._declared_slots = {}
+
+    def import_pages(self, records):
+        batch = []
+
+        try:
+            for record in chain.from_iterable(map(_flatten_page_record, records)):
+                batch.append(record)
+
+                if len(batch) >= self.batch_size:
+                    self.import_batch(batch)
+                    batch = []
+
+            if batch:
+                self.import_batch(batch)
+        finally:
+            # Batches imported before an error are committed
+            if self.count:
+                self.clear_caches()
+        return self.count
+
+    def import_batch(self, records):
+        from cms.utils.search import update_search_index
+
+        with transaction.atomic():
+            pages = self._prepare_pages(records)
+            self._create_pages(pages)
+            page_contents = self._create_page_contents(pages)
+            placeholders = self._create_placeholders(page_contents)
+            self._create_plugins(placeholders)
+        self.count += len(records)
+        update_search_index([page_content for page_content, translation, template in page_contents])
+
+    def clear_caches(self):
+        from cms.cache import invalidate_cms_page_cache
+        from cms.utils.apphook_reload import mark_urlconf_as_changed
+        from menus.menu_pool import menu_pool
+
+        if get_cms_setting("PAGE_CACHE"):
+            invalidate_cms_page_cache()
+
+        if self.has_apphooks:
+            mark_urlconf_as_changed()
+        menu_pool.clear(site_id=self.site.pk)
+
+    def _get_parent(self, record):
+        key = record.get("parent")
+
+        if key is None:
+            return self.parent
+
+        try:
+            return self.pages[key]
+        except (KeyError, TypeError):
+            raise ValidationError(f"The parent {key!r} of page {record.get('key')!r} has not been imported.")
+
+    def _get_next_path(self, parent):
+        parent_path = parent.path if parent else ""
+
+        try:
+            last_path = self.last_child_paths[parent_path]
+        except KeyError:
+            if parent and parent.pk is None:
+                # Pages of this import have no children yet
+                last_path = None
+            else:
+                last_path = (
+                    Page.objects
+                    .filter(path__startswith=parent_path, depth=parent.depth + 1 if parent else 1)
+                    .order_by("-path")
+                    .values_list("path", flat=True)
+                    .first()
+                )
+
+        if last_path is None:
+            path = Page._get_path(parent_path, parent.depth + 1 if parent else 1, 1)
+        else:
+            path = Page(path=last_path)._inc_path()
+        self.last_child_paths[parent_path] = path
+        return path
+
+    def _prepare_pages(self, records):
+        pages = []
+        # Children of pages created in earlier batches (or before the import)
+        new_children = Counter()
+
+        for record in records:
+            parent = self._get_parent(record)
+            is_home = bool(record.get("is_home")) and not self.has_home
+            self.has_home = self.has_home or is_home
+            page = Page(
+                path=self._get_next_path(parent),
+                depth=parent.depth + 1 if parent else 1,
+                numchild=0,
+                site=self.site,
+                is_home=is_home,
+                created_by=self.created_by,
+                changed_by=self.created_by,
+                **{field: record[field] for field in PAGE_FIELDS if record.get(field) is not None},
+            )
+            imported_page = _ImportedPage(path=page.path, depth=page.depth, is_home=is_home)
+            translations = [
+                self._prepare_translation(record, translation, parent, imported_page)
+                for translation in record.get("translations") or ()
+            ]
+
+            if parent and parent.pk is None:
+                parent.numchild += 1
+            elif parent:
+                new_children[parent.pk] += 1
+
+            if page.reverse_id:
+                if page.reverse_id in self.reverse_ids:
+                    raise ValidationError(f'A page with the reverse_id="{page.reverse_id}" already exists.')
+                self.reverse_ids.add(page.reverse_id)
+
+            if page.application_urls:
+                self.has_apphooks = True
+
+            key = record.get("key")
+
+            if key is not None:
+                self.pages[key] = imported_page
+            pages.append((page, imported_page, parent, translations))
+
+        self._validate_pages(pages)
+
+        for numchild in set(new_children.values()):
+            Page.objects.filter(
+                pk__in=[pk for pk, count in new_children.items() if count == numchild],
+            ).update(numchild=F("numchild") + numchild)
+        return pages
+
+    def _prepare_translation(self, record, translation, parent, imported_page):
+        language = translation.get("language")
+
+        if language not in self.languages:
+            raise ValidationError(f"Language {language!r} of page {record.get('key')!r} is not available on the site.")
+
+        if not translation.get("title"):
+            raise ValidationError(f"The {language} translation of page {record.get('key')!r} has no title.")
+
+        values = {}
+
+        for field, default in PAGE_CONTENT_DEFAULTS.items():
+            value = translation.get(field)
+            values[field] = default if value is None else value
+        template = values["template"]
+
+        if template != constants.TEMPLATE_INHERITANCE_MAGIC and template not in self.templates:
+            raise ValidationError(f"Template {template!r} of page {record.get('key')!r} is not available.")
+
+        if template == constants.TEMPLATE_INHERITANCE_MAGIC:
+            template = parent.templates.get(language) if parent else None
+            template = template or get_cms_setting("TEMPLATES")[0][0]
+        imported_page.templates[language] = template
+
+        slug = translation.get("slug") or slugify(translation["title"])
+        overwrite_url = translation.get("overwrite_url")
+
+        if overwrite_url:
+            path = overwrite_url.strip("/")
+        elif imported_page.is_home:
+            path = ""
+        else:
+            base = self._get_parent_url(parent, language)
+            path = f"{base}/{slug}" if base else slug
+        imported_page.urls[language] = path
+
+        if (language, path) in self.url_paths:
+            raise ValidationError(f"The url {path!r} ({language}) of page {record.get('key')!r} is used more than once.")
+        self.url_paths.add((language, path))
+
+        page_url = PageUrl(language=language, slug=slug, path=path, managed=not overwrite_url)
+        page_content = PageContent(
+            language=language,
+            title=translation["title"],
+            created_by=self.created_by,
+            changed_by=self.created_by,
+            **values,
+        )
+        return page_url, page_content, translation, template
+
+    def _get_parent_url(self, parent, language):
+        if not parent:
+            return ""
+
+        if language in parent.urls:
+            return parent.urls[language]
+
+        # Same as Page.get_path(language, fallback=True)
+        for fallback in self.languages:
+            if fallback in parent.urls:
+                return parent.urls[fallback]
+        return ""
+
+    def _validate_pages(self, pages):
+        url_paths = {
+            (page_url.language, page_url.path)
+            for page, imported_page, parent, translations in pages
+            for page_url, page_content, translation, template in translations
+        }
+        conflicts = (
+            PageUrl.objects
+            .get_for_site(self.site, path__in={path for language, path in url_paths})
+            .values_list("language", "path")
+        )
+
+        for language, path in conflicts:
+            if (language, path) in url_paths:
+                raise ValidationError(f"A page with the url {path!r} ({language}) already exists.")
+
+        reverse_ids = [page.reverse_id for page, imported_page, parent, translations in pages if page.reverse_id]
+
+        if reverse_ids:
+            conflict = Page.objects.filter(site=self.site, reverse_id__in=reverse_ids).values_list("reverse_id", flat=True)
+
+            for reverse_id in conflict[:1]:
+                raise ValidationError(f'A page with the reverse_id="{reverse_id}" already exists.')
+
+    def _create_pages(self, pages):
+        pages_by_depth = defaultdict(list)
+
+        for page, imported_page, parent, translations in pages:
+            pages_by_depth[page.depth].append((page, imported_page, parent))
+
+        # Parents are created before their children
+        for depth in sorted(pages_by_depth):
+            level = pages_by_depth[depth]
+
+            for page, imported_page, parent in level:
+                page.parent_id = parent.pk if parent else None
+                page.numchild = imported_page.numchild
+
+            _bulk_create(Page, [page for page, imported_page, parent in level], ("path",))
+
+            for page, imported_page, parent in level:
+                imported_page.pk = page.pk
+
+    def _create_page_contents(self, pages):
+        page_urls = []
+        page_contents = []
+
+        for page, imported_page, parent, translations in pages:
+            for page_url, page_content, translation, template in translations:
+                page_url.page = page
+                page_content.page = page
+                page_urls.append(page_url)
+                page_contents.append((page_content, translation, template))
+
+        PageUrl.objects.using(router.db_for_write(PageUrl)).bulk_create(page_urls, batch_size=self.batch_size)
+        _bulk_create(
+            PageContent,
+            [page_content for page_content, translation, template in page_contents],
+            ("page_id", "language"),
+        )
+        return page_contents
+
+    def _get_declared_slots(self, template):
+        if template not in self._declared_slots:
+            self._declared_slots[template] = [placeholder.slot for placeholder in get_placeholders(template)]
+        return self._declared_slots[template]
+
+    def _create_placeholders(self, page_contents):
+        placeholders = []
+
+        for page_content, translation, template in page_contents:
+            plugins_by_slot = translation.get("placeholders") or {}
+            slots = dict.fromkeys(self._get_declared_slots(template))
+            slots.update(dict.fromkeys(plugins_by_slot))
+
+            for slot in slots:
+                placeholder = Placeholder(slot=slot, content_type=self.content_type, object_id=page_content.pk)
+                placeholders.append((placeholder, page_content.language, plugins_by_slot.get(slot) or ()))
+
+        _bulk_create(
+            Placeholder,
+            [placeholder for placeholder, language, plugins in placeholders],
+            ("object_id", "slot"),
+            content_type=self.content_type,
+        )
+        return placeholders
+
+    def _create_plugins(self, placeholders):
+        plugins = []
+
+        for placeholder, language, plugin_records in placeholders:
+            positions = iter(range(1, 2 ** 15))
+            plugins.extend(self._prepare_plugins(placeholder, language, plugin_records, positions))
+
+        _insert_plugins(plugin for plugin, old_plugin in plugins)
+        # New and "exported" instances, for post_copy
+        plugin_pairs = [(plugin, old_plugin) for plugin, old_plugin in plugins if old_plugin is not None]
+
+        for new_plugin, old_plugin in plugin_pairs:
+            new_plugin.post_copy(old_plugin, plugin_pairs)
+
+    def _prepare_plugins(self, placeholder, language, plugin_records, positions, parent=None):
+        for plugin_record in plugin_records:
+            plugin_type = plugin_record.get("plugin_type")
+
+            try:
+                plugin_model = plugin_pool.get_plugin(plugin_type).model
+            except KeyError:
+                raise ValidationError(f"Plugin type {plugin_type!r} is not registered.")
+
+            values = _get_plugin_values(plugin_model, plugin_record.get("data") or {})
+            plugin = plugin_model(
+                placeholder=placeholder,
+                language=language,
+                position=next(positions),
+                plugin_type=plugin_type,
+                parent=parent,
+                **values,
+            )
+
+            if plugin_record.get("id") is not None and plugin_model is not CMSPlugin:
+                old_plugin = plugin_model(pk=plugin_record["id"], plugin_type=plugin_type, **values)
+                old_plugin._inst = old_plugin
+            else:
+                old_plugin = None
+            yield plugin, old_plugin
+            yield from self._prepare_plugins(
+                placeholder,
+                language,
+                plugin_record.get("children") or (),
+                positions,
+                parent=plugin,
+            )
+
+
+def _get_plugin_values(plugin_model, data):
+    """
+    Returns the field values of a «plugin_model» instance by the attribute
+    names of its fields.
+    """
+    if plugin_model is CMSPlugin:
+        fields = {}
+    else:
+        fields = {
+            field.name: field for field in plugin_model._meta.local_concrete_fields
+            if not (field.remote_field and field.remote_field.parent_link)
+        }
+    values = {}
+
+    for name, value in data.items():
+        field = fields.get(name)
+
+        if field is None:
+            try:
+                field = next(field for field in fields.values() if field.attname == name)
+            except StopIteration:
+                raise FieldDoesNotExist(f"{plugin_model.__name__} has no field named {name!r}")
+        values[field.attname] = None if value is None else field.to_python(value)
+    return values
+
+
+def _bulk_create(model, objs, natural_key, **filters):
+    """
+    Inserts «objs» and sets their primary keys, which are looked up by their
+    «natural_key» (and «filters») where the database doesn't return them.
+    """
+    using = router.db_for_write(model)
+    model.objects.using(using).bulk_create(objs)
+
+    if connections[using].features.can_return_rows_from_bulk_insert or not objs:
+        return
+
+    objs_by_key = {tuple(getattr(obj, field) for field in natural_key): obj for obj in objs}
+    filters[f"{natural_key[0]}__in"] = {key[0] for key in objs_by_key}
+
+    for values in model.objects.using(using).filter(**filters).values_list("pk", *natural_key).iterator():
+        obj = objs_by_key.get(values[1:])
+
+        if obj is not None:
+            obj.pk = values[0]
+            obj._state.adding = False
+
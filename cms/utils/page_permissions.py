@@ -1,8 +1,8 @@
 from functools import wraps
 
-from cms.cache.permissions import get_permission_cache, set_permission_cache
+from cms.cache.permissions import set_permission_cache
 from cms.constants import GRANT_ALL_PERMISSIONS
-from cms.models import Page, PermissionTuple
+from cms.models import Page, PermissionMatcher
 from cms.utils import get_current_site
 from cms.utils.compat.dj import available_attrs
 from cms.utils.conf import get_cms_setting
@@ -10,6 +10,7 @@ from cms.utils.permissions import (
     cached_func,
     get_model_permission_codename,
     get_page_actions_for_user,
+    get_permission_snapshot,
     has_global_permission,
 )
 
@@ -62,17 +63,11 @@ def _get_page_permission_tuples_for_action(user, site, action, check_global=True
         return GRANT_ALL_PERMISSIONS
 
     if use_cache:
-        # read from cache if possible
-        cached = get_permission_cache(user, action)
-        get_page_actions = get_page_actions_for_user
-    else:
-        cached = None
-        get_page_actions = get_page_actions_for_user.without_cache
-
-    if cached is not None:
-        return cached
+        # The snapshot reads (or sets) the cache for all actions at once
+        # and is kept for the rest of the request.
+        return get_permission_snapshot(user, site).get_perm_tuples(action)
 
-    page_actions = get_page_actions(user, site)
+    page_actions = get_page_actions_for_user.without_cache(user, site)
     # Set cache for all actions calculated
     for act, page_paths in page_actions.items():
         set_permission_cache(user, act, list(page_paths))
@@ -265,7 +260,10 @@ def user_can_view_page(user, page, site=None):
     can_see_unrestricted = public_for == 'all' or (public_for == 'staff' and user.is_staff)
 
     # inherited and direct view permissions
-    is_restricted = page.has_view_restrictions(site)
+    if page.site_id == site.pk:
+        is_restricted = get_permission_snapshot(user, site).has_view_restrictions(page)
+    else:
+        is_restricted = page.has_view_restrictions(site)
 
     if not is_restricted and can_see_unrestricted:
         # Page has no restrictions and project is configured
@@ -485,6 +483,15 @@ def has_generic_permission(page, user, action, site=None, check_global=True, use
     func = actions_map[action]
 
     page_perms = func(user, site, check_global=check_global, use_cache=use_cache)
-    return page_perms == GRANT_ALL_PERMISSIONS or any(
-        PermissionTuple(perm).contains(page_path) for perm in page_perms
-    )
+
+    if page_perms == GRANT_ALL_PERMISSIONS:
+        return True
+
+    if use_cache:
+        # page_perms are the permission tuples of the snapshot,
+        # reuse its compiled matcher.
+        perm_action = 'delete_page' if action == 'delete_page_translation' else action
+        matcher = get_permission_snapshot(user, site).get_matcher(perm_action)
+    else:
+        matcher = PermissionMatcher(page_perms)
+    return matcher.contains(page_path)
@@ -10,7 +10,7 @@ from django.db.models import Q
 
 from cms.constants import ROOT_USER_LEVEL, SCRIPT_USERNAME
 from cms.exceptions import NoPermissionsException
-from cms.models import GlobalPagePermission, PagePermission
+from cms.models import GlobalPagePermission, PagePermission, PermissionMatcher
 from cms.utils.compat.dj import available_attrs
 from cms.utils.conf import get_cms_setting
 from cms.utils.page import get_clean_username
@@ -171,6 +171,98 @@ def clear_permission_lru_caches(user):
     clear_func_cache(user, get_global_actions_for_user)
     clear_func_cache(user, get_page_actions_for_user)
 
+    if hasattr(user, '_djangocms_permission_snapshots'):
+        delattr(user, '_djangocms_permission_snapshots')
+
+
+class PermissionSnapshot:
+    """
+    The page permissions of a user on a site.
+
+    The permission tuples of all actions are read from the permission cache
+    with a single ``get_many`` (or computed with one query and written back
+    with a single ``set_many``). The view restrictions of the site are
+    loaded with one query. Afterwards, all checks for any page are answered
+    in memory by compiled permission matchers.
+
+    Use :func:`get_permission_snapshot` to get the snapshot of a user, it is
+    kept on the user object like the other permission lru caches.
+    """
+
+    def __init__(self, user, site):
+        self.user = user
+        self.site = site
+        self._page_actions = None
+        self._view_restrictions = None
+        self._matchers = {}
+
+    @property
+    def page_actions(self):
+        from cms.cache.permissions import (
+            PERMISSION_KEYS,
+            get_permission_cache_many,
+            set_permission_cache_many,
+        )
+
+        if self._page_actions is None:
+            page_actions = get_permission_cache_many(self.user, PERMISSION_KEYS)
+
+            if len(page_actions) < len(PERMISSION_KEYS):
+                computed = get_page_actions_for_user(self.user, self.site)
+                page_actions = {action: list(computed[action]) for action in PERMISSION_KEYS}
+                set_permission_cache_many(self.user, page_actions)
+            self._page_actions = page_actions
+        return self._page_actions
+
+    @property
+    def view_restrictions(self):
+        if self._view_restrictions is None:
+            restrictions = (
+                PagePermission
+                .objects
+                .filter(page__site=self.site, can_view=True)
+                .values_list('grant_on', 'page__path')
+                .distinct()
+            )
+            self._view_restrictions = PermissionMatcher(restrictions)
+        return self._view_restrictions
+
+    def get_perm_tuples(self, action):
+        return self.page_actions.get(action, [])
+
+    def get_matcher(self, action):
+        """
+        Returns the compiled :class:`cms.models.PermissionMatcher` for the
+        permission tuples of «action».
+        """
+        if action not in self._matchers:
+            self._matchers[action] = PermissionMatcher(self.get_perm_tuples(action))
+        return self._matchers[action]
+
+    def has_permission(self, page, action):
+        return self.get_matcher(action).contains(page.path)
+
+    def has_view_restrictions(self, page):
+        """
+        Same as :meth:`cms.models.Page.has_view_restrictions` for pages of
+        the snapshot's site.
+        """
+        if not get_cms_setting('PERMISSION'):
+            return False
+        return self.view_restrictions.contains(page.path)
+
+
+def get_permission_snapshot(user, site):
+    snapshots = getattr(user, '_djangocms_permission_snapshots', None)
+
+    if snapshots is None:
+        snapshots = {}
+        user._djangocms_permission_snapshots = snapshots
+
+    if site.pk not in snapshots:
+        snapshots[site.pk] = PermissionSnapshot(user, site)
+    return snapshots[site.pk]
+
 
 @cached_func
 def get_global_actions_for_user(user, site):
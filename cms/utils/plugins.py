@@ -8,17 +8,23 @@ from itertools import starmap
 from operator import itemgetter
 from typing import Optional
 
+from django.db.models import Case, Max, Value, When
+from django.db.models.signals import post_save, pre_save
 from django.http import HttpRequest
 from django.utils.encoding import force_str
 from django.utils.translation import gettext as _
 
+from cms.cache.placeholder import get_plugin_tree_cache, set_plugin_tree_cache
 from cms.exceptions import PluginLimitReached
-from cms.models.pluginmodel import CMSPlugin
+from cms.models.pluginmodel import CMSPlugin, _get_database_connection
 from cms.plugin_base import CMSPluginBase
 from cms.plugin_pool import plugin_pool
 from cms.utils import get_language_from_request
+from cms.utils.conf import get_cms_setting
 from cms.utils.permissions import has_plugin_permission
 from cms.utils.placeholder import get_placeholder_conf
+from cms.utils.profiling import profile_render
+from cms.utils.search import update_placeholder_search_index
 
 logger = logging.getLogger(__name__)
 
@@ -64,7 +70,8 @@ def get_plugins(request, placeholder, template, lang=None):
     return placeholder._plugins_cache
 
 
-def assign_plugins(request, placeholders, template=None, lang=None):
+@profile_render("assign_plugins")
+def assign_plugins(request, placeholders, template=None, lang=None, site_id=None):
     """
     Fetch all plugins for the given ``placeholders`` and
     cast them down to the concrete instances in one query
@@ -74,6 +81,8 @@ def assign_plugins(request, placeholders, template=None, lang=None):
     :param placeholders: An iterable of placeholder objects.
     :param template: (optional) The template object.
     :param lang: (optional) The language code.
+    :param site_id: (optional) If given, the plugin trees are read from and
+        written to the plugin tree cache of this site.
 
     This method assigns plugins to the given placeholders. It retrieves the plugins from the database based on the
     placeholders and the language. The plugins are then downcasted to their specific plugin types.
@@ -91,19 +100,47 @@ def assign_plugins(request, placeholders, template=None, lang=None):
         return
     placeholders = tuple(placeholders)  # Trigger db hit
     lang = lang or get_language_from_request(request)
-    plugins = list(CMSPlugin.objects.filter(placeholder__in=placeholders, language=lang))
-    if not plugins:
+    # split the plugins up by placeholder
+    plugins_by_placeholder = defaultdict(list)
+    placeholders_to_fetch = placeholders
+
+    if site_id is not None:
+        placeholders_by_id = {placeholder.pk: placeholder for placeholder in placeholders}
+
+        for placeholder_id, tree in get_plugin_tree_cache(placeholders, lang, site_id).items():
+            cached_plugins = _get_plugins_from_snapshot(tree, placeholders_by_id[placeholder_id], request)
+
+            if cached_plugins is not None:
+                plugins_by_placeholder[placeholder_id] = cached_plugins
+        placeholders_to_fetch = [
+            placeholder for placeholder in placeholders if placeholder.pk not in plugins_by_placeholder
+        ]
+
+    if placeholders_to_fetch:
+        plugins = list(CMSPlugin.objects.filter(placeholder__in=placeholders_to_fetch, language=lang))
+    else:
+        plugins = []
+
+    if not plugins and not any(plugins_by_placeholder.values()):
         # Create default plugins if enabled
         plugins = create_default_plugins(request, placeholders, template, lang)
+        site_id = None
     else:
-        plugins = downcast_plugins(plugins, placeholders, request=request)
-
-    # split the plugins up by placeholder
-    plugins_by_placeholder = defaultdict(list)
+        plugins = downcast_plugins(plugins, placeholders_to_fetch, request=request)
 
     for plugin in plugins:
         plugins_by_placeholder[plugin.placeholder_id].append(plugin)
 
+    if site_id is not None and placeholders_to_fetch:
+        set_plugin_tree_cache(
+            [
+                (placeholder, _get_plugin_tree_snapshot(plugins_by_placeholder[placeholder.pk]))
+                for placeholder in placeholders_to_fetch
+            ],
+            lang,
+            site_id,
+        )
+
     for placeholder in placeholders:
         all_plugins = plugins_by_placeholder[placeholder.pk]
 
@@ -117,6 +154,50 @@ def assign_plugins(request, placeholders, template=None, lang=None):
         placeholder._plugins_cache = layered_plugins
 
 
+def _get_plugin_tree_snapshot(plugins):
+    """
+    Returns the given downcasted plugins of a placeholder in a compact,
+    cacheable form: a tuple of (plugin type, field values) pairs.
+    """
+    return tuple(
+        (plugin.plugin_type, tuple(getattr(plugin, field.attname) for field in plugin._meta.concrete_fields))
+        for plugin in plugins
+    )
+
+
+def _get_plugins_from_snapshot(tree, placeholder, request):
+    """
+    Returns the plugins stored by _get_plugin_tree_snapshot() or None if a plugin
+    is not available anymore or its fields have changed.
+    """
+    plugins = []
+    plugin_lookup = {}
+
+    for plugin_type, values in tree:
+        try:
+            plugin_model = get_plugin_model(plugin_type)
+        except KeyError:
+            return None
+
+        field_names = [field.attname for field in plugin_model._meta.concrete_fields]
+
+        if len(field_names) != len(values):
+            return None
+
+        instance = plugin_model.from_db(CMSPlugin.objects.db, field_names, values)
+        instance.placeholder = placeholder
+        plugins.append(instance)
+        plugin_lookup[instance.pk] = instance
+
+    for instance in plugins:
+        if instance.parent_id in plugin_lookup:
+            instance._state.fields_cache["parent"] = plugin_lookup[instance.parent_id]
+        cls = get_plugin_class(instance.plugin_type)
+        if not cls.cache and not cls().get_cache_expiration(request, instance, placeholder):
+            placeholder.cache_placeholder = False
+    return plugins
+
+
 def create_default_plugins(request, placeholders, template, lang):
     """
     Create all default plugins for the given ``placeholders`` if they have
@@ -243,6 +324,124 @@ def _reunite_orphaned_placeholder_plugin_children(root_plugin, orphaned_plugin_l
             new_plugin.save()
 
 
+def _can_bulk_insert_plugin(plugin_model):
+    """
+    Plugins can be inserted in bulk if saving them does nothing
+    but writing their fields to the database.
+    """
+    concrete_model = plugin_model._meta.concrete_model
+    return (
+        _get_database_connection("write").features.can_return_rows_from_bulk_insert
+        # Direct subclasses of CMSPlugin only, with one table each
+        and (concrete_model is CMSPlugin or concrete_model._meta.get_parent_list() == [CMSPlugin])
+        and plugin_model.save is CMSPlugin.save
+        and plugin_model.save_base is CMSPlugin.save_base
+        and not any(
+            signal.has_listeners(model)
+            for signal in (pre_save, post_save)
+            for model in {plugin_model, concrete_model, CMSPlugin}
+        )
+    )
+
+
+def _bulk_insert_plugins(plugins):
+    """
+    Inserts the given unsaved plugins with one INSERT for the CMSPlugin
+    rows and one per concrete plugin model. Parents which are part of
+    «plugins» are set with a single UPDATE afterwards.
+    """
+    using = _get_database_connection("write").alias
+    parents = [plugin.parent for plugin in plugins]
+    base_plugins = []
+    plugins_by_model = defaultdict(list)
+
+    for plugin, parent in zip(plugins, parents):
+        concrete_model = plugin._meta.concrete_model
+
+        if concrete_model is CMSPlugin:
+            base_plugin = plugin
+        else:
+            base_plugin = CMSPlugin(
+                placeholder_id=plugin.placeholder_id,
+                language=plugin.language,
+                position=plugin.position,
+                plugin_type=plugin.plugin_type,
+                creation_date=plugin.creation_date,
+            )
+            plugins_by_model[concrete_model].append(plugin)
+
+        # Parents in this batch do not have a primary key yet
+        if parent and parent.pk:
+            base_plugin.parent = parent
+            base_plugin.path = f"{parent.path}{parent.pk}/"
+        else:
+            base_plugin.parent = None
+            base_plugin.path = ""
+        base_plugins.append(base_plugin)
+
+    CMSPlugin.objects.using(using).bulk_create(base_plugins)
+
+    for plugin, base_plugin, parent in zip(plugins, base_plugins, parents):
+        plugin.pk = plugin.id = base_plugin.pk
+        plugin.changed_date = base_plugin.changed_date
+        # Parents come before their children
+        plugin.path = f"{parent.path}{parent.pk}/" if parent else ""
+
+    for plugin_model, model_plugins in plugins_by_model.items():
+        for plugin in model_plugins:
+            setattr(plugin, plugin_model._meta.pk.attname, plugin.id)
+        plugin_model._base_manager._insert(
+            model_plugins,
+            fields=plugin_model._meta.local_concrete_fields,
+            using=using,
+        )
+
+    children = []
+
+    for plugin, parent in zip(plugins, parents):
+        plugin._state.adding = False
+        plugin._state.db = using
+
+        if parent and plugin.parent_id != parent.pk:
+            plugin.parent = parent
+            children.append(plugin)
+
+    if children:
+        CMSPlugin.objects.using(using).filter(pk__in=[plugin.pk for plugin in children]).update(
+            parent=Case(*(When(pk=plugin.pk, then=Value(plugin.parent_id)) for plugin in children)),
+            path=Case(*(When(pk=plugin.pk, then=Value(plugin.path)) for plugin in children)),
+        )
+
+
+def _insert_plugins(plugins):
+    """
+    Saves the given new plugins, parents before their children. Plugins
+    whose model allows it are collected and inserted in bulk, see
+    ``_can_bulk_insert_plugin``.
+    """
+    bulk_insert_by_model = {}
+    # Plugins waiting to be inserted in bulk
+    pending_plugins = []
+
+    for plugin in plugins:
+        plugin_model = plugin.__class__
+
+        if plugin_model not in bulk_insert_by_model:
+            bulk_insert_by_model[plugin_model] = _can_bulk_insert_plugin(plugin_model)
+
+        if bulk_insert_by_model[plugin_model]:
+            pending_plugins.append(plugin)
+        else:
+            if pending_plugins and plugin.parent and plugin.parent.pk is None:
+                # The parent has to exist before the plugin can be saved
+                _bulk_insert_plugins(pending_plugins)
+                pending_plugins = []
+            plugin.save()
+
+    if pending_plugins:
+        _bulk_insert_plugins(pending_plugins)
+
+
 def copy_plugins_to_placeholder(plugins, placeholder, language=None, root_plugin=None, start_positions=None):
     """Copies an iterable of plugins to a placeholder
 
@@ -264,6 +463,7 @@ def copy_plugins_to_placeholder(plugins, placeholder, language=None, root_plugin
        into a concrete one
     #. find the position in the new placeholder
     #. save the concrete plugin (which creates a new plugin in the database)
+       or, if the plugin model allows it, collect it to be inserted in bulk
     #. trigger the copy relations
     #. return the plugin ids
     """
@@ -279,6 +479,17 @@ def copy_plugins_to_placeholder(plugins, placeholder, language=None, root_plugin
     if root_plugin:
         language = root_plugin.language
 
+    # Plugins waiting to be inserted in bulk, along with their source
+    pending_plugins = []
+
+    def insert_pending_plugins():
+        _bulk_insert_plugins([new_plugin for new_plugin, source_plugin in pending_plugins])
+
+        for new_plugin, source_plugin in pending_plugins:
+            if new_plugin._meta.concrete_model is not CMSPlugin:
+                new_plugin.copy_relations(source_plugin)
+        pending_plugins.clear()
+
     for source_plugin in get_bound_plugins(plugins):
         parent = plugins_by_id.get(source_plugin.parent_id, root_plugin)
         plugin_model = source_plugin.__class__  # get_plugin_model(source_plugin.plugin_type)
@@ -298,9 +509,18 @@ def copy_plugins_to_placeholder(plugins, placeholder, language=None, root_plugin
                 placeholder=placeholder,
             )
 
+        bulk_insert = _can_bulk_insert_plugin(plugin_model)
+
+        if pending_plugins and parent and parent.pk is None and not bulk_insert:
+            # The parent has to exist before the plugin can be saved
+            insert_pending_plugins()
+
         try:
             position = positions_by_language[new_plugin.language]
         except KeyError:
+            if pending_plugins:
+                insert_pending_plugins()
+
             offset = placeholder.get_last_plugin_position(language) or 0
             # The position is relative to language.
             position = placeholder.get_next_plugin_position(
@@ -317,11 +537,17 @@ def copy_plugins_to_placeholder(plugins, placeholder, language=None, root_plugin
             )
 
         new_plugin.position = position
-        new_plugin.save()
         positions_by_language[new_plugin.language] = position + 1
 
+        if bulk_insert:
+            pending_plugins.append((new_plugin, source_plugin))
+        else:
+            new_plugin.save()
+
+            if plugin_model != CMSPlugin:
+                new_plugin.copy_relations(source_plugin)
+
         if plugin_model != CMSPlugin:
-            new_plugin.copy_relations(source_plugin)
             plugin_pairs.append((new_plugin, source_plugin))
         plugins_by_id[source_plugin.pk] = new_plugin
 
@@ -329,6 +555,9 @@ def copy_plugins_to_placeholder(plugins, placeholder, language=None, root_plugin
         if not parent and source_plugin.parent_id:
             orphaned_plugin_list.append((source_plugin.parent_id, new_plugin))
 
+    if pending_plugins:
+        insert_pending_plugins()
+
     # Reunite any orphaned plugins with the parent
     if orphaned_plugin_list:
         _reunite_orphaned_placeholder_plugin_children(root_plugin, orphaned_plugin_list, plugins_by_id)
@@ -345,6 +574,175 @@ def copy_plugins_to_placeholder(plugins, placeholder, language=None, root_plugin
     return list(plugins_by_id.values())
 
 
+def copy_plugins_to_placeholders(placeholder_pairs, source_language, target_language, only_empty=False):
+    """Copies the plugins of many placeholders to another language at once
+
+    :param iterable placeholder_pairs: ``(source placeholder, target placeholder)`` tuples,
+        source and target may be the same placeholder
+    :param str source_language: language of the plugins to be copied
+    :param str target_language: language of the new plugins
+    :param bool only_empty: if True, target placeholders which already have plugins in
+        «target_language» are skipped
+    :return int: number of copied plugins
+
+    The copied plugins are added after the plugins in «target_language» of
+    each target placeholder. Unlike :func:`copy_plugins_to_placeholder`, the
+    plugins of all placeholders are loaded with one query (and one per plugin
+    model), inserted in bulk where their model allows it and the positions of
+    all target placeholders are looked up with a single query.
+    """
+    targets = {source.pk: target for source, target in placeholder_pairs}
+    target_ids = {target.pk for target in targets.values()}
+    last_positions = dict(
+        CMSPlugin.objects
+        .filter(placeholder__in=target_ids, language=target_language)
+        .values("placeholder")
+        .annotate(last_position=Max("position"))
+        .values_list("placeholder", "last_position")
+    )
+
+    if only_empty:
+        targets = {pk: target for pk, target in targets.items() if target.pk not in last_positions}
+
+    plugins = list(
+        CMSPlugin.objects
+        .filter(placeholder__in=targets, language=source_language)
+        .order_by("placeholder", "position")
+    )
+    source_plugins = list(get_bound_plugins(plugins))
+    positions = {}
+
+    for source_plugin in source_plugins:
+        target_id = targets[source_plugin.placeholder_id].pk
+        last_positions[target_id] = positions[source_plugin.pk] = last_positions.get(target_id, 0) + 1
+
+    # Parents have to be created before their children
+    source_plugins.sort(key=lambda plugin: plugin.path.count("/"))
+    plugins_by_id = {}
+    plugin_pairs = defaultdict(list)
+
+    for source_plugin in source_plugins:
+        placeholder = targets[source_plugin.placeholder_id]
+        parent = plugins_by_id.get(source_plugin.parent_id)
+        plugin_model = source_plugin.__class__
+
+        if plugin_model is not CMSPlugin:
+            new_plugin = deepcopy(source_plugin)
+            new_plugin.pk = None
+            new_plugin.id = None
+            new_plugin.language = target_language
+            new_plugin.placeholder = placeholder
+            new_plugin.parent = parent
+            plugin_pairs[placeholder.pk].append((new_plugin, source_plugin))
+        else:
+            new_plugin = CMSPlugin(
+                language=target_language,
+                parent=parent,
+                plugin_type=source_plugin.plugin_type,
+                placeholder=placeholder,
+            )
+        new_plugin.position = positions[source_plugin.pk]
+        plugins_by_id[source_plugin.pk] = new_plugin
+
+    _insert_plugins(plugins_by_id.values())
+
+    for pairs in plugin_pairs.values():
+        for new_plugin, source_plugin in pairs:
+            new_plugin.copy_relations(source_plugin)
+
+    # Backwards compatibility, see copy_plugins_to_placeholder
+    for pairs in plugin_pairs.values():
+        for new_plugin, source_plugin in pairs:
+            new_plugin.post_copy(source_plugin, pairs)
+
+    update_placeholder_search_index({plugin.placeholder for plugin in plugins_by_id.values()})
+    return len(plugins_by_id)
+
+
+def _get_downcast_instances(plugin_types_map, plugins, select_placeholder=False):
+    """
+    Yields the concrete instances of the plugins in «plugin_types_map»,
+    a mapping of concrete plugin models to plugin ids. Instances are cast
+    to the plugin's model, including proxies.
+    """
+    if get_cms_setting("PLUGIN_DOWNCAST_UNION") and not select_placeholder:
+        # Plugin models with more than one parent table are fetched separately
+        union_types_map = {
+            plugin_model: pks for plugin_model, pks in plugin_types_map.items()
+            if plugin_model._meta.get_parent_list() == [CMSPlugin]
+        }
+        yield from _get_downcast_instances_from_union(union_types_map, plugins)
+        plugin_types_map = {
+            plugin_model: pks for plugin_model, pks in plugin_types_map.items()
+            if plugin_model not in union_types_map
+        }
+
+    for plugin_model, pks in plugin_types_map.items():
+        # get all the plugins of type cls.model
+        plugin_qs = plugin_model.objects.filter(pk__in=pks)
+
+        if select_placeholder:
+            plugin_qs = plugin_qs.select_related("placeholder")
+
+        for instance in plugin_qs.iterator():
+            instance.__class__ = get_plugin_model(instance.plugin_type)
+            yield instance
+
+
+def _get_plugin_table_signature(plugin_model):
+    """
+    Returns the field classes of the plugin model's own table. Selects from
+    tables with the same signature can be combined with UNION.
+    """
+    return tuple(
+        type(field.target_field if field.is_relation else field)
+        for field in plugin_model._meta.local_concrete_fields
+    )
+
+
+def _get_downcast_instances_from_union(plugin_types_map, plugins):
+    """
+    Same as _get_downcast_instances() but fetches the plugin tables with the
+    same signature in a single query. Only the plugin tables are queried,
+    the fields inherited from CMSPlugin are taken from «plugins».
+    """
+    base_plugins = {plugin.pk: plugin for plugin in plugins}
+    models_by_signature = defaultdict(list)
+
+    for plugin_model in plugin_types_map:
+        field_names = [field.attname for field in plugin_model._meta.local_concrete_fields]
+        # The column of the pointer to the CMSPlugin row has to line up as well
+        pk_index = field_names.index(plugin_model._meta.pk.attname)
+        models_by_signature[(_get_plugin_table_signature(plugin_model), pk_index)].append(plugin_model)
+
+    for (signature, pk_index), plugin_models in models_by_signature.items():
+        querysets = [
+            plugin_model.objects
+            .filter(pk__in=plugin_types_map[plugin_model])
+            .order_by()
+            .values_list(*(field.attname for field in plugin_model._meta.local_concrete_fields))
+            for plugin_model in plugin_models
+        ]
+
+        if len(querysets) > 1:
+            rows = querysets[0].union(*querysets[1:], all=True)
+        else:
+            rows = querysets[0]
+
+        for row in rows:
+            base_plugin = base_plugins[row[pk_index]]
+            plugin_model = get_plugin_model(base_plugin.plugin_type)
+            local_fields = plugin_model._meta.local_concrete_fields
+            values = {field.attname: getattr(base_plugin, field.attname) for field in CMSPlugin._meta.concrete_fields}
+            values.update((field.attname, value) for field, value in zip(local_fields, row))
+            field_names = [field.attname for field in plugin_model._meta.concrete_fields]
+            yield plugin_model.from_db(
+                base_plugin._state.db,
+                field_names,
+                [values[name] for name in field_names],
+            )
+
+
 def get_bound_plugins(plugins):
     """
     Get the bound plugins by downcasting the plugins to their respective classes. Raises a KeyError if the plugin type
@@ -380,14 +778,10 @@ def get_bound_plugins(plugins):
         else:
             plugin_types_map[base_model].append(plugin.pk)
 
-    for base_model, pks in plugin_types_map.items():
-        plugin_queryset = base_model.objects.filter(pk__in=pks)
-        # put them in a map, so we can replace the base CMSPlugins with their
-        # downcasted versions
-        for instance in plugin_queryset.iterator():
-            model = get_plugin_model(instance.plugin_type)  # Get original class
-            instance.__class__ = model  # Cast to correct model (including proxies)
-            plugin_lookup[instance.pk] = instance
+    # put them in a map, so we can replace the base CMSPlugins with their
+    # downcasted versions
+    for instance in _get_downcast_instances(plugin_types_map, plugins):
+        plugin_lookup[instance.pk] = instance
 
     for plugin in plugins:
         parent_not_available = not plugin.parent_id or plugin.parent_id not in plugin_ids
@@ -399,6 +793,7 @@ def get_bound_plugins(plugins):
             yield plugin_lookup[plugin.pk]
 
 
+@profile_render("downcast_plugins")
 def downcast_plugins(
     plugins: Iterable[CMSPlugin],
     placeholders: Optional[list] = None,
@@ -442,19 +837,10 @@ def downcast_plugins(
     placeholders = placeholders or []
     placeholders_by_id = {placeholder.pk: placeholder for placeholder in placeholders}
 
-    for plugin_model, pks in plugin_types_map.items():
-        # get all the plugins of type cls.model
-        plugin_qs = plugin_model.objects.filter(pk__in=pks)
-
-        if select_placeholder:
-            plugin_qs = plugin_qs.select_related("placeholder")
-
-        # put them in a map, so we can replace the base CMSPlugins with their
-        # downcasted versions
-        for instance in plugin_qs.iterator():
-            cls = get_plugin_class(instance.plugin_type)  # Plugin class
-            instance.__class__ = cls.model  # Cast to original model (including proxies)
-            plugin_lookup[instance.pk] = instance
+    # put them in a map, so we can replace the base CMSPlugins with their
+    # downcasted versions
+    for instance in _get_downcast_instances(plugin_types_map, plugins, select_placeholder):
+        plugin_lookup[instance.pk] = instance
 
     for plugin in plugins:
         parent_not_available = not plugin.parent_id or plugin.parent_id not in plugin_ids
@@ -0,0 +1,250 @@
+"""
+Instrumentation of the rendering path.
+
+If ``CMS_RENDER_PROFILER`` is set to the dotted path of a
+:class:`RenderProfiler` (sub-)class, an instance of it is created for each
+request. It collects wall time, number of database queries and, where
+applicable, the cache result of each profiled step (see
+:func:`profile_render`). Once the response is ready, the toolbar middleware
+passes it to :meth:`RenderProfiler.process_response`.
+
+If the setting is not set, the profiled functions are called directly after
+a single settings lookup.
+"""
+import inspect
+import logging
+import threading
+from contextlib import ExitStack, contextmanager
+from functools import wraps
+from time import perf_counter
+
+from django.db import connections
+from django.utils.module_loading import import_string
+
+from cms.utils.conf import get_cms_setting
+
+logger = logging.getLogger('cms.profiling')
+
+_NO_PROFILER = object()
+
+
+class RenderTiming:
+    """
+    A single measurement taken by a :class:`RenderProfiler`.
+    """
+    __slots__ = ('name', 'tags', 'duration', 'queries', 'cache')
+
+    def __init__(self, name, tags):
+        self.name = name
+        self.tags = tags
+        #: Wall time in milliseconds
+        self.duration = 0.0
+        self.queries = 0
+        #: "hit", "miss" or None if no cache is involved
+        self.cache = None
+
+    def __repr__(self):
+        return f'<RenderTiming {self.name} {self.tags} {self.duration:.2f}ms>'
+
+
+class RenderProfiler:
+    """
+    Collects the timings of the profiled steps of a request.
+
+    Subclasses usually override :meth:`record` and/or
+    :meth:`process_response` to emit the timings somewhere.
+    """
+
+    def __init__(self, request):
+        self.request = request
+        self.timings = []
+        # Placeholders might be rendered by worker threads
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    @property
+    def _stack(self):
+        try:
+            return self._local.stack
+        except AttributeError:
+            self._local.stack = []
+            return self._local.stack
+
+    @contextmanager
+    def measure(self, name, **tags):
+        timing = RenderTiming(name, tags)
+
+        def count_query(execute, sql, params, many, context):
+            timing.queries += 1
+            return execute(sql, params, many, context)
+
+        self._stack.append(timing)
+        start = perf_counter()
+        try:
+            with _count_queries(count_query):
+                yield timing
+        finally:
+            timing.duration = (perf_counter() - start) * 1000
+            self._stack.pop()
+            with self._lock:
+                self.record(timing)
+
+    def annotate(self, cache=None, **tags):
+        """
+        Adds information to the innermost running measurement.
+        """
+        if not self._stack:
+            return
+
+        timing = self._stack[-1]
+
+        if cache is not None:
+            timing.cache = 'hit' if cache else 'miss'
+        timing.tags.update(tags)
+
+    def record(self, timing):
+        self.timings.append(timing)
+
+    def process_response(self, response):
+        return response
+
+
+@contextmanager
+def _count_queries(wrapper):
+    # Queries are counted on all databases
+    with ExitStack() as stack:
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(wrapper))
+        yield
+
+
+class ServerTimingRenderProfiler(RenderProfiler):
+    """
+    Adds a ``Server-Timing`` header with the total time spent in each
+    profiled step to the response.
+    """
+
+    def process_response(self, response):
+        totals = {}
+
+        for timing in self.timings:
+            duration, count = totals.get(timing.name, (0.0, 0))
+            totals[timing.name] = (duration + timing.duration, count + 1)
+
+        metrics = [
+            f'cms-{name.strip("_").replace("_", "-")};dur={duration:.2f};desc="{count}x"'
+            for name, (duration, count) in totals.items()
+        ]
+
+        if metrics:
+            if response.has_header('Server-Timing'):
+                metrics.insert(0, response['Server-Timing'])
+            response['Server-Timing'] = ', '.join(metrics)
+        return response
+
+
+class LoggingRenderProfiler(RenderProfiler):
+    """
+    Logs each timing to the ``cms.profiling`` logger in the statsd line
+    format, e.g. ``cms.render_plugin.TextPlugin:1.52|ms``. The timing itself
+    is available to log handlers as the ``timing`` attribute of the record.
+    """
+
+    def record(self, timing):
+        super().record(timing)
+        metric = '.'.join(
+            ['cms', timing.name.strip('_')] + [str(value) for key, value in sorted(timing.tags.items())
+                                                if key != 'template']
+        )
+        logger.info(
+            '%s:%.2f|ms', metric, timing.duration,
+            extra={'timing': timing, 'path': self.request.path},
+        )
+
+
+def get_render_profiler(request):
+    """
+    Returns the profiler of the given «request» or None if profiling
+    is disabled.
+    """
+    profiler = getattr(request, '_cms_render_profiler', _NO_PROFILER)
+
+    if profiler is not _NO_PROFILER:
+        return profiler
+
+    profiler_class = get_cms_setting('RENDER_PROFILER')
+
+    if profiler_class and request is not None:
+        if isinstance(profiler_class, str):
+            profiler_class = import_string(profiler_class)
+        profiler = profiler_class(request)
+    else:
+        profiler = None
+
+    if request is not None:
+        request._cms_render_profiler = profiler
+    return profiler
+
+
+def annotate_render_timing(request, cache=None, **tags):
+    """
+    Adds information (e.g., whether the cache was hit) to the currently
+    running measurement of the given «request», if any.
+    """
+    profiler = getattr(request, '_cms_render_profiler', None)
+
+    if profiler is not None:
+        profiler.annotate(cache=cache, **tags)
+
+
+def profile_render(name, get_tags=None):
+    """
+    Decorator to measure each call of the decorated function or method.
+
+    The request is taken from the ``request`` argument or, for methods,
+    from ``self.request``. «get_tags» is called with the function's
+    arguments and returns a dictionary of tags for the measurement.
+
+    Generator functions are measured until they are exhausted.
+    """
+    def decorator(func):
+        signature = inspect.signature(func)
+        has_request_argument = 'request' in signature.parameters
+
+        def get_profiler(args, kwargs):
+            if not get_cms_setting('RENDER_PROFILER'):
+                return None
+
+            if has_request_argument:
+                request = signature.bind(*args, **kwargs).arguments.get('request')
+            else:
+                request = getattr(args[0], 'request', None)
+            return get_render_profiler(request)
+
+        if inspect.isgeneratorfunction(func):
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                profiler = get_profiler(args, kwargs)
+
+                if profiler is None:
+                    yield from func(*args, **kwargs)
+                    return
+
+                tags = get_tags(*args, **kwargs) if get_tags else {}
+
+                with profiler.measure(name, **tags):
+                    yield from func(*args, **kwargs)
+        else:
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                profiler = get_profiler(args, kwargs)
+
+                if profiler is None:
+                    return func(*args, **kwargs)
+
+                tags = get_tags(*args, **kwargs) if get_tags else {}
+
+                with profiler.measure(name, **tags):
+                    return func(*args, **kwargs)
+        return wrapper
+    return decorator
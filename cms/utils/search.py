@@ -0,0 +1,442 @@
+"""
+Search index of pages.
+
+If ``CMS_SEARCH_INDEX`` is enabled, :meth:`cms.models.managers.PageManager.search`
+queries one :class:`cms.models.PageSearchDocument` per page and language
+instead of joining the page contents with every searchable plugin table.
+
+The documents contain the titles and meta description of a page content and
+the ``search_fields`` of its plugins. They are updated when page contents are
+saved or deleted, when pages or plugins are copied and after placeholder
+operations in the admin. Changes made
+by other means (e.g., with :func:`cms.api.add_plugin`) are picked up by
+:func:`update_search_index` or the ``cms rebuild-search-index`` command.
+
+Matching and ranking are done by a :class:`SearchBackend`. Setting
+``CMS_SEARCH_INDEX`` to ``True`` selects the backend for the database in use,
+it can also be set to the dotted path of a backend class.
+"""
+from functools import cache
+
+from django.contrib.contenttypes.models import ContentType
+from django.db import connections, router
+from django.db.models import Case, Expression, FloatField, OuterRef, Q, Subquery, Value, When
+from django.db.models.expressions import RawSQL
+from django.utils.html import strip_tags
+from django.utils.module_loading import import_string
+
+from cms.utils.conf import get_cms_setting
+
+# Number of page contents indexed at once
+INDEX_BATCH_SIZE = 500
+
+
+class SearchBackend:
+    """
+    Portable backend, matches the whole query case-insensitively in the
+    documents. Matches in the title rank higher than matches in the text.
+    """
+
+    def __init__(self, using):
+        self.using = using
+
+    @classmethod
+    def is_available(cls, connection):
+        """
+        Returns False if the backend can't be used with «connection», the
+        portable backend is used instead.
+        """
+        return True
+
+    def update(self, documents):
+        """
+        Called after «documents» have been created or changed.
+        """
+
+    def delete(self, document_ids):
+        """
+        Called after the documents with «document_ids» have been deleted.
+        """
+
+    def clear(self):
+        """
+        Called before the index is rebuilt.
+        """
+
+    def filter_documents(self, documents, q):
+        return documents.filter(Q(title__icontains=q) | Q(text__icontains=q))
+
+    def get_rank(self, documents, q):
+        """
+        Returns an expression for the rank of each of the (matching)
+        «documents», higher is better.
+        """
+        return Case(When(title__icontains=q, then=Value(2.0)), default=Value(1.0), output_field=FloatField())
+
+    def search(self, pages, q, language=None):
+        """
+        Filters the «pages» queryset to the pages matching «q» and orders them
+        by their rank, available as the ``search_rank`` attribute.
+        """
+        from cms.models import PageSearchDocument
+
+        documents = PageSearchDocument.objects.using(self.using)
+
+        if language:
+            documents = documents.filter(language=language)
+
+        documents = self.filter_documents(documents, q)
+        ranks = (
+            documents
+            .filter(page=OuterRef('pk'))
+            .annotate(rank=self.get_rank(documents, q))
+            .order_by('-rank')
+            .values('rank')[:1]
+        )
+        return (
+            pages
+            .filter(pk__in=documents.values('page_id'))
+            .annotate(search_rank=Subquery(ranks, output_field=FloatField()))
+            .order_by('-search_rank', 'path')
+        )
+
+
+class PostgreSQLSearchBackend(SearchBackend):
+    """
+    Matches the query as a web search query (see ``websearch_to_tsquery``)
+    against the ``tsvector`` of the documents and ranks with ``ts_rank``.
+    Titles are weighted higher than the text.
+    """
+    #: Text search configuration, the database default if None
+    config = None
+
+    def get_vector(self):
+        from django.contrib.postgres.search import SearchVector
+
+        return (
+            SearchVector('title', weight='A', config=self.config)
+            + SearchVector('text', weight='B', config=self.config)
+        )
+
+    def get_query(self, q):
+        from django.contrib.postgres.search import SearchQuery
+
+        return SearchQuery(q, search_type='websearch', config=self.config)
+
+    def filter_documents(self, documents, q):
+        return documents.annotate(search_vector=self.get_vector()).filter(search_vector=self.get_query(q))
+
+    def get_rank(self, documents, q):
+        from django.contrib.postgres.search import SearchRank
+
+        return SearchRank(self.get_vector(), self.get_query(q))
+
+
+class SQLiteSearchBackend(SearchBackend):
+    """
+    Keeps the documents in an FTS5 table, created by the migrations, and
+    ranks with ``bm25``. Each word of the query is matched as a prefix, all
+    words need to match. Requires SQLite to be compiled with FTS5.
+    """
+    table_name = 'cms_pagesearchdocument_fts'
+    #: bm25 weights of the title and text columns
+    weights = (10.0, 1.0)
+
+    @classmethod
+    def is_available(cls, connection):
+        return _sqlite_has_fts5(connection.alias)
+
+    def update(self, documents):
+        documents = list(documents)
+        self.delete([document.pk for document in documents])
+
+        with connections[self.using].cursor() as cursor:
+            cursor.executemany(
+                f'INSERT INTO {self.table_name}(rowid, title, text) VALUES (%s, %s, %s)',
+                [(document.pk, document.title, document.text) for document in documents],
+            )
+
+    def delete(self, document_ids):
+        document_ids = list(document_ids)
+
+        with connections[self.using].cursor() as cursor:
+            for offset in range(0, len(document_ids), INDEX_BATCH_SIZE):
+                batch = document_ids[offset:offset + INDEX_BATCH_SIZE]
+                cursor.execute(
+                    f'DELETE FROM {self.table_name} WHERE rowid IN ({", ".join(["%s"] * len(batch))})',
+                    batch,
+                )
+
+    def clear(self):
+        with connections[self.using].cursor() as cursor:
+            cursor.execute(f'DELETE FROM {self.table_name}')
+
+    def get_match_expression(self, q):
+        words = q.split()
+        return ' '.join('"{}"*'.format(word.replace('"', '""')) for word in words)
+
+    def search(self, pages, q, language=None):
+        match = self.get_match_expression(q)
+
+        if not match:
+            return pages.none()
+        return super().search(pages, match, language)
+
+    def filter_documents(self, documents, q):
+        return documents.filter(pk__in=RawSQL(f'SELECT rowid FROM {self.table_name} WHERE {self.table_name} MATCH %s', (q,)))
+
+    def get_rank(self, documents, q):
+        return _FTS5Rank(self.table_name, q, self.weights)
+
+
+class _FTS5Rank(Expression):
+    """
+    bm25 rank of the document of the query it is used in. The alias of the
+    document table is only known when compiling (e.g., within a subquery).
+    """
+    output_field = FloatField()
+
+    def __init__(self, table_name, match, weights):
+        super().__init__()
+        self.table_name = table_name
+        self.match = match
+        self.weights = weights
+
+    def as_sql(self, compiler, connection):
+        document_alias = compiler.quote_name_unless_alias(compiler.query.get_initial_alias())
+        weights = ', '.join(str(float(weight)) for weight in self.weights)
+        sql = (
+            f'(SELECT -bm25({self.table_name}, {weights}) FROM {self.table_name} '
+            f'WHERE {self.table_name} MATCH %s AND {self.table_name}.rowid = {document_alias}.id)'
+        )
+        return sql, (self.match,)
+
+
+@cache
+def _sqlite_has_fts5(using):
+    # The migrations create the FTS5 table only if the module is available
+    with connections[using].cursor() as cursor:
+        cursor.execute("SELECT sqlite_compileoption_used('ENABLE_FTS5')")
+        return bool(cursor.fetchone()[0])
+
+
+_backends_by_vendor = {
+    'postgresql': PostgreSQLSearchBackend,
+    'sqlite': SQLiteSearchBackend,
+}
+
+
+def get_search_backend(using=None):
+    """
+    Returns the configured :class:`SearchBackend` or None if the search
+    index is disabled.
+    """
+    from cms.models import PageSearchDocument
+
+    setting = get_cms_setting('SEARCH_INDEX')
+
+    if not setting:
+        return None
+
+    if using is None:
+        using = router.db_for_write(PageSearchDocument)
+
+    if isinstance(setting, str):
+        backend_class = import_string(setting)
+    else:
+        backend_class = _backends_by_vendor.get(connections[using].vendor, SearchBackend)
+
+        if not backend_class.is_available(connections[using]):
+            backend_class = SearchBackend
+    return backend_class(using)
+
+
+def get_search_document_text(plugin):
+    """
+    Returns the text of the ``search_fields`` of the (downcasted) «plugin».
+    """
+    values = (getattr(plugin, field, None) for field in getattr(plugin, 'search_fields', ()))
+    return '\n'.join(strip_tags(str(value)) for value in values if value)
+
+
+def _get_searchable_plugin_types():
+    from cms.plugin_pool import plugin_pool
+
+    return [
+        plugin.__name__ for plugin in plugin_pool.registered_plugins
+        if getattr(plugin.model, 'search_fields', None)
+    ]
+
+
+def _build_search_documents(page_contents):
+    from cms.models import CMSPlugin, PageContent, PageSearchDocument, Placeholder
+    from cms.utils.plugins import downcast_plugins
+
+    placeholders = Placeholder.objects.filter(
+        content_type=ContentType.objects.get_for_model(PageContent),
+        object_id__in=[page_content.pk for page_content in page_contents],
+    )
+    content_by_placeholder = dict(placeholders.values_list('pk', 'object_id'))
+    plugins = CMSPlugin.objects.filter(
+        placeholder__in=content_by_placeholder,
+        plugin_type__in=_get_searchable_plugin_types(),
+    ).order_by('placeholder_id', 'position')
+
+    texts = {page_content.pk: [] for page_content in page_contents}
+    languages = {page_content.pk: page_content.language for page_content in page_contents}
+
+    for plugin in downcast_plugins(plugins):
+        page_content_id = content_by_placeholder[plugin.placeholder_id]
+        text = get_search_document_text(plugin)
+
+        # Plugins in other languages are not rendered for the page content
+        if text and plugin.language == languages[page_content_id]:
+            texts[page_content_id].append(text)
+
+    documents = []
+
+    for page_content in page_contents:
+        text = [page_content.page_title, page_content.menu_title, page_content.meta_description]
+        text.extend(texts[page_content.pk])
+        documents.append(PageSearchDocument(
+            page_id=page_content.page_id,
+            language=page_content.language,
+            title=page_content.title,
+            text='\n'.join(value for value in text if value),
+        ))
+    return documents
+
+
+def _save_search_documents(backend, documents, pairs):
+    from cms.models import PageSearchDocument
+
+    existing = {
+        (document.page_id, document.language): document
+        for document in PageSearchDocument.objects.using(backend.using).filter(
+            page_id__in={page_id for page_id, language in pairs},
+        )
+        if (document.page_id, document.language) in pairs
+    }
+    to_create = []
+    to_update = []
+
+    for document in documents:
+        existing_document = existing.pop((document.page_id, document.language), None)
+
+        if existing_document is None:
+            to_create.append(document)
+        else:
+            document.pk = existing_document.pk
+            to_update.append(document)
+
+    # Documents of page contents which are gone (or no longer visible),
+    # their rows in the backend are removed by a post_delete receiver.
+    deleted_ids = [document.pk for document in existing.values()]
+    PageSearchDocument.objects.using(backend.using).filter(pk__in=deleted_ids).delete()
+    PageSearchDocument.objects.using(backend.using).bulk_update(to_update, ['title', 'text'])
+
+    created = PageSearchDocument.objects.using(backend.using).bulk_create(to_create)
+
+    if any(document.pk is None for document in created):
+        # The database can't return the ids of inserted rows
+        created = _reload_search_documents(backend, created)
+
+    backend.update(to_update + created)
+
+
+def _reload_search_documents(backend, documents):
+    from cms.models import PageSearchDocument
+
+    pairs = {(document.page_id, document.language) for document in documents}
+    return [
+        document for document in PageSearchDocument.objects.using(backend.using).filter(
+            page_id__in={page_id for page_id, language in pairs},
+        )
+        if (document.page_id, document.language) in pairs
+    ]
+
+
+def update_search_index(page_contents):
+    """
+    Rebuilds the search documents of the pages and languages of the given
+    page contents. Documents of page contents which are not visible through
+    ``PageContent.objects`` (anymore) are removed.
+    """
+    from cms.models import PageContent
+
+    backend = get_search_backend()
+
+    if backend is None:
+        return
+
+    pairs = {(page_content.page_id, page_content.language) for page_content in page_contents}
+
+    if not pairs:
+        return
+
+    visible_contents = [
+        page_content for page_content in PageContent.objects.filter(
+            page_id__in={page_id for page_id, language in pairs},
+            language__in={language for page_id, language in pairs},
+        )
+        if (page_content.page_id, page_content.language) in pairs
+    ]
+    documents = _build_search_documents(visible_contents)
+    _save_search_documents(backend, documents, pairs)
+
+
+def update_placeholder_search_index(placeholders):
+    """
+    Rebuilds the search documents of the page contents the given
+    «placeholders» belong to, e.g., after plugins have been added to them.
+    """
+    from cms.models import PageContent
+
+    if get_search_backend() is None:
+        return
+
+    content_type = ContentType.objects.get_for_model(PageContent)
+    page_content_ids = {
+        placeholder.object_id for placeholder in placeholders if placeholder.content_type_id == content_type.pk
+    }
+
+    if page_content_ids:
+        update_search_index(PageContent.admin_manager.filter(pk__in=page_content_ids))
+
+
+def rebuild_search_index():
+    """
+    Rebuilds the search documents of all pages. Returns the number of
+    indexed page contents.
+    """
+    from cms.models import PageContent, PageSearchDocument
+
+    backend = get_search_backend()
+
+    if backend is None:
+        return 0
+
+    # The backend is cleared at once instead of per deleted document
+    PageSearchDocument.objects.using(backend.using).all()._raw_delete(backend.using)
+    backend.clear()
+
+    page_contents = PageContent.objects.order_by('pk')
+    count = 0
+    last_pk = 0
+
+    while True:
+        batch = list(page_contents.filter(pk__gt=last_pk)[:INDEX_BATCH_SIZE])
+
+        if not batch:
+            break
+
+        documents = _build_search_documents(batch)
+        created = PageSearchDocument.objects.using(backend.using).bulk_create(documents, ignore_conflicts=True)
+
+        if any(document.pk is None for document in created):
+            created = _reload_search_documents(backend, created)
+
+        backend.update(created)
+        count += len(batch)
+        last_pk = batch[-1].pk
+    return count
@@ -5,6 +5,7 @@ from django.contrib import messages
 from django.contrib.sites.models import Site
 from django.core.cache import cache
 from django.core.exceptions import ValidationError
+from django.db.models import Q
 from django.urls import NoReverseMatch
 from django.utils.functional import cached_property
 from django.utils.module_loading import autodiscover_modules
@@ -19,6 +20,7 @@ from cms.utils.i18n import (
     get_default_language_for_site,
     is_language_prefix_patterns_used,
 )
+from cms.utils.profiling import annotate_render_timing, profile_render
 from menus.base import Menu
 from menus.exceptions import NamespaceAlreadyRegistered
 from menus.models import CacheKey
@@ -141,6 +143,7 @@ class MenuRenderer:
         )
         return db_cache_key_lookup.exists()
 
+    @profile_render("_build_nodes")
     def _build_nodes(self):
         """
         This is slow. Caching must be used.
@@ -166,7 +169,9 @@ class MenuRenderer:
             # Only use the cache if the key is present in the database.
             # This prevents a condition where keys which have been removed
             # from the database due to a change in content, are still used.
+            annotate_render_timing(self.request, cache=True)
             return cached_nodes
+        annotate_render_timing(self.request, cache=False)
 
         final_nodes = []
         toolbar = getattr(self.request, 'toolbar', None)
@@ -354,6 +359,30 @@ class MenuPool:
             cache.delete_many(to_be_deleted)
             cache_keys.delete()
 
+    def clear_user_menus(self, user_ids):
+        """
+        This invalidates the cached menus of the given users on all sites
+        and in all languages.
+        """
+        user_ids = sorted({str(user_id) for user_id in user_ids})
+
+        # Users per query, to keep the number of conditions low
+        batch_size = 100
+
+        for offset in range(0, len(user_ids), batch_size):
+            # User specific keys end with "_<user id>_user:public" or "_<user id>_user:edit"
+            query = Q()
+
+            for user_id in user_ids[offset:offset + batch_size]:
+                query |= Q(key__contains=f'_{user_id}_user:')
+
+            cache_keys = CacheKey.objects.filter(query)
+            to_be_deleted = list(cache_keys.values_list('key', flat=True))
+
+            if to_be_deleted:
+                cache.delete_many(to_be_deleted)
+                cache_keys.delete()
+
     def register_menu(self, menu_cls):
         from menus.base import Menu
         assert issubclass(menu_cls, Menu)